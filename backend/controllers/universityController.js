@@ -5,6 +5,7 @@ const {
   sanitizeProgramsArray,
 } = require('../utils/sanitizeUniversityStrings');
 const { getCached, setCached, invalidatePrefix } = require('../utils/simpleCache');
+const { searchUniversities, getSearchIndexInfo } = require('../utils/searchIndex');
 
 // Admin: Create university
 exports.createUniversity = async (req, res) => {
@@ -232,6 +233,8 @@ exports.getAllUniversities = async (req, res) => {
       website: 1,
       image: 1,
       logo: 1,
+      imageThumb: 1,
+      logoThumb: 1,
       hecRanking: 1,
       establishedYear: 1,
       isActive: 1,
@@ -300,6 +303,42 @@ exports.getAllUniversities = async (req, res) => {
   }
 };
 
+// Public: Autocomplete universities by name fragment, acronym or city
+exports.autocompleteUniversities = async (req, res) => {
+  try {
+    const term = String(req.query.q || '').trim();
+    const limit = Math.min(Math.max(parseInt(req.query.limit, 10) || 8, 1), 20);
+    if (!term) {
+      return res.status(200).json({ success: true, universities: [] });
+    }
+
+    // Prebuilt index from the last scraper run (utils/searchIndex.js)
+    const matches = searchUniversities(term, limit);
+    if (matches) {
+      return res.status(200).json({
+        success: true,
+        source: 'index',
+        version: getSearchIndexInfo().version,
+        universities: matches,
+      });
+    }
+
+    // No index exported yet: plain name regex
+    const escaped = term.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+    const universities = await University.find({
+      name: { $regex: escaped, $options: 'i' },
+      $or: [{ isActive: true }, { isActive: { $exists: false } }, { isActive: null }],
+    })
+      .select({ _id: 1, name: 1, city: 1, type: 1 })
+      .sort({ name: 1 })
+      .limit(limit)
+      .lean();
+    res.status(200).json({ success: true, source: 'database', universities });
+  } catch (error) {
+    res.status(500).json({ success: false, message: error.message });
+  }
+};
+
 // Public: Get single university
 exports.getUniversity = async (req, res) => {
   try {
@@ -19,6 +19,20 @@ const universitySchema = new mongoose.Schema({
     required: true,
     index: true
   },
+  /** HEC listing tags, filled by the scraper's filter index mode (`scrape_hec_universities.py --index`) */
+  disciplines: [{
+    type: String,
+    trim: true
+  }],
+  charteredBy: {
+    type: String,
+    trim: true
+  },
+  /** True once type / disciplines / charteredBy come from HEC's own filters rather than a name-based guess */
+  hecTagged: {
+    type: Boolean,
+    default: false
+  },
   hecRanking: {
     type: Number,
     min: 1
@@ -56,6 +70,12 @@ const universitySchema = new mongoose.Schema({
   image: {
     type: String // URL to main university image
   },
+  logoThumb: {
+    type: String // Path of the WebP logo thumbnail under /uploads (university_images.py)
+  },
+  imageThumb: {
+    type: String // Path of the WebP hero thumbnail under /uploads (university_images.py)
+  },
   isActive: {
     type: Boolean,
     default: true
@@ -129,6 +149,8 @@ const universitySchema = new mongoose.Schema({
 universitySchema.index({ city: 1, type: 1 });
 // List page: city filter then sort by name
 universitySchema.index({ city: 1, name: 1 });
+// Discipline filter on the list page (multikey)
+universitySchema.index({ disciplines: 1 });
 // Speeds up name-based text search
 universitySchema.index({ name: 1 });
 
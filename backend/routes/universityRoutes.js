@@ -4,6 +4,7 @@ const {
   updateUniversity,
   deleteUniversity,
   getAllUniversities,
+  autocompleteUniversities,
   getUniversity,
   getUniversityPrograms
 } = require('../controllers/universityController');
@@ -37,6 +38,7 @@ router.get('/cities', async (req, res) => {
     res.status(500).json({ success: false, message: error.message });
   }
 });
+router.get('/autocomplete', autocompleteUniversities);
 router.get('/', getAllUniversities);
 router.get('/:id/programs', getUniversityPrograms);
 router.get('/:id', getUniversity);
@@ -1,8 +1,15 @@
 /**
  * Merge duplicate University documents: move programs, saved rows, applications, criteria; delete duplicate.
  * Run: node backend/scripts/mergeDuplicateUniversities.js
+ *      node backend/scripts/mergeDuplicateUniversities.js --candidates=scraper/merge_candidates.json --dry-run
+ *      node backend/scripts/mergeDuplicateUniversities.js --candidates=scraper/merge_candidates.json --min-score=0.9
+ *
+ * --candidates reads the report from scraper/find_duplicate_universities.py instead of MERGE_PAIRS.
+ * Candidate merges delete documents, so they need an explicit --min-score; without one the run is a dry run.
  */
 require('dotenv').config();
+const fs = require('fs');
+const path = require('path');
 const mongoose = require('mongoose');
 const University = require('../models/University');
 const Program = require('../models/Program');
@@ -49,6 +56,24 @@ const MERGE_PAIRS = [
   },
 ];
 
+function parseArgs() {
+  const out = { candidates: null, minScore: null, dryRun: false };
+  for (const a of process.argv.slice(2)) {
+    if (a === '--dry-run') out.dryRun = true;
+    else if (a.startsWith('--candidates=')) out.candidates = a.split('=')[1];
+    else if (a.startsWith('--min-score=')) out.minScore = parseFloat(a.split('=')[1]);
+  }
+  return out;
+}
+
+/** Pairs from a merge-candidates report: only mergeable pairs at or above minScore */
+function loadCandidatePairs(file, minScore) {
+  const report = JSON.parse(fs.readFileSync(path.resolve(file), 'utf-8'));
+  const pairs = (report.pairs || []).filter((p) => p.mergeable && p.score >= minScore);
+  console.log(`[merge] ${pairs.length} of ${(report.pairs || []).length} candidate pairs with score >= ${minScore}`);
+  return pairs.map(({ keep, remove }) => ({ keep, remove }));
+}
+
 async function dedupeProgramsForUniversity(universityId) {
   const programs = await Program.find({ university: universityId }).lean();
   const seen = new Map();
@@ -120,12 +145,32 @@ async function mergeOne(keepName, removeName) {
 }
 
 async function main() {
+  const { candidates, minScore, dryRun: dryRunFlag } = parseArgs();
+  let dryRun = dryRunFlag;
+  if (candidates && (minScore === null || Number.isNaN(minScore))) {
+    console.log('[merge] no --min-score given: listing exact (score 1.0) candidates as a dry run');
+    dryRun = true;
+  }
+  const pairs = candidates ? loadCandidatePairs(candidates, minScore ?? 1.0) : MERGE_PAIRS;
+
+  if (dryRun) {
+    for (const { keep, remove } of pairs) console.log(`[dry-run] "${remove}" → "${keep}"`);
+    return;
+  }
+
   await mongoose.connect(uri);
   console.log('[merge] connected');
 
-  for (const { keep, remove } of MERGE_PAIRS) {
+  const removed = new Set();
+  for (const { keep, remove } of pairs) {
+    // A row already merged away cannot be a keep/remove target again in this run
+    if (removed.has(keep) || removed.has(remove)) {
+      console.log(`[skip] already merged: ${removed.has(keep) ? keep : remove}`);
+      continue;
+    }
     try {
       await mergeOne(keep, remove);
+      removed.add(remove);
     } catch (e) {
       console.error(`[error] ${keep} / ${remove}:`, e.message);
     }
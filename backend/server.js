@@ -73,6 +73,8 @@ const cors = require('cors');
 const helmet = require('helmet');
 const os = require('os');
 const connectDB = require('./config/db');
+const { startScrapeChangePoller } = require('./utils/scrapeChangePoller');
+const { startSearchIndexWatcher, getSearchIndexInfo } = require('./utils/searchIndex');
 
 // Initialize Express app
 const app = express();
@@ -321,6 +323,15 @@ const server = app.listen(PORT, HOST, () => {
   // Schedule backups every 10 minutes (600000 ms)
   setInterval(performBackup, 10 * 60 * 1000);
   console.log(`💾 Automatic backups scheduled every 10 minutes\n`);
+
+  // Targeted cache invalidation after scraper runs (scrape_changes manifests)
+  if (startScrapeChangePoller()) {
+    console.log('🔄 Watching scraper change manifests for cache invalidation');
+  }
+  if (startSearchIndexWatcher()) {
+    const info = getSearchIndexInfo();
+    console.log(`🔎 Search index ${info.version} loaded (${info.universities} universities)`);
+  }
 });
 
 // Handle unhandled promise rejections
@@ -0,0 +1,118 @@
+/**
+ * Scraper change-manifest poller.
+ * Each scraper run that writes to MongoDB also inserts a manifest into `scrape_changes`
+ * (scraper/change_manifest.py): which universities were added or changed, which fields,
+ * and the cities / types involved. Polling those manifests lets the cache drop only the
+ * list pages, counts and city lists a run could have changed — everything else stays warm.
+ */
+const mongoose = require('mongoose');
+const { getCached, invalidateWhere } = require('./simpleCache');
+
+const COLLECTION = 'scrape_changes';
+const DEFAULT_POLL_MS = 60_000;
+
+/** Fields returned by the browse list / merit picker (see getAllUniversities) */
+const LIST_FIELDS = new Set([
+  'name', 'city', 'type', 'website', 'image', 'logo', 'imageThumb', 'logoThumb', 'hecRanking',
+  'establishedYear', 'isActive',
+]);
+const PICKER_FIELDS = new Set(['name', 'city']);
+
+let lastId = null;
+let timer = null;
+
+const lower = (value) => String(value || '').trim().toLowerCase();
+
+/** `unis:${page}:${limit}:${city}:${type}:${search}:${meritPicker}:${omitPlaceholder}` -> parts */
+function parseListKey(key) {
+  const parts = key.slice('unis:'.length).split(':');
+  if (parts.length < 7) return null;
+  return {
+    city: parts[2],
+    type: parts[3],
+    search: parts.slice(4, -2).join(':'),
+    meritPicker: parts[parts.length - 2] === 'true' || parts[parts.length - 2] === '1',
+  };
+}
+
+/** Could a cached `unis:` list page include a university this manifest touched? */
+function listKeyAffected(key, scope) {
+  if (key === 'unis:totalCount') return scope.added;
+  const parsed = parseListKey(key);
+  if (!parsed) return true;
+
+  const relevant = parsed.meritPicker ? scope.pickerChanged : scope.listChanged;
+  if (!relevant) return false;
+  if (parsed.city && parsed.city !== 'All Cities' && !scope.cities.has(parsed.city.trim())) return false;
+  if (parsed.type && parsed.type !== 'All Types' && !scope.types.has(lower(parsed.type))) return false;
+
+  const term = parsed.search.trim();
+  if (term) {
+    const needle = lower(term);
+    if (scope.names.some((name) => name.includes(needle))) return true;
+    // Search also matches universities through their programs (cached per term)
+    const escaped = term.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+    const programUniIds = getCached(`progUniIds:${escaped.toLowerCase()}`);
+    if (!Array.isArray(programUniIds)) return true;
+    const ids = new Set(programUniIds.map(String));
+    return scope.ids.some((id) => ids.has(id));
+  }
+  return true;
+}
+
+/** Invalidate the cache entries one manifest affects; returns how many were dropped */
+function applyManifest(manifest) {
+  const universities = manifest.universities || [];
+  const fields = new Set(manifest.fields || []);
+  const scope = {
+    added: (manifest.added || 0) > 0,
+    listChanged: (manifest.added || 0) > 0 || [...fields].some((f) => LIST_FIELDS.has(f)),
+    pickerChanged: (manifest.added || 0) > 0 || [...fields].some((f) => PICKER_FIELDS.has(f)),
+    cities: new Set((manifest.cities || []).map((c) => String(c).trim())),
+    types: new Set((manifest.types || []).map(lower)),
+    names: universities.map((u) => lower(u.name)),
+    ids: universities.filter((u) => u.id).map((u) => String(u.id)),
+  };
+  const citiesChanged = scope.added || fields.has('city');
+
+  return invalidateWhere((key) => {
+    if (key === 'uni:cities') return citiesChanged;
+    if (key.startsWith('unis:')) return listKeyAffected(key, scope);
+    return false;
+  });
+}
+
+async function poll() {
+  if (mongoose.connection.readyState !== 1) return;
+  const collection = mongoose.connection.collection(COLLECTION);
+  try {
+    if (lastId === null) {
+      // The cache starts empty, so only manifests written after startup matter
+      const latest = await collection.find({}, { projection: { _id: 1 } }).sort({ _id: -1 }).limit(1).toArray();
+      lastId = latest.length ? latest[0]._id : mongoose.Types.ObjectId.createFromTime(Math.floor(Date.now() / 1000));
+      return;
+    }
+    const manifests = await collection.find({ _id: { $gt: lastId } }).sort({ _id: 1 }).toArray();
+    for (const manifest of manifests) {
+      const removed = applyManifest(manifest);
+      lastId = manifest._id;
+      console.log(
+        `🔄 Scrape ${manifest.runId || manifest._id}: ${manifest.added || 0} added, ` +
+        `${manifest.changed || 0} changed — ${removed} cache entries invalidated`
+      );
+    }
+  } catch (error) {
+    console.error(`❌ Scrape change poll failed: ${error.message}`);
+  }
+}
+
+/** Start polling every SCRAPE_CHANGES_POLL_MS (default 60 s; 0 disables) */
+function startScrapeChangePoller(intervalMs = Number(process.env.SCRAPE_CHANGES_POLL_MS ?? DEFAULT_POLL_MS)) {
+  if (timer || !intervalMs) return null;
+  poll();
+  timer = setInterval(poll, intervalMs);
+  timer.unref?.();
+  return timer;
+}
+
+module.exports = { startScrapeChangePoller, applyManifest };
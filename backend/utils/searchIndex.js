@@ -0,0 +1,165 @@
+/**
+ * Prebuilt university search index.
+ * The scrapers export a compact index at the end of each run (scraper/search_index.py):
+ * sorted terms (name words, aliases, acronyms, short forms, cities) with posting lists,
+ * and trigrams of those terms. Autocomplete is a binary search over the terms, so "gcu",
+ * "nust" or "lahore" resolve in memory instead of a regex scan of the collection.
+ * The file is reloaded whenever a run replaces it.
+ */
+const fs = require('fs');
+const path = require('path');
+
+const FORMAT = 1;
+const GRAM = 3;
+const DEFAULT_POLL_MS = 30_000;
+const DEFAULT_PATH = path.join(__dirname, '..', 'data', 'search_index.json');
+
+let index = null;
+let watching = null;
+
+/** Same normalization as university_names.normalize_name (the terms are stored that way) */
+function normalize(text) {
+  return String(text || '')
+    .toLowerCase()
+    .replace(/&/g, ' and ')
+    .replace(/['`’]/g, '')
+    .replace(/[^a-z0-9]+/g, ' ')
+    .trim()
+    .split(/\s+/)
+    .filter(Boolean)
+    .join(' ');
+}
+
+function indexPath() {
+  return process.env.SEARCH_INDEX_PATH || DEFAULT_PATH;
+}
+
+/** Read and check the artifact; keeps the previous index if the file is missing or invalid */
+function loadSearchIndex(file = indexPath()) {
+  try {
+    const data = JSON.parse(fs.readFileSync(file, 'utf8'));
+    if (data.format !== FORMAT || !Array.isArray(data.terms) || data.terms.length !== data.postings?.length) {
+      console.warn(`⚠️  Search index ${file} has an unsupported format (${data.format}); keeping the previous one`);
+      return false;
+    }
+    index = data;
+    return true;
+  } catch (error) {
+    if (error.code !== 'ENOENT') console.error(`❌ Could not load search index: ${error.message}`);
+    return false;
+  }
+}
+
+/** First term index >= prefix */
+function lowerBound(terms, prefix) {
+  let lo = 0;
+  let hi = terms.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (terms[mid] < prefix) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+/** doc -> best weight among the terms starting with prefix */
+function prefixMatches(prefix, exactBonus = 0) {
+  const { terms, postings } = index;
+  const docs = new Map();
+  for (let i = lowerBound(terms, prefix); i < terms.length && terms[i].startsWith(prefix); i++) {
+    const bonus = terms[i] === prefix ? exactBonus : 0;
+    const list = postings[i];
+    for (let j = 0; j < list.length; j += 2) {
+      const score = list[j + 1] * 10 + bonus;
+      if (score > (docs.get(list[j]) || 0)) docs.set(list[j], score);
+    }
+  }
+  return docs;
+}
+
+/** Terms containing the fragment anywhere (for fragments that are not a prefix) */
+function fragmentMatches(fragment) {
+  const compact = fragment.replace(/ /g, '');
+  if (compact.length < GRAM) return new Map();
+  let candidates = null;
+  for (let i = 0; i + GRAM <= compact.length; i++) {
+    const list = index.grams[compact.slice(i, i + GRAM)];
+    if (!list) return new Map();
+    candidates = candidates ? candidates.filter((t) => list.includes(t)) : list;
+  }
+  const docs = new Map();
+  for (const t of candidates) {
+    if (!index.terms[t].replace(/ /g, '').includes(compact)) continue;
+    const list = index.postings[t];
+    for (let j = 0; j < list.length; j += 2) {
+      const score = list[j + 1] * 10 - 5;
+      if (score > (docs.get(list[j]) || 0)) docs.set(list[j], score);
+    }
+  }
+  return docs;
+}
+
+/**
+ * Ranked { _id, name, city, type } matches for a query, or null when no index is loaded.
+ * Whole-query prefix matches first (exact alias / acronym hits on top); multi-word queries
+ * also match universities where every word prefixes one of their terms.
+ */
+function searchUniversities(query, limit = 10) {
+  if (!index) return null;
+  const q = normalize(query);
+  if (!q) return [];
+
+  const scores = prefixMatches(q, 5);
+  const words = q.split(' ');
+  if (words.length > 1) {
+    let combined = null;
+    for (const word of words) {
+      const matches = prefixMatches(word);
+      if (!combined) {
+        combined = matches;
+        continue;
+      }
+      const next = new Map();
+      for (const [doc, score] of combined) {
+        if (matches.has(doc)) next.set(doc, score + matches.get(doc));
+      }
+      combined = next;
+    }
+    for (const [doc, total] of combined) {
+      const score = Math.round(total / words.length) - 1;
+      if (score > (scores.get(doc) || 0)) scores.set(doc, score);
+    }
+  }
+  if (!scores.size) {
+    for (const [doc, score] of fragmentMatches(q)) scores.set(doc, score);
+  }
+
+  return [...scores.entries()]
+    .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+    .slice(0, limit)
+    .map(([doc]) => {
+      const [_id, name, city, type] = index.docs[doc];
+      return { _id, name, city, type };
+    });
+}
+
+function getSearchIndexInfo() {
+  if (!index) return null;
+  return { version: index.version, builtAt: index.builtAt, runId: index.runId, universities: index.docs.length };
+}
+
+/** Load the index now and reload it when a run replaces the file (SEARCH_INDEX_POLL_MS, 0 disables) */
+function startSearchIndexWatcher(intervalMs = Number(process.env.SEARCH_INDEX_POLL_MS ?? DEFAULT_POLL_MS)) {
+  const file = indexPath();
+  const loaded = loadSearchIndex(file);
+  if (watching || !intervalMs) return loaded;
+  watching = file;
+  fs.watchFile(file, { interval: intervalMs, persistent: false }, (current, previous) => {
+    if (current.mtimeMs && current.mtimeMs !== previous.mtimeMs && loadSearchIndex(file)) {
+      console.log(`🔎 Search index reloaded (${index.version}, ${index.docs.length} universities)`);
+    }
+  });
+  return loaded;
+}
+
+module.exports = { startSearchIndexWatcher, loadSearchIndex, searchUniversities, getSearchIndexInfo, normalize };
@@ -35,4 +35,19 @@ function invalidatePrefix(prefix) {
   }
 }
 
-module.exports = { getCached, setCached, invalidatePrefix };
+/**
+ * Delete every entry whose key matches predicate(key, data); returns how many were removed.
+ * Used for targeted invalidation (e.g. after a scraper run) instead of dropping a whole prefix.
+ */
+function invalidateWhere(predicate) {
+  let removed = 0;
+  for (const [key, item] of _store) {
+    if (predicate(key, item.data)) {
+      _store.delete(key);
+      removed++;
+    }
+  }
+  return removed;
+}
+
+module.exports = { getCached, setCached, invalidatePrefix, invalidateWhere };
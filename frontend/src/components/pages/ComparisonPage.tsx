@@ -6,7 +6,7 @@ import { useState, useEffect, useMemo, useCallback, type ReactNode } from 'react
 import api from '../../services/api';
 import { toast } from 'sonner';
 import { universityNameLabel, stripUnknownUniversityText } from '../../utils/universityDisplay';
-import { getUniversityImage } from '../../utils/universityImage';
+import { getUniversityImage, getUniversityLogo } from '../../utils/universityImage';
 
 // ─── Types ───────────────────────────────────────────────────────────────────
 
@@ -40,6 +40,8 @@ interface ComparedUniversity {
   city: string;
   image?: string;
   logo?: string;
+  logoThumb?: string;
+  imageThumb?: string;
   type?: string;
   hecRanking?: number;
   website?: string;
@@ -485,7 +487,7 @@ export function ComparisonPage() {
                       <th key={u._id} className="p-3 md:p-4 text-left align-top min-w-[200px] max-w-[280px]">
                         <div className="flex items-start gap-2">
                           <img
-                            src={getUniversityImage({ name: u.name, image: u.image, logo: u.logo })}
+                            src={getUniversityLogo(u) || getUniversityImage(u)}
                             alt=""
                             className="w-10 h-10 rounded-lg object-cover border border-slate-200 flex-shrink-0"
                           />
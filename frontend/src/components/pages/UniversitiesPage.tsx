@@ -28,6 +28,8 @@ interface University {
   type: string;
   image?: string;
   logo?: string;
+  logoThumb?: string;
+  imageThumb?: string;
   description?: string;
   website?: string;
   [key: string]: any;
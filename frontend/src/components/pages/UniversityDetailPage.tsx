@@ -38,6 +38,8 @@ interface University {
   establishedYear?: number;
   image?: string;
   logo?: string;
+  logoThumb?: string;
+  imageThumb?: string;
   programCount?: number;
   scrapedSummary?: string;
   scrapedHighlights?: string[];
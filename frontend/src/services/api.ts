@@ -15,6 +15,12 @@ function resolveApiBaseUrl(): string {
   return 'http://localhost:5000/api';
 }
 
+/** Absolute URL for a file the backend serves (e.g. `/uploads/images/...`) */
+export function resolveAssetUrl(path: string): string {
+  if (/^https?:\/\//.test(path)) return path;
+  return `${resolveApiBaseUrl().replace(/\/api$/, '')}${path.startsWith('/') ? '' : '/'}${path}`;
+}
+
 const api = axios.create({
   baseURL: resolveApiBaseUrl(),
   headers: {
@@ -1,12 +1,24 @@
 /** Fallback hero image when university has no `image` in DB */
 
+import { resolveAssetUrl } from '../services/api';
+
 export interface UniversityLike {
   name: string;
   image?: string;
   logo?: string;
+  imageThumb?: string;
+  logoThumb?: string;
+}
+
+/** Logo (thumbnail first), or null when none is known */
+export function getUniversityLogo(university: UniversityLike): string | null {
+  if (university.logoThumb) return resolveAssetUrl(university.logoThumb);
+  return university.logo || null;
 }
 
 export function getUniversityImage(university: UniversityLike): string {
+  // Locally served WebP thumbnail (scraper/university_images.py) beats the remote original
+  if (university.imageThumb) return resolveAssetUrl(university.imageThumb);
   if (university.image) return university.image;
 
   const name = university.name.toLowerCase();
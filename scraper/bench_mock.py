@@ -0,0 +1,138 @@
+"""
+Offline end-to-end benchmark
+Starts mock_hec_server in-process, runs each scraper command against it and records wall time,
+exit code, the requests the mock served and how many fixture universities the scraper staged
+(each command gets its own staging database). Results go to scraper/reports/bench-<run id>/.
+
+Usage:
+    python bench_mock.py --mongo-uri mongodb://localhost:27018 --latency 150 --jitter 50 --seed 7 \\
+        --run "fast=python scrape_hec_universities_fast.py" \\
+        --run "full=python scrape_hec_universities.py"
+
+Scrapers write fixture rows to the 'manzil' database of --mongo-uri, so it must be a scratch server;
+the configured MONGO_URI is refused.
+"""
+
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+from dotenv import dotenv_values
+
+from mock_hec_server import DEFAULT_FIXTURE, MockHEC, load_fixture, start_server
+from run_report import RunReport
+from staging_store import StagingStore
+
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def configured_mongo_uris():
+    """MONGO_URI from the environment and from .env files the scrapers would load"""
+    uris = {os.getenv('MONGO_URI')}
+    for path in (os.path.join(SCRAPER_DIR, '.env'), os.path.join(SCRAPER_DIR, '..', 'backend', '.env'), '.env'):
+        if os.path.exists(path):
+            uris.add(dotenv_values(path).get('MONGO_URI'))
+    uris.discard(None)
+    return uris
+
+
+def staged_count(path, expected_names):
+    """Fixture universities a command staged (None if it staged nothing at all)"""
+    if not os.path.exists(path):
+        return None
+    store = StagingStore(path)
+    try:
+        return len(store.names() & expected_names)
+    finally:
+        store.close()
+
+
+def run_command(name, command, url, mock, timeout, mongo_uri, staging_dir):
+    """Run one scraper command against the mock; returns its result row"""
+    with mock.lock:
+        mock.stats.clear()
+    staging_db = os.path.join(staging_dir, f"{name}.db")
+    env = {**os.environ, 'HEC_RECOGNISED_URL': url, 'PYTHONUNBUFFERED': '1',
+           'MONGO_URI': mongo_uri, 'SCRAPER_STAGING_DB': staging_db}
+
+    print(f"\n▶️  {name}: {command}")
+    started = time.monotonic()
+    try:
+        completed = subprocess.run(shlex.split(command), cwd=SCRAPER_DIR, env=env, timeout=timeout)
+        exit_code = completed.returncode
+    except subprocess.TimeoutExpired:
+        exit_code = 'timeout'
+    elapsed = time.monotonic() - started
+
+    with mock.lock:
+        stats = dict(mock.stats)
+    expected_names = {uni['name'] for uni in mock.universities}
+    found = staged_count(staging_db, expected_names)
+    complete = found == len(expected_names)
+    print(f"   ⏱️  {elapsed:.1f}s, exit {exit_code}, {stats.get('requests', 0)} requests, "
+          f"{found if found is not None else 0}/{len(expected_names)} universities {'✅' if complete else '❌'}")
+    return {'name': name, 'command': command, 'wall_time_s': round(elapsed, 2), 'exit_code': exit_code,
+            'universities': found, 'expected': len(expected_names), 'complete': complete, 'server': stats}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark scraper strategies against the local mock HEC server')
+    parser.add_argument('--run', action='append', required=True, metavar='NAME=COMMAND',
+                        help='Scraper command to time (repeatable)')
+    parser.add_argument('--mongo-uri', required=True,
+                        help="Scratch MongoDB server for the scrapers (they write to its 'manzil' database)")
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE)
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0, help='ms')
+    parser.add_argument('--jitter', type=float, default=0, help='ms')
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--failure-mode', choices=('error', 'reset', 'hang'), default='error')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for jitter / failures (same seed, same run)')
+    parser.add_argument('--timeout', type=int, default=3600, help='Per-command timeout (s)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    runs = []
+    for spec in args.run:
+        name, sep, command = spec.partition('=')
+        if not sep or not command.strip():
+            sys.exit(f"❌ --run must be NAME=COMMAND, got: {spec}")
+        runs.append((name.strip(), command.strip()))
+    if args.mongo_uri in configured_mongo_uris():
+        sys.exit("❌ --mongo-uri is the configured MONGO_URI; benchmarks need a scratch MongoDB server")
+
+    report = RunReport('bench')
+    settings = {key: getattr(args, key) for key in
+                ('fixture', 'scale', 'page_size', 'latency', 'jitter', 'failure_rate', 'failure_mode', 'seed')}
+    results = []
+
+    staging_dir = tempfile.mkdtemp(prefix='bench-staging-')
+    for name, command in runs:
+        # Fresh server (and random state) per command so each one sees the same conditions
+        mock = MockHEC(load_fixture(args.fixture, args.scale), page_size=args.page_size,
+                       latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                       failure_mode=args.failure_mode, seed=args.seed)
+        server, url = start_server(mock)
+        try:
+            results.append(run_command(name, command, url, mock, args.timeout, args.mongo_uri, staging_dir))
+        finally:
+            server.shutdown()
+
+    print("\n📊 Benchmark:")
+    for result in results:
+        print(f"   {result['name']:<20} {result['wall_time_s']:>8.1f}s  exit {result['exit_code']}  "
+              f"{result['universities'] or 0}/{result['expected']} universities")
+    report.add('settings', settings)
+    report.add('results', results)
+    report.finalize()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Persistent Chrome profile per worker
+By default every Chrome launch (and every restart_driver()) starts from a throwaway profile and
+downloads the listing's SharePoint scripts again. With --browser-profile each worker gets a managed
+user-data directory under scraper/browser_profiles/ so the HTTP and code caches stay warm across
+sessions. A lock file keeps two workers out of the same directory (a second worker takes the next
+slot), leftovers from a crashed Chrome are cleared before each launch, and the caches are emptied
+once the profile grows past its size limit.
+"""
+
+import json
+import os
+import shutil
+import time
+
+# psutil is optional: without it a lock is only treated as stale once its process id is gone (POSIX)
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'browser_profiles')
+DEFAULT_MAX_MB = 500
+MAX_SLOTS = 16
+LOCK_FILE = 'manzil-worker.lock'
+
+# Chrome's own single-instance markers; stale ones make the next launch fail
+SINGLETON_FILES = ('SingletonLock', 'SingletonCookie', 'SingletonSocket')
+# Caches worth keeping warm (and the first thing dropped when the profile is too big)
+CACHE_DIRS = (
+    os.path.join('Default', 'Cache'),
+    os.path.join('Default', 'Code Cache'),
+    os.path.join('Default', 'Service Worker', 'CacheStorage'),
+    os.path.join('Default', 'GPUCache'),
+    'GrShaderCache',
+    'ShaderCache',
+)
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for filename in files:
+            try:
+                total += os.path.getsize(os.path.join(root, filename))
+            except OSError:
+                continue
+    return total
+
+
+def process_alive(pid):
+    if PSUTIL_AVAILABLE:
+        return psutil.pid_exists(pid)
+    if os.name == 'nt':
+        # os.kill would terminate the process on Windows; without psutil assume the lock is held
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BrowserProfile:
+    """acquire() a slot, pass chrome_arguments() to Chrome, prepare() before every launch, release() at exit"""
+
+    def __init__(self, name='default', base_dir=PROFILES_DIR, max_mb=DEFAULT_MAX_MB):
+        self.name = name
+        self.base_dir = base_dir
+        self.max_mb = max_mb
+        self.path = None
+        self.warm = False
+        self.loads = []
+        self.cleanups = []
+        self.recovered = []
+
+    def _lock_path(self, path):
+        return os.path.join(path, LOCK_FILE)
+
+    def _try_lock(self, path):
+        os.makedirs(path, exist_ok=True)
+        lock_path = self._lock_path(path)
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    with open(lock_path, 'r', encoding='utf-8') as f:
+                        pid = int(json.load(f)['pid'])
+                except (OSError, ValueError, KeyError, TypeError):
+                    pid = None
+                if pid is not None and pid != os.getpid() and process_alive(pid):
+                    return False
+                # Left behind by a worker that died: take the profile over
+                self.recovered.append(f"stale lock (pid {pid})")
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    return False
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'pid': os.getpid(), 'since': time.strftime('%Y-%m-%d %H:%M:%S')}, f)
+            return True
+        return False
+
+    def acquire(self):
+        """Lock the worker's profile directory (or the next free slot); returns its path"""
+        for slot in range(MAX_SLOTS):
+            name = self.name if slot == 0 else f"{self.name}-{slot + 1}"
+            path = os.path.join(self.base_dir, name)
+            if self._try_lock(path):
+                self.path = path
+                return path
+        raise RuntimeError(f"All {MAX_SLOTS} browser profile slots for '{self.name}' are in use")
+
+    def release(self):
+        if self.path:
+            try:
+                os.remove(self._lock_path(self.path))
+            except OSError:
+                pass
+            self.path = None
+
+    def _recover(self):
+        """Undo what a crashed Chrome leaves behind; the worker lock guarantees no live Chrome uses it"""
+        for filename in SINGLETON_FILES:
+            target = os.path.join(self.path, filename)
+            if os.path.lexists(target):
+                try:
+                    os.remove(target)
+                    self.recovered.append(filename)
+                except OSError:
+                    pass
+        preferences = os.path.join(self.path, 'Default', 'Preferences')
+        if os.path.exists(preferences):
+            try:
+                with open(preferences, 'r', encoding='utf-8') as f:
+                    prefs = json.load(f)
+            except (OSError, ValueError):
+                # Half-written on a crash: Chrome recreates it (the caches are separate files)
+                os.remove(preferences)
+                self.recovered.append('corrupt Preferences')
+                return
+            # Stops the "Chrome didn't shut down correctly" bar and session restore
+            profile = prefs.setdefault('profile', {})
+            if profile.get('exit_type') != 'Normal':
+                profile['exit_type'] = 'Normal'
+                profile['exited_cleanly'] = True
+                with open(preferences, 'w', encoding='utf-8') as f:
+                    json.dump(prefs, f)
+
+    def _cache_size(self):
+        return sum(directory_size(os.path.join(self.path, cache)) for cache in CACHE_DIRS)
+
+    def prepare(self):
+        """Before each launch: crash recovery and the size limit; notes whether the caches are warm"""
+        if not self.path:
+            self.acquire()
+        self._recover()
+        size_mb = directory_size(self.path) / (1024 * 1024)
+        if size_mb > self.max_mb:
+            for cache in CACHE_DIRS:
+                shutil.rmtree(os.path.join(self.path, cache), ignore_errors=True)
+            after_mb = directory_size(self.path) / (1024 * 1024)
+            self.cleanups.append({'before_mb': round(size_mb, 1), 'after_mb': round(after_mb, 1)})
+        self.warm = self._cache_size() > 0
+
+    def chrome_arguments(self):
+        # Keep Chrome's own HTTP cache within half the profile budget so cleanups stay rare
+        return [f'--user-data-dir={self.path}',
+                f'--disk-cache-size={self.max_mb * 1024 * 1024 // 2}']
+
+    def record_load(self, kind, seconds):
+        """First listing load after a launch ('startup' / 'restart')"""
+        self.loads.append({'kind': kind, 'warm': self.warm, 'seconds': round(seconds, 1)})
+
+    def report(self):
+        cold = [load['seconds'] for load in self.loads if not load['warm']]
+        warm = [load['seconds'] for load in self.loads if load['warm']]
+        return {
+            'path': self.path,
+            'size_mb': round(directory_size(self.path) / (1024 * 1024), 1) if self.path else None,
+            'max_mb': self.max_mb,
+            'first_loads': self.loads,
+            'cold_load_avg_s': round(sum(cold) / len(cold), 1) if cold else None,
+            'warm_load_avg_s': round(sum(warm) / len(warm), 1) if warm else None,
+            'cleanups': self.cleanups,
+            'recovered': self.recovered,
+        }
@@ -0,0 +1,117 @@
+"""
+Chrome memory / latency watchdog
+Samples the browser process tree's RSS and a WebDriver round trip between combinations and says
+when the session should be recycled, so Chrome is restarted at a safe boundary instead of after it
+dies mid-combination.
+"""
+
+import statistics
+import time
+
+# psutil is optional: without it only latency and combination-count limits apply
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+DEFAULT_MAX_RSS_MB = 1500
+DEFAULT_MAX_LATENCY_S = 5.0
+DEFAULT_RECYCLE_EVERY = 150
+# Consecutive slow probes before latency alone triggers a recycle
+LATENCY_STRIKES = 3
+
+
+def driver_pid(driver):
+    """PID of chromedriver (Chrome and its renderers are its descendants)"""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+def process_tree_rss(pid):
+    """Total RSS in MB of a process and all its descendants"""
+    root = psutil.Process(pid)
+    total = 0
+    for process in [root, *root.children(recursive=True)]:
+        try:
+            total += process.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / (1024 * 1024)
+
+
+class BrowserWatchdog:
+    """Call check(driver) between combinations; a non-None result is the reason to recycle"""
+
+    def __init__(self, max_rss_mb=DEFAULT_MAX_RSS_MB, max_latency_s=DEFAULT_MAX_LATENCY_S,
+                 recycle_every=DEFAULT_RECYCLE_EVERY):
+        self.max_rss_mb = max_rss_mb
+        self.max_latency_s = max_latency_s
+        self.recycle_every = recycle_every
+        self.driver = None
+        self.combinations = 0
+        self.slow_probes = 0
+        self.rss_samples = []
+        self.latencies = []
+        self.recycles = []
+
+    def _sample(self, driver):
+        rss = None
+        pid = driver_pid(driver)
+        if PSUTIL_AVAILABLE and pid:
+            try:
+                rss = process_tree_rss(pid)
+                self.rss_samples.append(rss)
+            except psutil.Error:
+                pass
+
+        started = time.monotonic()
+        driver.execute_script('return 1')
+        latency = time.monotonic() - started
+        self.latencies.append(latency)
+        return rss, latency
+
+    def check(self, driver):
+        """Sample the session; returns a recycle reason or None"""
+        if driver is not self.driver:
+            # New session (first call or restarted elsewhere)
+            self.driver = driver
+            self.combinations = 0
+            self.slow_probes = 0
+
+        self.combinations += 1
+        try:
+            rss, latency = self._sample(driver)
+        except Exception as e:
+            return f"probe failed: {str(e)[:60]}"
+
+        if rss is not None and rss > self.max_rss_mb:
+            return f"browser RSS {rss:.0f} MB > {self.max_rss_mb} MB"
+        self.slow_probes = self.slow_probes + 1 if latency > self.max_latency_s else 0
+        if self.slow_probes >= LATENCY_STRIKES:
+            return f"WebDriver latency {latency:.1f}s > {self.max_latency_s}s ({self.slow_probes} probes)"
+        if self.recycle_every and self.combinations > self.recycle_every:
+            return f"{self.recycle_every} combinations on one session"
+        return None
+
+    def recycled(self, reason, new_driver):
+        # The combination that triggered the check runs on the new session
+        self.recycles.append({'at': time.strftime('%H:%M:%S'), 'reason': reason,
+                              'combinations': self.combinations - 1})
+        self.driver = new_driver
+        self.combinations = 1
+        self.slow_probes = 0
+
+    def report(self):
+        latencies = sorted(self.latencies)
+        return {
+            'rss_peak_mb': round(max(self.rss_samples), 1) if self.rss_samples else None,
+            'rss_median_mb': round(statistics.median(self.rss_samples), 1) if self.rss_samples else None,
+            'latency_median_s': round(statistics.median(latencies), 3) if latencies else None,
+            'latency_max_s': round(latencies[-1], 3) if latencies else None,
+            'recycles': self.recycles,
+            'limits': {'max_rss_mb': self.max_rss_mb, 'max_latency_s': self.max_latency_s,
+                       'recycle_every': self.recycle_every},
+        }
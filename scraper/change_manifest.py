@@ -0,0 +1,90 @@
+"""
+Per-run change manifest for the backend's cache
+After a changeset is written, a compact manifest of what it touched (university ids, changed
+fields, affected cities and types) is inserted into the scrape_changes collection. The backend
+polls that collection (backend/utils/scrapeChangePoller.js) and drops only the cached list pages,
+counts and city lists the run could have changed, instead of flushing everything or serving stale
+data until the TTL runs out.
+"""
+
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING
+
+COLLECTION = 'scrape_changes'
+# Old manifests are only needed by a backend that was down while they were written
+RETENTION_DAYS = 30
+
+
+def build_manifest(run_id, scraper, changeset, existing):
+    """Manifest for an applied changeset, or None if it changed nothing.
+    existing: the startup read (name -> stored doc), for the values changed documents had before"""
+    if changeset.is_empty():
+        return None
+
+    universities = []
+    fields = set()
+    cities = set()
+    types = set()
+    inserted_ids = getattr(changeset, 'inserted_ids', {})
+
+    for record in changeset.added:
+        universities.append({'id': inserted_ids.get(record['name']), 'name': record['name'],
+                             'change': 'added', 'fields': sorted(record)})
+        fields.update(record)
+        cities.add(record.get('city'))
+        types.add(record.get('type'))
+
+    for change in changeset.changed:
+        stored = existing.get(change['name'], {})
+        universities.append({'id': change['_id'], 'name': change['name'],
+                             'change': 'changed', 'fields': sorted(change['fields'])})
+        fields.update(change['fields'])
+        # A document moving city / type leaves cached lists under both the old and the new value
+        cities.update((stored.get('city'), change['fields'].get('city', stored.get('city'))))
+        types.update((stored.get('type'), change['fields'].get('type', stored.get('type'))))
+
+    return {
+        'runId': run_id,
+        'scraper': scraper,
+        'createdAt': datetime.now(timezone.utc),
+        'added': len(changeset.added),
+        'changed': len(changeset.changed),
+        'universities': universities,
+        'fields': sorted(fields),
+        'cities': sorted(c for c in cities if c),
+        'types': sorted(t for t in types if t),
+    }
+
+
+def publish_manifest(db, manifest):
+    """Insert the manifest for the backend poller; returns its _id"""
+    collection = db[COLLECTION]
+    collection.create_index([('createdAt', ASCENDING)], expireAfterSeconds=RETENTION_DAYS * 86400)
+    return collection.insert_one(manifest).inserted_id
+
+
+def manifest_report(manifest):
+    """JSON-friendly copy for the run report"""
+    report = dict(manifest)
+    report.pop('_id', None)
+    report['createdAt'] = manifest['createdAt'].isoformat()
+    report['universities'] = [{**u, 'id': str(u['id']) if u['id'] is not None else None}
+                              for u in manifest['universities']]
+    return report
+
+
+def publish_changes(db, run_report, changeset, existing):
+    """Build, save (change_manifest.json) and publish the manifest of an applied changeset.
+    A failed publish only costs the backend its targeted invalidation (entries expire on their TTL)"""
+    manifest = build_manifest(run_report.run_id, run_report.name, changeset, existing)
+    if manifest is None:
+        return None
+    run_report.write_json('change_manifest.json', manifest_report(manifest))
+    try:
+        publish_manifest(db, manifest)
+        print(f"   📣 Change manifest published ({len(manifest['universities'])} universities, "
+              f"{len(manifest['cities'])} cities)")
+    except Exception as e:
+        print(f"   ⚠️  Could not publish change manifest: {e}")
+    return manifest
@@ -0,0 +1,164 @@
+"""
+Scrape-vs-database changeset engine
+Loads existing universities with one projected read, diffs a scrape against them locally
+and writes back only the resulting changeset with batched bulk writes
+"""
+
+from pymongo import UpdateOne
+
+BULK_BATCH_SIZE = 500
+
+# Projection for the one bulk read at startup
+EXISTING_PROJECTION = {'name': 1, 'website': 1, 'city': 1, 'type': 1, 'disciplines': 1, 'charteredBy': 1,
+                       'hecTagged': 1}
+
+# Fields a scrape may fill on an existing document. Only empty/'Unknown' values are filled,
+# so admin edits are never overwritten (type is a guess from the name, so it is never updated)
+FILLABLE_FIELDS = ('website', 'city')
+
+# Fields read from HEC's own filters (filter index mode); these are kept in sync with HEC
+TAG_FIELDS = ('type', 'disciplines', 'charteredBy', 'hecTagged')
+
+CITY_PROVINCE_MAP = {
+    'Islamabad': 'Islamabad Capital Territory',
+    'Rawalpindi': 'Punjab',
+    'Lahore': 'Punjab',
+    'Karachi': 'Sindh',
+    'Peshawar': 'Khyber Pakhtunkhwa',
+    'Quetta': 'Balochistan',
+    'Faisalabad': 'Punjab',
+    'Multan': 'Punjab',
+    'Gujranwala': 'Punjab'
+}
+
+
+def build_university_record(uni_data):
+    """Scraped {name, location, link} -> University document fields"""
+    location = uni_data.get('location', '')
+    city = location.split(',')[0].strip() if location else 'Unknown'
+
+    # Normalize city name against the known cities
+    for city_name in CITY_PROVINCE_MAP:
+        if city_name.lower() in city.lower() or city_name.lower() in location.lower():
+            city = city_name
+            break
+
+    # Determine type from sector (if available in name or we can infer)
+    uni_type = 'Public'  # Default
+    if 'private' in uni_data['name'].lower() or 'private' in location.lower():
+        uni_type = 'Private'
+
+    return {
+        'name': uni_data['name'],
+        'city': city,
+        'type': uni_type,
+        'website': uni_data.get('link', ''),
+        'description': f"HEC Recognized University located in {location or city}"
+    }
+
+
+def tag_record(record, tags):
+    """Apply filter-index tags ({'sector': [...], 'discipline': [...], ...}) to a built record"""
+    sectors = tags.get('sector') or []
+    if sectors:
+        record['type'] = 'Private' if any('private' in s.lower() for s in sectors) else 'Public'
+    record['disciplines'] = sorted(tags.get('discipline') or [])
+    charters = sorted(tags.get('chartered_by') or [])
+    record['charteredBy'] = charters[0] if charters else ''
+    record['hecTagged'] = bool(sectors)
+    return record
+
+
+def load_existing_universities(universities_collection):
+    """name -> {_id, name, website, city, type} for every stored university (one query)"""
+    return {doc['name']: doc for doc in universities_collection.find({}, EXISTING_PROJECTION)}
+
+
+def is_empty(value):
+    return value in (None, '', 'Unknown')
+
+
+class Changeset:
+    """Result of diffing one scrape against the stored universities"""
+
+    def __init__(self):
+        self.added = []        # full records to insert
+        self.changed = []      # {'_id', 'name', 'fields'}
+        self.unchanged = []    # names
+        self.missing = []      # stored names not seen in this scrape
+        self.inserted_ids = {} # name -> _id of added records, filled by apply_changeset
+
+    def is_empty(self):
+        return not self.added and not self.changed
+
+    def summary(self):
+        return {
+            'added': len(self.added),
+            'changed': len(self.changed),
+            'unchanged': len(self.unchanged),
+            'missing_from_hec': len(self.missing),
+        }
+
+    def to_report(self, complete=True):
+        """Full changeset as JSON-serializable dict"""
+        return {
+            'summary': self.summary(),
+            # Only a complete sweep can say a university disappeared from HEC's list
+            'complete_sweep': complete,
+            'added': [r['name'] for r in self.added],
+            'changed': [{'name': c['name'], 'fields': c['fields']} for c in self.changed],
+            'missing_from_hec': self.missing,
+        }
+
+
+def diff_scrape(records, existing):
+    """records: name -> built record; existing: output of load_existing_universities"""
+    changeset = Changeset()
+    for name, record in records.items():
+        stored = existing.get(name)
+        if stored is None:
+            changeset.added.append(record)
+            continue
+        fields = {
+            field: record[field]
+            for field in FILLABLE_FIELDS
+            if is_empty(stored.get(field)) and not is_empty(record.get(field))
+        }
+        if record.get('hecTagged'):
+            # Tagged from HEC's filters, so the sector-based type replaces the name-based guess
+            fields.update({
+                field: record[field]
+                for field in TAG_FIELDS
+                if record.get(field) not in (None, '', []) and record[field] != stored.get(field)
+            })
+        if fields:
+            changeset.changed.append({'_id': stored['_id'], 'name': name, 'fields': fields})
+        else:
+            changeset.unchanged.append(name)
+    changeset.missing = sorted(name for name in existing if name not in records)
+    return changeset
+
+
+def apply_changeset(universities_collection, changeset, batch_size=BULK_BATCH_SIZE, session=None):
+    """Write the changeset with batched, idempotent bulk writes; returns (inserted, modified)"""
+    operations = [
+        # $setOnInsert + upsert: re-applying the same changeset never creates duplicates
+        UpdateOne({'name': record['name']}, {'$setOnInsert': record}, upsert=True)
+        for record in changeset.added
+    ]
+    operations += [
+        UpdateOne({'_id': change['_id']}, {'$set': change['fields']})
+        for change in changeset.changed
+    ]
+
+    inserted = 0
+    modified = 0
+    for start in range(0, len(operations), batch_size):
+        result = universities_collection.bulk_write(operations[start:start + batch_size], ordered=False,
+                                                    session=session)
+        inserted += result.upserted_count
+        modified += result.modified_count
+        for index, _id in result.upserted_ids.items():
+            if start + index < len(changeset.added):
+                changeset.inserted_ids[changeset.added[start + index]['name']] = _id
+    return inserted, modified
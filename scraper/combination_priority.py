@@ -0,0 +1,96 @@
+"""
+Yield-aware combination order
+Ranks filter combinations from the membership recorded in previous runs' snapshots, so the
+combinations that surface the most universities come first and a time-boxed run captures most of
+the data early. The order is a greedy cover: each pick is the combination adding the most
+universities not already covered by earlier picks, ties broken by how many universities it was the
+first to reveal across runs. Combinations never scraped before come next (they may hold anything),
+then the ones that only repeat covered universities, then the ones that were always empty.
+"""
+
+import heapq
+
+from run_snapshots import combination_key, comparable_runs, load_manifest, load_snapshot
+
+DEFAULT_HISTORY_RUNS = 5
+
+
+def load_history(max_runs=DEFAULT_HISTORY_RUNS):
+    """Membership (combination key -> names) of the newest full-scraper snapshots, oldest first.
+    Partial runs (time-budgeted, skipped or failed combinations) count too: a snapshot only holds the
+    combinations its run read, so the rest stay "never scraped" rather than looking empty"""
+    runs = comparable_runs(load_manifest(), 'scrape', include_partial=True)[-max_runs:]
+    history = []
+    for run in runs:
+        try:
+            history.append(load_snapshot(run).membership)
+        except (OSError, ValueError):
+            continue
+    return history
+
+
+def yield_stats(history):
+    """Per key: union of members over all runs, and how many universities it revealed first"""
+    members = {}
+    revealed = {}
+    seen = set()
+    for membership in history:
+        new_this_run = {}
+        for key, names in membership.items():
+            members.setdefault(key, set()).update(names)
+            for name in names - seen:
+                new_this_run.setdefault(name, []).append(key)
+        for name, keys in new_this_run.items():
+            for key in keys:
+                revealed[key] = revealed.get(key, 0) + 1
+        seen.update(new_this_run)
+    return members, revealed
+
+
+def rank_combinations(combinations, history):
+    """Reorder combination tuples by historical yield; returns (ordered, stats)"""
+    members, revealed = yield_stats(history)
+    keys = [combination_key(*combination) for combination in combinations]
+
+    # Lazy greedy cover: a popped entry's gain can only have shrunk, so re-score it and push it back
+    # unless it still beats the next best
+    heap = [(-len(members[key]), -revealed.get(key, 0), index)
+            for index, key in enumerate(keys) if members.get(key)]
+    heapq.heapify(heap)
+    covered = set()
+    ranked = []
+    coverage = []
+    while heap:
+        _, tiebreak, index = heapq.heappop(heap)
+        gain = len(members[keys[index]] - covered)
+        if gain == 0:
+            break
+        if heap and -heap[0][0] > gain:
+            heapq.heappush(heap, (-gain, tiebreak, index))
+            continue
+        covered |= members[keys[index]]
+        ranked.append(index)
+        coverage.append(len(covered))
+
+    picked = set(ranked)
+    unknown = [i for i, key in enumerate(keys) if key not in members]
+    redundant = sorted((i for i, key in enumerate(keys) if members.get(key) and i not in picked),
+                       key=lambda i: (-revealed.get(keys[i], 0), -len(members[keys[i]]), i))
+    empty = [i for i, key in enumerate(keys) if key in members and not members[key]]
+    order = ranked + unknown + redundant + empty
+
+    total = len(covered)
+    stats = {
+        'history_runs': len(history),
+        'known_universities': total,
+        'productive': len(ranked),
+        'never_scraped': len(unknown),
+        'redundant': len(redundant),
+        'empty': len(empty),
+        # Combinations needed to reach a share of the universities seen in history
+        'combinations_for_coverage': {
+            f"{share}%": next((n + 1 for n, count in enumerate(coverage) if count * 100 >= total * share), None)
+            for share in (50, 90, 99, 100)
+        } if total else {},
+    }
+    return [combinations[i] for i in order], stats
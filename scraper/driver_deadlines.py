@@ -0,0 +1,202 @@
+"""
+Hard deadlines for WebDriver calls
+Every command a driver sends (navigation, scripts, find_elements, element reads) goes through
+driver.execute, so install() wraps that one method: each call is registered with a deadline and a
+watchdog thread kills the session's processes once a call (or the whole combination attempt) runs
+past it. The blocked call then fails at once, later calls on the abandoned session fail immediately
+with a "Connection abandoned" error, and the scraper's usual connection-lost path replaces the session.
+A single hung reload can no longer stall the sweep for the HTTP client's default timeout.
+"""
+
+import math
+import threading
+import time
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from browser_watchdog import PSUTIL_AVAILABLE, driver_pid
+
+if PSUTIL_AVAILABLE:
+    import psutil
+
+DEFAULT_CALL_DEADLINE_S = 30
+# The HEC listing takes 60-120s to load (setup_driver's page-load timeout is 120s as well)
+DEFAULT_PAGE_DEADLINE_S = 120
+DEFAULT_COMBINATION_DEADLINE_S = 180
+# The browser's own page-load / script timeouts get the first chance; the watchdog kills after this
+GRACE_S = 5
+POLL_INTERVAL_S = 0.25
+# Commands that wait for a navigation
+PAGE_COMMANDS = {Command.GET, Command.REFRESH, Command.GO_BACK, Command.GO_FORWARD}
+
+
+class DeadlineExceeded(WebDriverException):
+    """Raised for calls on a session the watchdog abandoned"""
+
+
+def percentile(sorted_values, share):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(share * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def kill_session(driver):
+    """Kill chromedriver and the browser under it; whatever call is blocked on them returns at once"""
+    pid = driver_pid(driver)
+    if PSUTIL_AVAILABLE and pid:
+        try:
+            root = psutil.Process(pid)
+            for process in [*root.children(recursive=True), root]:
+                try:
+                    process.kill()
+                except psutil.Error:
+                    continue
+            return
+        except psutil.Error:
+            pass
+    try:
+        driver.service.process.kill()
+    except Exception:
+        pass
+
+
+class DriverDeadlines:
+    """install(driver) after every launch; wrap each combination attempt in begin/end_combination()"""
+
+    def __init__(self, call_s=DEFAULT_CALL_DEADLINE_S, page_s=DEFAULT_PAGE_DEADLINE_S,
+                 combination_s=DEFAULT_COMBINATION_DEADLINE_S):
+        self.call_s = call_s
+        self.page_s = page_s
+        self.combination_s = combination_s
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._combination_deadline = None
+        self._current_driver = None
+        self._thread = None
+        self._stop = threading.Event()
+        self.abandoned = []
+        self.latencies = []
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._monitor, name='driver-deadlines', daemon=True)
+            self._thread.start()
+
+    def _monitor(self):
+        while not self._stop.wait(POLL_INTERVAL_S):
+            now = time.monotonic()
+            expired = []
+            with self._lock:
+                for driver, command, limit, deadline in self._calls.values():
+                    if now > deadline:
+                        expired.append((driver, f"'{command}' exceeded its {limit:g}s deadline"))
+                if self._combination_deadline is not None and now > self._combination_deadline:
+                    # One trip per attempt: the replacement session gets a fresh deadline
+                    self._combination_deadline = None
+                    if self._current_driver is not None:
+                        expired.append((self._current_driver,
+                                        f"combination exceeded its {self.combination_s:g}s deadline"))
+            for driver, reason in expired:
+                self._abandon(driver, reason)
+
+    def _abandon(self, driver, reason):
+        if getattr(driver, '_deadline_abandoned', None):
+            return
+        driver._deadline_abandoned = reason
+        self.abandoned.append({'at': time.strftime('%H:%M:%S'), 'reason': reason})
+        print(f"   ⏰ Abandoning browser session: {reason}")
+        kill_session(driver)
+
+    def install(self, driver):
+        """Route every command of this driver through the deadline check; returns the driver"""
+        if getattr(driver, '_deadline_guard', None) is self:
+            return driver
+        execute = driver.execute
+        deadlines = self
+
+        def guarded_execute(driver_command, params=None):
+            reason = getattr(driver, '_deadline_abandoned', None)
+            if reason:
+                raise DeadlineExceeded(f"Connection abandoned: {reason}")
+            limit = deadlines.page_s if driver_command in PAGE_COMMANDS else deadlines.call_s
+            token = deadlines._begin_call(driver, driver_command, limit)
+            try:
+                return execute(driver_command, params)
+            except Exception as e:
+                reason = getattr(driver, '_deadline_abandoned', None)
+                if reason:
+                    raise DeadlineExceeded(f"Connection abandoned: {reason}") from e
+                raise
+            finally:
+                deadlines._end_call(token)
+
+        driver.execute = guarded_execute
+        driver._deadline_guard = self
+        # Let the browser time out by itself first; the watchdog only steps in when it does not.
+        # A longer page-load timeout set by the caller wins, and the page deadline follows it
+        try:
+            if self.page_s:
+                self.page_s = max(self.page_s, driver.timeouts.page_load or 0)
+                driver.set_page_load_timeout(self.page_s)
+            if self.call_s:
+                driver.set_script_timeout(self.call_s)
+        except Exception:
+            pass
+        self._start()
+        return driver
+
+    def _begin_call(self, driver, command, limit):
+        token = object()
+        with self._lock:
+            self._current_driver = driver
+            if limit:
+                self._calls[token] = (driver, command, limit, time.monotonic() + limit + GRACE_S)
+        return token
+
+    def _end_call(self, token):
+        with self._lock:
+            self._calls.pop(token, None)
+
+    def begin_combination(self):
+        if self.combination_s:
+            with self._lock:
+                self._combination_deadline = time.monotonic() + self.combination_s
+
+    def end_combination(self):
+        with self._lock:
+            self._combination_deadline = None
+
+    def is_abandoned(self, driver):
+        return bool(getattr(driver, '_deadline_abandoned', None))
+
+    def record_latency(self, seconds):
+        """Wall time of one combination, retries included"""
+        self.latencies.append(seconds)
+
+    def reset_stats(self):
+        self.abandoned = []
+        self.latencies = []
+
+    def close(self):
+        self._stop.set()
+
+    def report(self):
+        latencies = sorted(self.latencies)
+
+        def rounded(value):
+            return round(value, 2) if value is not None else None
+
+        return {
+            'deadlines_s': {'call': self.call_s, 'page': self.page_s, 'combination': self.combination_s},
+            'combination_latency_s': {
+                'count': len(latencies),
+                'p50': rounded(percentile(latencies, 0.5)),
+                'p90': rounded(percentile(latencies, 0.9)),
+                'p99': rounded(percentile(latencies, 0.99)),
+                'max': rounded(latencies[-1] if latencies else None),
+            },
+            'abandoned_sessions': self.abandoned,
+        }
@@ -0,0 +1,356 @@
+"""
+Concurrent University Website Enrichment Crawler
+Fetches university homepages with asyncio and fills scrapedSummary / scrapedHighlights / scrapedAt
+(same extraction as backend/scripts/enrichUniversitiesFromWebsites.js, without the serial 2 second delay)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import aiohttp
+from bs4 import BeautifulSoup
+from pymongo import MongoClient, UpdateOne
+from dotenv import load_dotenv
+
+from http_cache import CacheResult, ResponseCache
+
+# Load environment variables
+load_dotenv()
+
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/manzil')
+
+UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
+REQUEST_HEADERS = {
+    'User-Agent': UA,
+    'Accept': 'text/html,application/xhtml+xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+DEFAULT_CONCURRENCY = 16     # Requests in flight across all hosts
+DEFAULT_PER_HOST = 2         # Open connections per host
+DEFAULT_HOST_DELAY = 1.0     # Seconds between two requests to the same host
+DEFAULT_TIMEOUT = 25         # Seconds per request (same as the JS axios timeout)
+BULK_BATCH_SIZE = 200
+
+# Statuses that mean "bot/WAF block" - only these go to the browser fallback
+BLOCKED_STATUSES = {401, 403, 429}
+
+
+class BlockedError(Exception):
+    """Host answered with a bot-block style status"""
+
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+def normalize_url(raw):
+    """Return an absolute http(s) URL or None"""
+    if not raw or not isinstance(raw, str):
+        return None
+    url = raw.strip()
+    if not url:
+        return None
+    if not re.match(r'^https?://', url, re.IGNORECASE):
+        url = f"https://{url}"
+    parsed = urlparse(url)
+    if not parsed.netloc:
+        return None
+    return url
+
+
+def extract_from_html(html, page_url):
+    """Meta description + visible text -> summary and highlight sentences"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript', 'svg', 'iframe']):
+        tag.decompose()
+
+    meta_desc = ''
+    for attrs in ({'name': 'description'}, {'property': 'og:description'}):
+        meta = soup.find('meta', attrs=attrs)
+        if meta and meta.get('content'):
+            meta_desc = meta['content']
+            break
+
+    main_text = ''
+    main = soup.select_one('main, article, #content, .content, #main-content')
+    if main:
+        main_text = main.get_text(' ')
+    if not main_text or len(main_text) < 40:
+        body = soup.body or soup
+        main_text = body.get_text(' ')
+    main_text = ' '.join(main_text.split())
+
+    summary = meta_desc.strip()
+    if len(summary) < 80 and main_text:
+        summary = main_text[:1800]
+    elif main_text and len(summary) < 400:
+        summary = f"{summary}\n\n{main_text[:1200]}".strip()
+    summary = summary[:7500]
+
+    highlights = []
+    for sentence in re.split(r'(?<=[.!?])\s+', summary):
+        sentence = sentence.strip()
+        if len(sentence) < 25 or len(sentence) > 320:
+            continue
+        highlights.append(sentence)
+        if len(highlights) >= 6:
+            break
+
+    return {'summary': summary or None, 'highlights': highlights, 'source_url': page_url}
+
+
+class HostPoliteness:
+    """Spaces out requests to the same host (connection count is capped by the connector)"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.locks = {}
+        self.last_request = {}
+
+    async def wait(self, host):
+        lock = self.locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            elapsed = time.monotonic() - self.last_request.get(host, 0)
+            if elapsed < self.delay:
+                await asyncio.sleep(self.delay - elapsed)
+            self.last_request[host] = time.monotonic()
+
+
+class BrowserFallback:
+    """One shared headless Chrome, used only for hosts that block plain HTTP clients"""
+
+    def __init__(self):
+        self.driver = None
+        self.lock = asyncio.Lock()
+
+    def _fetch_sync(self, url):
+        if self.driver is None:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+
+            chrome_options = Options()
+            chrome_options.add_argument('--headless=new')
+            chrome_options.add_argument('--no-sandbox')
+            chrome_options.add_argument('--disable-dev-shm-usage')
+            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+            chrome_options.add_argument(f'--user-agent={UA}')
+            chrome_options.page_load_strategy = 'eager'
+            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver.set_page_load_timeout(60)
+        self.driver.get(url)
+        time.sleep(2)
+        return self.driver.page_source
+
+    async def fetch(self, url):
+        # Selenium is blocking and not thread-safe: one page at a time, off the event loop
+        async with self.lock:
+            return await asyncio.to_thread(self._fetch_sync, url)
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+
+async def fetch_html(session, url, cache=None):
+    """GET a page (conditionally when cached); returns a CacheResult"""
+    headers = cache.conditional_headers(url) if cache else {}
+    async with session.get(url, headers=headers, allow_redirects=True, max_redirects=5) as resp:
+        if resp.status == 304 and cache:
+            return cache.not_modified(url)
+        if resp.status in BLOCKED_STATUSES:
+            raise BlockedError(resp.status)
+        if resp.status >= 400:
+            raise Exception(f"HTTP {resp.status}")
+        content_type = resp.headers.get('Content-Type', '')
+        if 'text/html' not in content_type and 'application/xhtml' not in content_type:
+            raise Exception(f"Unexpected content-type: {content_type}")
+        raw = await resp.read()
+        html = raw.decode(resp.charset or 'utf-8', errors='replace')
+        if cache:
+            return cache.store(url, resp.headers, raw)._replace(body=html)
+        return CacheResult('new', html, None)
+
+
+async def enrich_one(session, politeness, browser, record, use_browser, cache=None):
+    """Fetch and extract a single university; never raises"""
+    result = {'_id': record.get('_id'), 'name': record.get('name'), 'url': None, 'via': 'http', 'cache': None}
+    url = normalize_url(record.get('website') or record.get('link'))
+    if not url:
+        result['error'] = 'bad URL'
+        return result
+    result['url'] = url
+
+    try:
+        await politeness.wait(urlparse(url).netloc.lower())
+        try:
+            fetched = await fetch_html(session, url, cache)
+            result['cache'], html = fetched.status, fetched.body
+        except BlockedError:
+            if not use_browser:
+                raise
+            result['via'] = 'browser'
+            html = await browser.fetch(url)
+        if result['cache'] in ('not_modified', 'unchanged'):
+            if record.get('scrapedSummary'):
+                # Same page as last run and already stored: nothing to parse, nothing to write
+                return result
+            # Cached by an earlier run (or record) whose extraction never reached this record
+            html = html if html is not None else cache.cached_body(url)
+            if html is None:
+                result['error'] = 'cached body missing'
+                return result
+        # Parsing is CPU-bound, keep it off the event loop
+        result.update(await asyncio.to_thread(extract_from_html, html, url))
+        if not result.get('summary'):
+            result['error'] = 'no text extracted'
+    except asyncio.TimeoutError:
+        result['error'] = 'timeout'
+    except Exception as e:
+        result['error'] = str(e)[:120] or e.__class__.__name__
+    return result
+
+
+async def enrich_records(records, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                         host_delay=DEFAULT_HOST_DELAY, timeout=DEFAULT_TIMEOUT, use_browser=True, cache=None):
+    """Crawl all records concurrently and return one result dict per record"""
+    # ssl=False: many .edu.pk sites serve incomplete certificate chains (same as the JS script)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ssl=False, ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout, connect=min(10, timeout))
+    politeness = HostPoliteness(host_delay)
+    browser = BrowserFallback()
+    results = []
+
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                         headers=REQUEST_HEADERS) as session:
+            tasks = [enrich_one(session, politeness, browser, record, use_browser, cache) for record in records]
+            for done, coro in enumerate(asyncio.as_completed(tasks), 1):
+                result = await coro
+                results.append(result)
+                if result.get('error'):
+                    status = f"FAIL: {result['error']}"
+                elif result['cache'] in ('not_modified', 'unchanged') and not result.get('summary'):
+                    status = f"cached ({result['cache']})"
+                else:
+                    status = f"ok ({len(result['summary'])} chars, {result['via']})"
+                print(f"   [{done}/{len(tasks)}] {(result['name'] or '')[:50]} … {status}")
+    finally:
+        browser.close()
+
+    return results
+
+
+def load_records(args, universities_collection):
+    """Records to crawl: scraper output file (--input) or universities with a website in MongoDB"""
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+    else:
+        query = {'website': {'$exists': True, '$nin': [None, '']}}
+        if args.id:
+            from bson import ObjectId
+            query['_id'] = ObjectId(args.id)
+        records = list(universities_collection.find(query, {'name': 1, 'website': 1, 'scrapedSummary': 1})
+                       .sort('name', 1))
+    if args.limit:
+        records = records[:args.limit]
+    return records
+
+
+def save_results(universities_collection, results):
+    """Write successful extractions back with batched bulk updates"""
+    now = datetime.now(timezone.utc)
+    operations = []
+    for result in results:
+        if result.get('error') or not result.get('summary'):
+            continue
+        selector = {'_id': result['_id']} if result.get('_id') else {'name': result['name']}
+        operations.append(UpdateOne(selector, {'$set': {
+            'scrapedSummary': result['summary'],
+            'scrapedHighlights': result['highlights'],
+            'scrapedAt': now,
+            'scrapedSourceUrl': result['source_url'],
+        }}))
+
+    modified = 0
+    for start in range(0, len(operations), BULK_BATCH_SIZE):
+        outcome = universities_collection.bulk_write(operations[start:start + BULK_BATCH_SIZE], ordered=False)
+        modified += outcome.modified_count
+    return modified
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Concurrently enrich universities from their websites')
+    parser.add_argument('--input', help='JSON list of scraped universities (name + link/website) instead of MongoDB')
+    parser.add_argument('--id', help='Only enrich the university with this ObjectId')
+    parser.add_argument('--limit', type=int, help='Only process the first N universities')
+    parser.add_argument('--dry-run', action='store_true', help='Crawl and extract, but do not write to MongoDB')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Max requests in flight')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST, help='Max connections per host')
+    parser.add_argument('--host-delay', type=float, default=DEFAULT_HOST_DELAY, help='Seconds between requests to one host')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Seconds per request')
+    parser.add_argument('--no-browser', action='store_true', help='Do not fall back to Chrome for blocked hosts')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the on-disk HTTP cache and refetch everything')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("🚀 Starting concurrent website enrichment...\n")
+
+    client = None
+    universities_collection = None
+    if not (args.dry_run and args.input):
+        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+        universities_collection = client['manzil']['universities']
+
+    try:
+        records = load_records(args, universities_collection)
+        print(f"📊 Processing {len(records)} universities "
+              f"(concurrency={args.concurrency}, per-host={args.per_host}, dryRun={args.dry_run})\n")
+
+        cache = None if args.no_cache else ResponseCache()
+        started = time.monotonic()
+        results = asyncio.run(enrich_records(
+            records,
+            concurrency=args.concurrency,
+            per_host=args.per_host,
+            host_delay=args.host_delay,
+            timeout=args.timeout,
+            use_browser=not args.no_browser,
+            cache=cache,
+        ))
+        elapsed = time.monotonic() - started
+
+        ok = sum(1 for r in results if not r.get('error'))
+        via_browser = sum(1 for r in results if r.get('via') == 'browser' and not r.get('error'))
+        print(f"\n✅ Crawl complete in {elapsed:.1f}s: OK={ok} FAIL={len(results) - ok} (browser fallback: {via_browser})")
+        if cache:
+            cache.print_report()
+
+        if not args.dry_run:
+            modified = save_results(universities_collection, results)
+            print(f"💾 Updated {modified} universities")
+            # Validators are only kept once the extractions they stand for are stored; a dry run or a
+            # failed write leaves the cache as it was, so the next run parses those pages again
+            if cache:
+                cache.save()
+    finally:
+        if client:
+            client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""
+Extraction strategy selection
+The listing can be read with several locators (a text XPath on <li>, every <li> filtered by text,
+card/item divs, or any element mentioning "University" and its parent). Instead of trying them in
+turn on every page, a health check times each one once against a page with results and picks the
+cheapest that yields as many valid records as the best. The pick is cached in
+.selector_cache.json under a hash of the page's structure, so later runs reuse it without
+re-checking; a page that suddenly yields nothing while still showing university text, or fewer
+records than the page's row probe counts, triggers a new check (the structure changed).
+
+Rows are read in two phases: one script call returns every row's stable key (its name line and first
+link), and only rows whose name has not been seen this run are parsed in full. A combination that
+repeats known universities costs two WebDriver calls instead of several per row.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+from selenium.webdriver.common.by import By
+
+from result_state import PROBE_JS
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.selector_cache.json')
+# A strategy must find this share of the best strategy's records to be picked: a locator that misses
+# rows would do so silently on every later run, since the pick is cached
+MIN_SHARE = 1.0
+
+LI_TEXT_XPATH = "//li[contains(text(), 'University') or contains(text(), 'Institute') or contains(text(), 'College')]"
+KEYWORDS = ('University', 'Institute', 'College')
+PROVINCE_HINTS = ('Punjab', 'Sindh', 'Khyber', 'Islamabad')
+
+# Tag/id/class skeleton of the page; repeated siblings collapse to one signature so the hash does
+# not depend on how many results are listed
+STRUCTURE_JS = """
+function sig(el, depth) {
+    var s = el.tagName.toLowerCase() + (el.id ? '#' + el.id : '') +
+            (typeof el.className === 'string' && el.className ? '.' + el.className.trim().split(/\\s+/).sort().join('.') : '');
+    if (depth > 0 && el.children.length) {
+        var seen = {}, parts = [];
+        for (var i = 0; i < el.children.length; i++) {
+            var tag = el.children[i].tagName;
+            if (tag === 'SCRIPT' || tag === 'STYLE' || tag === 'OPTION') { continue; }
+            var child = sig(el.children[i], depth - 1);
+            if (!seen[child]) { seen[child] = true; parts.push(child); }
+        }
+        s += '(' + parts.join(',') + ')';
+    }
+    return s;
+}
+return sig(document.body, 14);
+"""
+
+# Elements whose own text names an institution (outside the filter dropdowns)
+TEXT_PROBE_JS = """
+var count = 0, walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+while (walker.nextNode()) {
+    var node = walker.currentNode, parent = node.parentNode;
+    if (!parent || parent.closest('select, script, style')) { continue; }
+    if (/University|Institute|College/.test(node.nodeValue)) { count++; }
+}
+return count;
+"""
+
+# Name line and first link of each element passed in (same name rules as parse_university_elements)
+ROW_KEYS_JS = """
+var rows = arguments[0], keys = [];
+for (var i = 0; i < rows.length; i++) {
+    var text = (rows[i].innerText || rows[i].textContent || '').trim(), name = '';
+    var lines = text.split('\\n');
+    for (var j = 0; j < lines.length; j++) {
+        if (lines[j].trim()) { name = lines[j].trim().split(/\\s+/).join(' '); break; }
+    }
+    var anchor = rows[i].getElementsByTagName('a')[0];
+    keys.push({name: name, link: anchor && anchor.getAttribute('href') ? anchor.href : ''});
+}
+return keys;
+"""
+
+
+def find_li_text(driver):
+    return driver.find_elements(By.XPATH, LI_TEXT_XPATH)
+
+
+def find_li_filtered(driver):
+    return [li for li in driver.find_elements(By.XPATH, "//li") if any(k in li.text for k in KEYWORDS)]
+
+
+def find_cards(driver):
+    divs = driver.find_elements(By.XPATH, "//div[contains(@class, 'card') or contains(@class, 'item')]")
+    return [div for div in divs if 'University' in div.text or 'Institute' in div.text]
+
+
+def find_text_parents(driver):
+    parents = []
+    for elem in driver.find_elements(By.XPATH, "//*[contains(text(), 'University') or contains(text(), 'Institute')]"):
+        parent = elem.find_element(By.XPATH, "./..")
+        if parent and parent not in parents:
+            parents.append(parent)
+    return parents
+
+
+# Fallback order of the original cascade
+STRATEGIES = (
+    ('li_text', find_li_text),
+    ('li_filtered', find_li_filtered),
+    ('cards', find_cards),
+    ('text_parent', find_text_parents),
+)
+STRATEGY_FINDERS = dict(STRATEGIES)
+
+
+def parse_university_elements(elements):
+    """Listing elements -> [{name, location, link}] (first line name, second line location)"""
+    universities = []
+    for li in elements:
+        try:
+            text = li.text.strip()
+            if not text or len(text) < 10:
+                continue
+
+            # Skip if it's just a header or filter text
+            if text.lower() in ['university', 'universities', 'select all', 'filter']:
+                continue
+
+            # Extract university name (first line usually)
+            lines = [line.strip() for line in text.split('\n') if line.strip()]
+            if not lines:
+                continue
+
+            # Clean name - remove extra whitespace and special chars
+            name = ' '.join(lines[0].split())
+            name = re.sub(r'\s+', ' ', name)
+
+            # Skip if name is too short or doesn't contain keywords
+            if len(name) < 5 or not any(k in name for k in KEYWORDS):
+                continue
+
+            # Extract location (usually second line or in parentheses)
+            location = ''
+            if len(lines) > 1:
+                # Take second line as location
+                location = lines[1]
+                # Sometimes location is in third line
+                if len(lines) > 2 and any(hint in lines[2] for hint in PROVINCE_HINTS):
+                    location = lines[1] + ', ' + lines[2]
+            else:
+                # Try to find in parentheses
+                location_match = re.search(r'\(([^)]+)\)', text)
+                if location_match:
+                    location = location_match.group(1).strip()
+
+            # Clean location - remove extra whitespace
+            location = ' '.join(location.split()) if location else ''
+
+            # Extract link if available
+            link = ''
+            anchors = li.find_elements(By.TAG_NAME, 'a')
+            if anchors:
+                link = anchors[0].get_attribute('href') or ''
+
+            # Validate and add
+            if name and name not in [u['name'] for u in universities]:
+                universities.append({
+                    'name': name,
+                    'location': location,
+                    'link': link
+                })
+        except Exception:
+            continue
+    return universities
+
+
+def parse_unseen_elements(driver, elements, seen):
+    """Two-phase parse: keys for all rows in one call, full parse only for names not in `seen`.
+    Returns (universities, rows parsed in full); known rows come back with name and link only"""
+    if not seen or not elements:
+        return parse_university_elements(elements), len(elements)
+    try:
+        keys = driver.execute_script(ROW_KEYS_JS, elements)
+    except Exception:
+        return parse_university_elements(elements), len(elements)
+
+    known = {}
+    unseen = []
+    for element, key in zip(elements, keys or []):
+        name = (key or {}).get('name')
+        if name and name in seen:
+            known.setdefault(name, {'name': name, 'location': '', 'link': key.get('link') or ''})
+        else:
+            unseen.append(element)
+    universities = parse_university_elements(unseen)
+    parsed = {u['name'] for u in universities}
+    universities += [u for name, u in known.items() if name not in parsed]
+    return universities, len(unseen)
+
+
+def structure_hash(driver):
+    return hashlib.sha1(driver.execute_script(STRUCTURE_JS).encode('utf-8')).hexdigest()[:16]
+
+
+def shows_universities(driver):
+    """True if the page text still names institutions (used when the chosen strategy finds nothing)"""
+    try:
+        return driver.execute_script(TEXT_PROBE_JS) > 0
+    except Exception:
+        return True
+
+
+def listed_rows(driver):
+    """Rows the results-state probe counts on the page (list items naming an institution)"""
+    try:
+        return driver.execute_script(PROBE_JS)['rows']
+    except Exception:
+        return 0
+
+
+def evaluate_strategies(driver):
+    """Time every strategy once on the current page; [{strategy, records, seconds}] in cascade order"""
+    results = []
+    for name, finder in STRATEGIES:
+        started = time.perf_counter()
+        try:
+            records = len(parse_university_elements(finder(driver)))
+            error = None
+        except Exception as e:
+            records, error = 0, str(e)[:80]
+        results.append({'strategy': name, 'records': records,
+                        'seconds': round(time.perf_counter() - started, 3), 'error': error})
+    return results
+
+
+def choose_strategy(results):
+    """Cheapest strategy with at least MIN_SHARE of the best record count, or None"""
+    best = max((r['records'] for r in results), default=0)
+    if best == 0:
+        return None
+    candidates = [r for r in results if r['records'] >= best * MIN_SHARE]
+    return min(candidates, key=lambda r: r['seconds'])['strategy']
+
+
+def load_cache(path=CACHE_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, path=CACHE_FILE):
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def health_check(driver, use_cache=True, path=CACHE_FILE):
+    """Strategy for the current page (which must list results): cached by structure hash, else measured.
+    Returns (strategy or None, structure hash, evaluation results or None if it came from the cache)"""
+    page_hash = structure_hash(driver)
+    cache = load_cache(path)
+    if use_cache and page_hash in cache:
+        return cache[page_hash]['strategy'], page_hash, None
+    results = evaluate_strategies(driver)
+    strategy = choose_strategy(results)
+    if strategy:
+        cache[page_hash] = {'strategy': strategy, 'checked_at': datetime.now().isoformat(timespec='seconds'),
+                            'results': results}
+        save_cache(cache, path)
+    return strategy, page_hash, results
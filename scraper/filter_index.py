@@ -0,0 +1,76 @@
+"""
+Filter-membership inverted index
+Each filter option is queried once on its own (every other filter on "Select All") and the listed
+universities are kept as a bitmap per option. Any combination's membership is then the AND of its
+options' bitmaps, so the sweep costs one query per option (a sum) instead of one per combination (a
+product), and every university comes out tagged with the sector, charter and disciplines it is
+listed under.
+"""
+
+SELECT_ALL = 'Select All'
+
+
+class FilterIndex:
+    """(field, option) -> bitmap of university names"""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.names = []
+        self.bit_of = {}
+        self.bitmaps = {}
+        self.universe = None      # Everything listed with all filters on "Select All"
+        self.failed = []          # (field, option) queries that could not be read
+
+    def _bitmap(self, names):
+        bitmap = 0
+        for name in names:
+            bit = self.bit_of.get(name)
+            if bit is None:
+                bit = self.bit_of[name] = len(self.names)
+                self.names.append(name)
+            bitmap |= 1 << bit
+        return bitmap
+
+    def add(self, field, option, names):
+        """Results of one query; field None is the all-"Select All" query"""
+        bitmap = self._bitmap(names)
+        if field is None:
+            self.universe = bitmap
+        else:
+            self.bitmaps[(field, option)] = bitmap
+
+    def members(self, combination):
+        """Names listed for a combination tuple (in field order), or None if one of its options was not read"""
+        bitmap = self.universe if self.universe is not None else (1 << len(self.names)) - 1
+        for field, option in zip(self.fields, combination):
+            if option == SELECT_ALL:
+                continue
+            option_bitmap = self.bitmaps.get((field, option))
+            if option_bitmap is None:
+                return None
+            bitmap &= option_bitmap
+        return self.names_in(bitmap)
+
+    def names_in(self, bitmap):
+        names = []
+        while bitmap:
+            low = bitmap & -bitmap
+            names.append(self.names[low.bit_length() - 1])
+            bitmap ^= low
+        return names
+
+    def tags(self):
+        """name -> {field: [options it is listed under]}"""
+        tags = {name: {field: [] for field in self.fields} for name in self.names}
+        for (field, option), bitmap in self.bitmaps.items():
+            for name in self.names_in(bitmap):
+                tags[name][field].append(option)
+        return tags
+
+    def summary(self, combination_count):
+        return {
+            'queries': len(self.bitmaps) + (self.universe is not None),
+            'failed_queries': [f"{field}={option}" for field, option in self.failed],
+            'combinations_derived': combination_count,
+            'universities': len(self.names),
+        }
@@ -0,0 +1,275 @@
+"""
+Near-Duplicate University Finder
+Builds a trigram inverted index over stored and scraped university names and writes
+a merge-candidates report for backend/scripts/mergeDuplicateUniversities.js --candidates=<file>
+
+Usage:
+    python find_duplicate_universities.py
+    python find_duplicate_universities.py --self-check
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+from pymongo import MongoClient
+from dotenv import load_dotenv
+
+from university_names import KNOWN_ALIASES, acronym, name_aliases, normalize_name, strip_qualifiers
+
+# Load environment variables
+load_dotenv()
+
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/manzil')
+SCRAPED_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hec_universities_scraped.json')
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'merge_candidates.json')
+
+DEFAULT_THRESHOLD = 0.6
+# Trigrams shared by more than this share of names ('uni', 'ver', 'sit', ...) do not generate candidates
+MAX_DF_RATIO = 0.1
+SEGMENT_MATCH_SCORE = 0.9
+# '... (AIOU)' vs 'AIOU - ...': the extra part is only the name's own abbreviation
+ALIAS_MATCH_SCORE = 0.95
+# Row markers that say nothing about which institution a name is
+MARKER_QUALIFIERS = {'reference', 'duplicate'}
+
+
+def qualifiers(name):
+    """Normalized parenthesized parts ('(Sheringal)', '(AIOU)'), without '(reference)' markers"""
+    parts = {normalize_name(inner) for inner in re.findall(r'\(([^)]*)\)', name or '')}
+    return {part for part in parts if part and part not in MARKER_QUALIFIERS}
+
+
+def abbreviations(name):
+    """Short forms a name can go by: acronyms of its aliases ('gcu' for '... University, Lahore') and
+    KNOWN_ALIASES entries for it"""
+    short = {acronym(alias) for alias in name_aliases(name)}
+    core = core_name(name)
+    short.update(alias for alias, full in KNOWN_ALIASES.items() if normalize_name(full) == core)
+    short.discard('')
+    return short
+
+
+def is_abbreviation(part, a, b):
+    """True when a qualifier / segment only abbreviates the pair ('aiou', or 'giki' for 'gikiest')
+    or is spelled out in both names"""
+    short = abbreviations(a) | abbreviations(b)
+    return (part in short
+            or ' ' not in part and len(part) >= 3 and any(s.startswith(part) for s in short)
+            or f" {part} " in f" {normalize_name(a)} " and f" {part} " in f" {normalize_name(b)} ")
+
+
+def distinguishing_qualifiers(a, b):
+    """Qualifiers of either name that are not just an abbreviation: '(Sheringal)' yes, '(AIOU)' no"""
+    differing = qualifiers(a) ^ qualifiers(b)
+    return {part for part in differing
+            if not is_abbreviation(part, a, b) and f" {part} " not in f" {core_name(a)} {core_name(b)} "}
+
+
+def scoring_name(name):
+    """Full normalized name (qualifiers included) minus '(reference)' markers; what pairs are scored on"""
+    text = re.sub(r'\((?:%s)\)' % '|'.join(MARKER_QUALIFIERS), ' ', name or '', flags=re.IGNORECASE)
+    return normalize_name(text)
+
+
+def core_name(name):
+    """Normalized name without '(AIOU)' / '(reference)' style qualifiers"""
+    return normalize_name(strip_qualifiers(name))
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def is_reference(name):
+    lowered = name.lower()
+    return 'reference' in lowered or 'duplicate' in lowered
+
+
+def segment_match(a, b):
+    """'campus' for 'University of Karachi' vs 'University of Karachi - Federal Urdu Campus',
+    'alias' when the other segments only abbreviate the name ('AIOU - Allama Iqbal Open University'), else None"""
+    for short, long_name in ((a, b), (b, a)):
+        segments = [normalize_name(s) for s in strip_qualifiers(long_name).split(' - ')]
+        if len(segments) > 1 and core_name(short) in segments:
+            others = [s for s in segments if s != core_name(short)]
+            return 'alias' if all(is_abbreviation(s, short, long_name) for s in others) else 'campus'
+    return None
+
+
+class TrigramIndex:
+    """Inverted index trigram -> name ids; candidate pairs only come from shared postings"""
+
+    def __init__(self, max_df_ratio=MAX_DF_RATIO):
+        self.max_df_ratio = max_df_ratio
+        self.grams = []
+        self.postings = defaultdict(list)
+
+    def add(self, text):
+        doc_id = len(self.grams)
+        grams = trigrams(text)
+        self.grams.append(grams)
+        for gram in grams:
+            self.postings[gram].append(doc_id)
+        return doc_id
+
+    def candidate_pairs(self, min_overlap):
+        """Yield (i, j, jaccard) for pairs whose overlap coefficient reaches min_overlap"""
+        # At least 2, so a trigram shared by just one pair still counts in tiny catalogs
+        max_df = max(2, int(len(self.grams) * self.max_df_ratio))
+        for i, grams in enumerate(self.grams):
+            shared = Counter()
+            for gram in grams:
+                posting = self.postings[gram]
+                if len(posting) > max_df:
+                    continue
+                for j in posting:
+                    if j > i:
+                        shared[j] += 1
+            for j in shared:
+                other = self.grams[j]
+                common = len(grams & other)
+                if common / min(len(grams), len(other)) >= min_overlap:
+                    yield i, j, common / len(grams | other)
+
+
+def choose_keep(a, b):
+    """Return (keep, remove): prefer non-reference rows, stored rows, then the more descriptive name"""
+    def rank(entry):
+        return (not is_reference(entry['name']), entry['source'] != 'scraped', '(' in entry['name'], len(entry['name']))
+    return (a, b) if rank(a) >= rank(b) else (b, a)
+
+
+def find_candidates(entries, threshold=DEFAULT_THRESHOLD):
+    """Scored candidate pairs, best first"""
+    index = TrigramIndex()
+    for entry in entries:
+        index.add(scoring_name(entry['name']))
+
+    pairs = []
+    for i, j, jaccard in index.candidate_pairs(threshold):
+        a, b = entries[i], entries[j]
+        score, reason = jaccard, 'trigram'
+        segment = segment_match(a['name'], b['name'])
+        if segment == 'campus':
+            score, reason = max(score, SEGMENT_MATCH_SCORE), 'campus-segment'
+        elif distinguishing_qualifiers(a['name'], b['name']):
+            # '... University' vs '... University (Sheringal)' may well be two institutions
+            reason = 'qualifier'
+        elif segment == 'alias':
+            score, reason = max(score, ALIAS_MATCH_SCORE), 'alias'
+        if score < threshold:
+            continue
+        keep, remove = choose_keep(a, b)
+        pairs.append({
+            'keep': keep['name'],
+            'remove': remove['name'],
+            'score': round(score, 3),
+            'reason': reason,
+            'keepSource': keep['source'],
+            'removeSource': remove['source'],
+            # The merge script moves references between two stored documents; campuses and differently
+            # qualified names are only listed for review, never merged automatically
+            'mergeable': (reason in ('trigram', 'alias') and keep['source'] != 'scraped'
+                          and remove['source'] != 'scraped'),
+        })
+    pairs.sort(key=lambda p: p['score'], reverse=True)
+    return pairs
+
+
+# (name, name, mergeable) pairs --self-check verifies
+SELF_CHECK_PAIRS = [
+    ('Allama Iqbal Open University (AIOU)', 'AIOU - Allama Iqbal Open University', True),
+    ('National University of Sciences & Technology (NUST)', 'National University of Sciences and Technology', True),
+    ('Ghulam Ishaq Khan Institute of Engineering Sciences and Technology (GIKI)',
+     'Ghulam Ishaq Khan Institute of Engineering Sciences & Technology', True),
+    ('Shaheed Benazir Bhutto University', 'Shaheed Benazir Bhutto University (Sheringal)', False),
+    ('University of Karachi', 'University of Karachi - NED University Campus (reference)', False),
+]
+
+
+def self_check():
+    """Run the known pairs through find_candidates; returns the failures"""
+    failures = []
+    for a, b, expected in SELF_CHECK_PAIRS:
+        pairs = find_candidates([{'name': a, 'source': 'db'}, {'name': b, 'source': 'db'}])
+        mergeable = bool(pairs) and pairs[0]['mergeable']
+        reason = pairs[0]['reason'] if pairs else 'no candidate'
+        print(f"   {'✅' if mergeable == expected else '❌'} {a} / {b}: mergeable={mergeable} ({reason})")
+        if mergeable != expected:
+            failures.append((a, b))
+    return failures
+
+
+def load_entries(args):
+    """Unique names from MongoDB and (optionally) the scraper output, tagged with their source"""
+    sources = {}
+    if not args.no_db:
+        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+        try:
+            for doc in client['manzil']['universities'].find({}, {'name': 1}):
+                sources[doc['name']] = 'db'
+        finally:
+            client.close()
+
+    if args.input and os.path.exists(args.input):
+        with open(args.input, 'r', encoding='utf-8') as f:
+            for uni in json.load(f):
+                name = (uni.get('name') or '').strip()
+                if name:
+                    sources[name] = 'both' if sources.get(name) in ('db', 'both') else 'scraped'
+
+    return [{'name': name, 'source': source} for name, source in sources.items()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Find near-duplicate university names')
+    parser.add_argument('--input', default=SCRAPED_FILE, help='Scraper output JSON to include (default: fast scraper output)')
+    parser.add_argument('--no-db', action='store_true', help='Only use --input names')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Minimum similarity (0-1)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Merge-candidates report path')
+    parser.add_argument('--self-check', action='store_true', help='Check the scoring on known pairs and exit')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.self_check:
+        print("🧪 Checking known pairs...\n")
+        failures = self_check()
+        if failures:
+            raise SystemExit(f"\n❌ {len(failures)} known pairs scored wrongly")
+        print("\n✅ All known pairs scored as expected")
+        return
+    print("🔍 Looking for near-duplicate universities...\n")
+
+    entries = load_entries(args)
+    started = time.monotonic()
+    pairs = find_candidates(entries, args.threshold)
+    elapsed = time.monotonic() - started
+
+    report = {
+        'generatedAt': datetime.now(timezone.utc).isoformat(),
+        'threshold': args.threshold,
+        'names': len(entries),
+        'pairs': pairs,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"📊 {len(entries)} names, {len(pairs)} candidate pairs in {elapsed * 1000:.0f} ms")
+    for pair in pairs[:20]:
+        print(f"   {pair['score']:.2f}  \"{pair['remove']}\" → \"{pair['keep']}\" ({pair['reason']})")
+    if len(pairs) > 20:
+        print(f"   ... and {len(pairs) - 20} more")
+    print(f"\n📝 Report written to {args.output}")
+    print("   Review it, then: node backend/scripts/mergeDuplicateUniversities.js --candidates=<report> --min-score=<score>")
+
+
+if __name__ == '__main__':
+    main()
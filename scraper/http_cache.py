@@ -0,0 +1,201 @@
+"""
+On-disk HTTP response cache for university detail pages and homepages
+Stores ETag / Last-Modified and a body digest per URL so repeat fetches become conditional requests
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_CACHE_DIR = os.getenv(
+    'SCRAPER_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.http_cache')
+)
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200 MB of compressed bodies
+
+# status: 'new' (first fetch), 'changed' (body differs), 'unchanged' (200 with same digest),
+# 'not_modified' (304). Callers only need to parse/write for 'new' and 'changed'.
+CacheResult = namedtuple('CacheResult', ['status', 'body', 'digest'])
+
+
+def body_digest(body):
+    """sha256 of the raw response body"""
+    if isinstance(body, str):
+        body = body.encode('utf-8', errors='replace')
+    return hashlib.sha256(body).hexdigest()
+
+
+class ResponseCache:
+    """URL-keyed response cache with LRU eviction bounded by total body size"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, namespace=None):
+        # Consumers that fetch the same URLs for different fields keep separate namespaces, so one
+        # consumer's validators never make another skip a page it has not parsed yet
+        if namespace:
+            cache_dir = os.path.join(cache_dir, namespace)
+        self.cache_dir = cache_dir
+        self.bodies_dir = os.path.join(cache_dir, 'bodies')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'conditional': 0,
+            'not_modified': 0,
+            'unchanged': 0,
+            'changed': 0,
+            'new': 0,
+            'bytes_downloaded': 0,
+            'bytes_saved': 0,
+            'evictions': 0,
+        }
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        self.entries = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _body_path(self, digest):
+        return os.path.join(self.bodies_dir, f"{digest}.gz")
+
+    def conditional_headers(self, url):
+        """Validators to send with the next request for this URL"""
+        with self.lock:
+            self.stats['requests'] += 1
+            entry = self.entries.get(url)
+            if not entry or not os.path.exists(self._body_path(entry['digest'])):
+                return {}
+            headers = {}
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+            if headers:
+                self.stats['conditional'] += 1
+            return headers
+
+    def not_modified(self, url):
+        """Record a 304 - the body is not read again, callers skip parsing and writes"""
+        with self.lock:
+            self.stats['not_modified'] += 1
+            entry = self.entries.get(url)
+            if entry is None:  # Evicted while the request was in flight
+                return CacheResult('not_modified', None, None)
+            entry['last_used'] = time.time()
+            self.stats['bytes_saved'] += entry['size']
+            return CacheResult('not_modified', None, entry['digest'])
+
+    def store(self, url, headers, body):
+        """Record a 200 response and report whether the body actually changed"""
+        raw = body.encode('utf-8', errors='replace') if isinstance(body, str) else body
+        digest = body_digest(raw)
+        now = time.time()
+
+        with self.lock:
+            self.stats['bytes_downloaded'] += len(raw)
+            previous = self.entries.get(url)
+            if previous is None:
+                status = 'new'
+            elif previous['digest'] == digest:
+                status = 'unchanged'
+            else:
+                status = 'changed'
+            self.stats[status] += 1
+
+            path = self._body_path(digest)
+            if not os.path.exists(path):
+                with gzip.open(path, 'wb') as f:
+                    f.write(raw)
+            self.entries[url] = {
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'digest': digest,
+                'size': os.path.getsize(path),
+                'stored_at': now,
+                'last_used': now,
+            }
+            if previous and previous['digest'] != digest:
+                self._drop_body_if_unused(previous['digest'])
+            self._evict()
+
+        return CacheResult(status, body, digest)
+
+    def cached_body(self, url):
+        """Decompressed body for a cached URL, or None"""
+        entry = self.entries.get(url)
+        if not entry:
+            return None
+        try:
+            with gzip.open(self._body_path(entry['digest']), 'rb') as f:
+                return f.read().decode('utf-8', errors='replace')
+        except OSError:
+            return None
+
+    def _drop_body_if_unused(self, digest):
+        if any(e['digest'] == digest for e in self.entries.values()):
+            return
+        try:
+            os.remove(self._body_path(digest))
+        except OSError:
+            pass
+
+    def _evict(self):
+        # Bodies are content-addressed, so identical pages only count once
+        sizes = {e['digest']: e['size'] for e in self.entries.values()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        for url, entry in sorted(self.entries.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            del self.entries[url]
+            self.stats['evictions'] += 1
+            if not any(e['digest'] == entry['digest'] for e in self.entries.values()):
+                total -= sizes[entry['digest']]
+                self._drop_body_if_unused(entry['digest'])
+
+    def save(self):
+        """Persist the index (atomic replace)"""
+        with self.lock:
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.index_path)
+
+    def report(self):
+        """Hit/miss counters for this process"""
+        with self.lock:
+            stats = dict(self.stats)
+        skipped = stats['not_modified'] + stats['unchanged']
+        stats['hit_rate'] = round(skipped / stats['requests'], 3) if stats['requests'] else 0.0
+        stats['entries'] = len(self.entries)
+        return stats
+
+    def print_report(self):
+        stats = self.report()
+        print("\n📦 HTTP cache report:")
+        print(f"   Requests: {stats['requests']} (conditional: {stats['conditional']})")
+        print(f"   304 Not Modified: {stats['not_modified']} | Unchanged body: {stats['unchanged']}")
+        print(f"   Changed: {stats['changed']} | New: {stats['new']} | Hit rate: {stats['hit_rate'] * 100:.1f}%")
+        print(f"   Downloaded: {stats['bytes_downloaded'] / 1024:.0f} KB | Saved (304): ~{stats['bytes_saved'] / 1024:.0f} KB compressed")
+        print(f"   Entries: {stats['entries']} | Evictions: {stats['evictions']}")
+
+
+def cached_get(session, cache, url, timeout=25, **kwargs):
+    """GET through a requests.Session using the cache's validators; returns a CacheResult"""
+    headers = dict(kwargs.pop('headers', {}) or {})
+    headers.update(cache.conditional_headers(url))
+    response = session.get(url, headers=headers, timeout=timeout, **kwargs)
+    if response.status_code == 304:
+        return cache.not_modified(url)
+    response.raise_for_status()
+    result = cache.store(url, response.headers, response.content)
+    return result._replace(body=response.text)
@@ -0,0 +1,184 @@
+"""
+Bulk Program Catalog Loader
+Streams a (University, Program) CSV into the programs collection, resolving short university
+names through an in-memory alias index built from one bulk read of universities
+"""
+
+import argparse
+import csv
+import os
+import time
+from collections import Counter
+
+from pymongo import MongoClient, InsertOne, UpdateOne
+from dotenv import load_dotenv
+
+from university_names import AliasIndex
+
+# Load environment variables
+load_dotenv()
+
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/manzil')
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'undergraduate_programs_option1.csv')
+DEFAULT_BATCH_SIZE = 1000
+
+
+def extract_degree_type(program_name):
+    """Degree from program name (same rules as import_programs_csv.js)"""
+    name = program_name.upper()
+    if 'PHARM-D' in name or 'PHARMD' in name:
+        return 'Pharm-D'
+    if 'BA-LLB' in name or ('LLB' in name and 'BA' in name):
+        return 'BA-LLB'
+    if 'BBA' in name:
+        return 'BBA'
+    if 'BS ' in name:
+        return 'BS'
+    if 'BSC ' in name or 'B.SC' in name or name.startswith('BSC'):
+        return 'BS'
+    if 'BA ' in name:
+        return 'BA'
+    if 'BE ' in name:
+        return 'BE'
+    if 'MBA' in name:
+        return 'MBA'
+    if 'MS ' in name:
+        return 'MS'
+    if 'PHD' in name:
+        return 'PhD'
+    return 'BS'
+
+
+def extract_category(program_name):
+    """Category from program name (same rules as import_programs_csv.js)"""
+    name = program_name.lower()
+    if any(k in name for k in ('computer', 'software', 'cyber', 'it ', ' information')):
+        return 'Computer Science'
+    if any(k in name for k in ('electrical', 'mechanical', 'civil', 'engineering', 'chemical')):
+        return 'Engineering'
+    if any(k in name for k in ('business', 'management', 'accounting', 'finance', 'bba', 'mba')):
+        return 'Business'
+    if any(k in name for k in ('medical', 'medicine', 'pharm', 'health')):
+        return 'Medical'
+    if 'law' in name or 'llb' in name:
+        return 'Law'
+    if any(k in name for k in ('english', 'arts', 'humanities')):
+        return 'Arts'
+    if any(k in name for k in ('chemistry', 'physics', 'mathematics', 'biology', 'biotechnology', 'environmental')):
+        return 'Computer Science'  # Sciences category
+    return 'Other'
+
+
+def read_catalog(csv_path):
+    """Yield (university_label, program_name) rows without loading the whole file"""
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Header
+        for row in reader:
+            if len(row) < 2:
+                continue
+            university_label, program_name = row[0].strip(), ' '.join(row[1].split())
+            if university_label and len(program_name) >= 3:
+                yield university_label, program_name
+
+
+def load_programs(programs_collection, index, rows, batch_size, dry_run=False):
+    """Resolve rows through the alias index and write programs in batches"""
+    # One read of existing (university, name) pairs instead of a findOne per row
+    existing = {
+        (p['university'], p['name'].lower()): p['_id']
+        for p in programs_collection.find({}, {'university': 1, 'name': 1})
+    }
+
+    stats = Counter()
+    unresolved = Counter()
+    seen = set()
+    batch = []
+
+    def flush():
+        if batch and not dry_run:
+            programs_collection.bulk_write(batch, ordered=False)
+        stats['batches'] += 1 if batch else 0
+        batch.clear()
+
+    for university_label, program_name in rows:
+        stats['rows'] += 1
+        uni_id = index.resolve(university_label)
+        if uni_id is None:
+            unresolved[university_label] += 1
+            continue
+
+        key = (uni_id, program_name.lower())
+        if key in seen:
+            stats['duplicates'] += 1
+            continue
+        seen.add(key)
+
+        program = {
+            'name': program_name,
+            'degree': extract_degree_type(program_name),
+            'university': uni_id,
+            'duration': '4 years',
+            'eligibility': 'FSc/FA/ICS with minimum 50% marks',
+            'category': extract_category(program_name),
+            'isActive': True,
+        }
+        if key in existing:
+            batch.append(UpdateOne({'_id': existing[key]}, {'$set': program}))
+            stats['updated'] += 1
+        else:
+            batch.append(InsertOne({**program, 'feePerSemester': 0}))
+            stats['inserted'] += 1
+
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+    return stats, unresolved
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Bulk-load a university program catalog CSV')
+    parser.add_argument('--csv', default=DEFAULT_CSV, help='CSV with University,Program columns')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Programs per bulk write')
+    parser.add_argument('--dry-run', action='store_true', help='Resolve and report, but do not write')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("🚀 Starting program catalog import...\n")
+
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+    db = client['manzil']
+
+    try:
+        started = time.monotonic()
+        universities = list(db['universities'].find({'isActive': {'$ne': False}}, {'name': 1}))
+        index = AliasIndex(universities)
+        print(f"📚 Indexed {len(universities)} universities "
+              f"({len(index.aliases)} aliases, {len(index.ambiguous)} ambiguous) "
+              f"in {time.monotonic() - started:.2f}s")
+
+        stats, unresolved = load_programs(db['programs'], index, read_catalog(args.csv),
+                                          args.batch_size, dry_run=args.dry_run)
+
+        print(f"\n📊 Import Summary{' (dry run)' if args.dry_run else ''}:")
+        print(f"   📝 Rows read: {stats['rows']}")
+        print(f"   ✅ Inserted: {stats['inserted']}")
+        print(f"   🔄 Updated: {stats['updated']}")
+        print(f"   ⏭️  Duplicates: {stats['duplicates']}")
+        print(f"   📦 Bulk writes: {stats['batches']}")
+        print(f"   ⏱️  Total time: {time.monotonic() - started:.2f}s")
+
+        if unresolved:
+            print(f"\n⚠️  Unresolved university names ({len(unresolved)}):")
+            for label, count in unresolved.most_common():
+                reason = 'ambiguous' if index.is_ambiguous(label) else 'not found'
+                print(f"   - {label} ({count} rows, {reason})")
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,364 @@
+"""
+Local stand-in for HEC's recognised.aspx
+Serves the listing page with working Sector/Charter/Disc/Province/City dropdowns, paginated
+results from a fixture dataset and detail pages, with optional latency, jitter and failures.
+Point the scrapers at it with HEC_RECOGNISED_URL.
+
+Usage:
+    python mock_hec_server.py --port 8765 --latency 200 --jitter 100 --failure-rate 0.05
+    HEC_RECOGNISED_URL=http://127.0.0.1:8765/english/universities/Pages/recognised.aspx python scrape_hec_universities_fast.py
+"""
+
+import argparse
+import csv
+import html
+import json
+import os
+import random
+import socket
+import struct
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hec_recognized_universities_compiled.csv')
+LISTING_PATH = '/english/universities/Pages/recognised.aspx'
+DETAIL_PATH = '/english/universities/Pages/university.aspx'
+API_PATH = '/api/universities'
+STATS_PATH = '/__stats'
+
+# Select id -> fixture field (same ids as the live page)
+FILTERS = {
+    'Sector': 'sector',
+    'Charter': 'charter',
+    'Disc': 'discipline',
+    'Province': 'province',
+    'City': 'city',
+}
+
+PROVINCE_NAMES = {
+    'ICT': 'Islamabad Capital Territory',
+    'AJK': 'Azad Jammu & Kashmir',
+}
+
+# First match wins; everything else is 'General'
+DISCIPLINE_KEYWORDS = (
+    ('Engineering & Technology', ('engineering', 'technology', 'sciences & technology', 'comsats', 'nust')),
+    ('Medical & Health Sciences', ('medical', 'health', 'dow', 'aga khan', 'khyber medical')),
+    ('Agriculture & Veterinary', ('agriculture', 'veterinary', 'animal')),
+    ('Business & Management', ('business', 'management', 'lums', 'iba', 'commerce')),
+    ('Arts & Design', ('arts', 'design', 'fashion', 'music')),
+)
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Recognised Universities</title></head>
+<body>
+<h1>HEC Recognised Universities and Degree Awarding Institutions</h1>
+<div class="filters">
+{selects}
+</div>
+<p id="count"></p>
+<ul id="results"></ul>
+<div id="pager"></div>
+<script>
+var pageSize = {page_size};
+var currentPage = 1;
+var latestRequest = 0;
+function filterQuery() {{
+    var ids = {filter_ids};
+    var parts = [];
+    for (var i = 0; i < ids.length; i++) {{
+        var select = document.getElementById(ids[i]);
+        parts.push(ids[i] + '=' + encodeURIComponent(select.options[select.selectedIndex].text.trim()));
+    }}
+    return parts.join('&');
+}}
+function render(data) {{
+    var list = document.getElementById('results');
+    list.innerHTML = data.items.map(function (u) {{
+        return '<li>' + u.name + '<br><span class="location">' + u.location + '</span><br>' +
+               '<a href="' + u.link + '">View Details</a></li>';
+    }}).join('');
+    document.getElementById('count').textContent = data.total + ' institutions found';
+    var pager = document.getElementById('pager');
+    pager.innerHTML = data.page < data.pages
+        ? '<a href="#" class="next" onclick="loadPage(currentPage + 1); return false;">Next</a>' : '';
+}}
+function loadPage(page) {{
+    currentPage = page;
+    var requestId = ++latestRequest;
+    var request = new XMLHttpRequest();
+    request.open('GET', '{api_path}?' + filterQuery() + '&page=' + page + '&size=' + pageSize);
+    request.onload = function () {{
+        // Each filter change fires a request; only the newest one may render
+        if (requestId !== latestRequest) {{ return; }}
+        if (request.status === 200) {{ render(JSON.parse(request.responseText)); }}
+        else {{ document.getElementById('results').innerHTML = ''; document.getElementById('count').textContent = 'Error ' + request.status; }}
+    }};
+    request.send();
+}}
+var selects = document.getElementsByTagName('select');
+for (var i = 0; i < selects.length; i++) {{
+    selects[i].addEventListener('change', function () {{ loadPage(1); }});
+}}
+loadPage(1);
+</script>
+</body>
+</html>
+"""
+
+DETAIL_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{name}</title></head>
+<body>
+<h1>{name}</h1>
+<img class="logo" src="/logos/{id}.png" alt="{name} logo">
+<table>
+<tr><th>Address</th><td>{location}</td></tr>
+<tr><th>Phone</th><td>{phone}</td></tr>
+<tr><th>Email</th><td>{email}</td></tr>
+<tr><th>Established</th><td>{established}</td></tr>
+<tr><th>Sector</th><td>{sector}</td></tr>
+</table>
+</body>
+</html>
+"""
+
+
+def discipline_for(name):
+    lowered = name.lower()
+    for discipline, keywords in DISCIPLINE_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return discipline
+    return 'General'
+
+
+def load_fixture(path, scale=1):
+    """Fixture rows from the compiled CSV (name, city, province, type) or a JSON list of the same"""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+    else:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.DictReader(f))
+
+    base = []
+    for row in rows:
+        name = (row.get('name') or '').strip()
+        province = PROVINCE_NAMES.get(row.get('province', '').strip(), row.get('province', '').strip())
+        if not name or not province or row.get('source') == 'placeholder':
+            continue
+        base.append({
+            'name': name,
+            'city': (row.get('city') or '').strip(),
+            'province': province,
+            'sector': 'Private' if (row.get('type') or '').strip() == 'Private' else 'Public',
+            'charter': 'Federal' if province == 'Islamabad Capital Territory' else province,
+            'discipline': row.get('discipline') or discipline_for(name),
+        })
+
+    # --scale N adds campus copies for load tests
+    universities = []
+    for copy in range(scale):
+        for row in base:
+            name = row['name'] if copy == 0 else f"{row['name']} - Campus {copy + 1}"
+            universities.append({**row, 'name': name})
+
+    for index, uni in enumerate(universities, 1):
+        uni['id'] = index
+        uni['location'] = f"{uni['city']}, {uni['province']}"
+        uni['link'] = f"{DETAIL_PATH}?id={index}"
+    return universities
+
+
+class MockHEC:
+    """Fixture data, fault injection settings and request counters shared by all handler threads"""
+
+    def __init__(self, universities, page_size=20, latency=0, jitter=0, failure_rate=0.0,
+                 failure_mode='error', seed=None):
+        self.universities = universities
+        self.by_id = {uni['id']: uni for uni in universities}
+        self.page_size = page_size
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.failure_rate = failure_rate
+        self.failure_mode = failure_mode
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    def options(self, field):
+        return ['Select All'] + sorted({uni[field] for uni in self.universities if uni[field]})
+
+    def filter(self, params):
+        selected = {field: (params.get(select_id) or ['Select All'])[0] for select_id, field in FILTERS.items()}
+        return [
+            uni for uni in self.universities
+            if all(value == 'Select All' or uni[field] == value for field, value in selected.items())
+        ]
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0
+        time.sleep(max(0.0, self.latency + jitter))
+
+    def should_fail(self):
+        with self.lock:
+            return self.failure_rate > 0 and self.random.random() < self.failure_rate
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def listing_html(self):
+        selects = []
+        for select_id, field in FILTERS.items():
+            options = ''.join(f"<option value=\"{i}\">{html.escape(o)}</option>"
+                              for i, o in enumerate(self.options(field)))
+            selects.append(f"<label for=\"{select_id}\">{select_id}</label> "
+                           f"<select id=\"{select_id}\" name=\"{select_id}\">{options}</select>")
+        return PAGE_TEMPLATE.format(
+            selects='\n'.join(selects),
+            page_size=self.page_size,
+            filter_ids=json.dumps(list(FILTERS)),
+            api_path=API_PATH,
+        )
+
+    def detail_html(self, uni):
+        slug = ''.join(c for c in uni['name'].lower() if c.isalnum())[:12]
+        return DETAIL_TEMPLATE.format(
+            id=uni['id'],
+            name=html.escape(uni['name']),
+            location=html.escape(uni['location']),
+            phone=f"+92-51-{9000000 + uni['id']}",
+            email=f"info@{slug}.edu.pk",
+            established=1950 + uni['id'] % 70,
+            sector=uni['sector'],
+        )
+
+
+class MockHECHandler(BaseHTTPRequestHandler):
+    server_version = 'MockHEC/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type='text/html; charset=utf-8'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.mock.count('bytes', len(data))
+
+    def inject_failure(self):
+        """Apply the configured failure; returns True if the request was failed"""
+        mock = self.server.mock
+        if not mock.should_fail():
+            return False
+        mock.count(f"failures_{mock.failure_mode}")
+        if mock.failure_mode == 'reset':
+            # Abortive close (RST) instead of a response
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            self.close_connection = True
+            self.connection.close()
+        elif mock.failure_mode == 'hang':
+            time.sleep(120)
+        else:
+            self.send_body(503, '<h1>Service Unavailable</h1>')
+        return True
+
+    def do_GET(self):
+        mock = self.server.mock
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        mock.count('requests')
+
+        if url.path == STATS_PATH:
+            with mock.lock:
+                stats = dict(mock.stats)
+            self.send_body(200, json.dumps(stats), 'application/json')
+            return
+
+        mock.delay()
+        if self.inject_failure():
+            return
+
+        if url.path in ('/', LISTING_PATH):
+            mock.count('listing')
+            self.send_body(200, mock.listing_html())
+        elif url.path == API_PATH:
+            mock.count('api')
+            matches = mock.filter(params)
+            size = max(1, int((params.get('size') or [mock.page_size])[0]))
+            pages = max(1, -(-len(matches) // size))
+            page = min(max(1, int((params.get('page') or ['1'])[0])), pages)
+            items = [
+                {'name': uni['name'], 'location': uni['location'], 'link': uni['link']}
+                for uni in matches[(page - 1) * size:page * size]
+            ]
+            self.send_body(200, json.dumps({'total': len(matches), 'page': page, 'pages': pages, 'items': items}),
+                           'application/json')
+        elif url.path == DETAIL_PATH:
+            uni = mock.by_id.get(int((params.get('id') or ['0'])[0] or 0))
+            if uni is None:
+                self.send_body(404, '<h1>Not Found</h1>')
+            else:
+                mock.count('detail')
+                self.send_body(200, mock.detail_html(uni))
+        else:
+            self.send_body(404, '<h1>Not Found</h1>')
+
+
+def start_server(mock, host='127.0.0.1', port=0):
+    """Serve in a background thread; returns (server, listing url). port=0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), MockHECHandler)
+    server.daemon_threads = True
+    server.mock = mock
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{LISTING_PATH}"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the HEC recognised universities page')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE, help='CSV or JSON list with name, city, province, type')
+    parser.add_argument('--scale', type=int, default=1, help='Copies of the fixture (as extra campuses) for load tests')
+    parser.add_argument('--page-size', type=int, default=20, help='Results per page')
+    parser.add_argument('--latency', type=float, default=0, help='Added latency per request (ms)')
+    parser.add_argument('--jitter', type=float, default=0, help='Random +/- latency per request (ms)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of requests to fail (0-1)')
+    parser.add_argument('--failure-mode', choices=('error', 'reset', 'hang'), default='error',
+                        help='503 response, connection reset, or a 120s hang')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible jitter / failures')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    universities = load_fixture(args.fixture, args.scale)
+    mock = MockHEC(universities, page_size=args.page_size, latency=args.latency, jitter=args.jitter,
+                   failure_rate=args.failure_rate, failure_mode=args.failure_mode, seed=args.seed)
+    server, url = start_server(mock, args.host, args.port)
+
+    print(f"🧪 Mock HEC server with {len(universities)} universities")
+    print(f"   Listing: {url}")
+    print(f"   Stats:   http://{args.host}:{server.server_address[1]}{STATS_PATH}")
+    print(f"\n   export HEC_RECOGNISED_URL={url}\n")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"\n📊 {dict(mock.stats)}")
+
+
+if __name__ == '__main__':
+    main()
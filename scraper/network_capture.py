@@ -0,0 +1,229 @@
+"""
+Network-capture extraction
+Reads the listing's data responses (XHR / fetch) from Chrome's DevTools performance log instead of
+waiting on and parsing the rendered <li> text. Records come straight from the response with exact
+field boundaries; pages are followed through the listing's "Next" link.
+"""
+
+import json
+import re
+import time
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+
+DATA_RESOURCE_TYPES = ('XHR', 'Fetch', 'Document')
+DATA_MIME_HINTS = ('json', 'javascript', 'text/plain', 'text/html', 'xml')
+
+# Field names seen in listing payloads, in order of preference
+NAME_KEYS = ('name', 'Name', 'UniversityName', 'universityName', 'Title', 'title', 'InstituteName')
+LOCATION_KEYS = ('location', 'Location', 'city', 'City', 'Address', 'address')
+LINK_KEYS = ('link', 'Link', 'url', 'URL', 'Url', 'href', 'DetailUrl', 'detailUrl')
+# Pagination hints in JSON payloads
+PAGE_KEYS = ('page', 'Page', 'pageIndex', 'PageIndex', 'currentPage')
+PAGES_KEYS = ('pages', 'Pages', 'totalPages', 'TotalPages', 'pageCount', 'PageCount')
+
+NAME_KEYWORDS = ('University', 'Institute', 'College')
+QUIET_PERIOD = 0.3
+MAX_PAGES = 50
+NEXT_LINK_XPATH = "//a[contains(text(), 'Next') or contains(@class, 'next')]"
+
+
+def enable_performance_logging(chrome_options):
+    """Ask chromedriver to record DevTools network events (read back with driver.get_log('performance'))"""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def first_value(item, keys):
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def is_university_name(name):
+    return isinstance(name, str) and len(name) >= 5 and any(k in name for k in NAME_KEYWORDS)
+
+
+def find_record_lists(data):
+    """Yield every list of dicts in a JSON payload (ASP.NET wraps results in {'d': ...}, sometimes as a string)"""
+    if isinstance(data, str) and data[:1] in ('[', '{'):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return
+    if isinstance(data, list):
+        if data and all(isinstance(item, dict) for item in data):
+            yield data
+        for item in data:
+            if isinstance(item, (dict, list)):
+                yield from find_record_lists(item)
+    elif isinstance(data, dict):
+        for value in data.values():
+            yield from find_record_lists(value)
+
+
+def records_from_json(data, base_url):
+    """(records, has_more) from a JSON payload"""
+    records = []
+    for items in find_record_lists(data):
+        for item in items:
+            name = first_value(item, NAME_KEYS)
+            if not is_university_name(name):
+                continue
+            location = first_value(item, LOCATION_KEYS) or ''
+            link = first_value(item, LINK_KEYS) or ''
+            records.append({
+                'name': ' '.join(name.split()),
+                'location': ' '.join(str(location).split()),
+                'link': urljoin(base_url, link) if link else '',
+            })
+        if records:
+            break
+
+    has_more = False
+    if isinstance(data, dict):
+        page = first_value(data, PAGE_KEYS)
+        pages = first_value(data, PAGES_KEYS)
+        has_more = isinstance(page, int) and isinstance(pages, int) and page < pages
+    return records, has_more
+
+
+def records_from_html(body, base_url):
+    """Records from an HTML fragment (e.g. an UpdatePanel partial postback)"""
+    soup = BeautifulSoup(body, 'html.parser')
+    records = []
+    for li in soup.find_all('li'):
+        lines = [' '.join(s.split()) for s in li.stripped_strings]
+        if not lines or not is_university_name(lines[0]):
+            continue
+        anchor = li.find('a', href=True)
+        records.append({
+            'name': lines[0],
+            'location': lines[1] if len(lines) > 1 and lines[1] != (anchor.get_text(strip=True) if anchor else None) else '',
+            'link': urljoin(base_url, anchor['href']) if anchor else '',
+        })
+    has_more = soup.find('a', class_=re.compile('next', re.I)) is not None
+    return records, has_more
+
+
+def parse_response(body, mime_type, url):
+    """(records, has_more) from one captured response body"""
+    text = body.strip()
+    if 'json' in mime_type or text[:1] in ('[', '{'):
+        try:
+            return records_from_json(json.loads(text), url)
+        except ValueError:
+            pass
+    return records_from_html(text, url)
+
+
+class NetworkCapture:
+    """Collects data responses fired after mark(); call wait_for_records() once the filters are set"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.sent = {}            # requestId -> issue order, for data-type requests
+        self.responses = {}       # requestId -> {'url', 'mime'} for responses that look like data
+        self.done = set()         # requestIds that finished (or failed) loading
+        # URL paths that have returned listing records; a later empty response from one means "no results"
+        self.listing_paths = set()
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+        except Exception:
+            pass  # chromedriver enables Network itself when performance logging is on
+
+    def mark(self):
+        """Forget everything seen so far (drains the performance log)"""
+        self._drain()
+        self.sent.clear()
+        self.responses.clear()
+        self.done.clear()
+
+    def _drain(self):
+        """Read pending DevTools events; returns True if any data request made progress"""
+        activity = False
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            method = message.get('method')
+            params = message.get('params', {})
+            request_id = params.get('requestId')
+            if method == 'Network.requestWillBeSent':
+                if params.get('type') in DATA_RESOURCE_TYPES:
+                    self.sent.setdefault(request_id, len(self.sent))
+                    activity = True
+            elif request_id not in self.sent:
+                continue
+            elif method == 'Network.responseReceived':
+                response = params.get('response', {})
+                mime = response.get('mimeType', '')
+                if any(hint in mime for hint in DATA_MIME_HINTS):
+                    self.responses[request_id] = {'url': response.get('url', ''), 'mime': mime}
+                activity = True
+            elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                self.done.add(request_id)
+                activity = True
+        return activity
+
+    def _latest_records(self):
+        """Parse finished responses, newest request first; the newest listing response is the final filter state"""
+        finished = sorted((r for r in self.responses if r in self.done), key=self.sent.get, reverse=True)
+        for request_id in finished:
+            info = self.responses[request_id]
+            try:
+                body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            except Exception:
+                continue
+            if body.get('base64Encoded'):
+                continue
+            records, has_more = parse_response(body.get('body', ''), info['mime'], info['url'])
+            path = urlparse(info['url']).path
+            if records:
+                self.listing_paths.add(path)
+                return records, has_more
+            if path in self.listing_paths:
+                return [], False
+        return None
+
+    def wait_for_records(self, timeout=15):
+        """Records from the newest data response once traffic goes quiet; None if nothing usable arrived"""
+        deadline = time.monotonic() + timeout
+        last_activity = time.monotonic()
+        while time.monotonic() < deadline:
+            if self._drain():
+                last_activity = time.monotonic()
+            pending = any(request_id not in self.done for request_id in self.sent)
+            if self.done and not pending and time.monotonic() - last_activity >= QUIET_PERIOD:
+                break
+            time.sleep(0.05)
+        return self._latest_records()
+
+    def capture_listing(self, timeout=15):
+        """(records, complete) for the current filters, following "Next" pages; None to fall back to the DOM.
+        complete is False when the response says there are more pages but they could not all be read"""
+        result = self.wait_for_records(timeout)
+        if result is None:
+            return None
+        records, has_more = result
+        seen = {r['name'] for r in records}
+
+        for _ in range(MAX_PAGES):
+            if not has_more:
+                return records, True
+            next_links = self.driver.find_elements(By.XPATH, NEXT_LINK_XPATH)
+            if not next_links:
+                break
+            self.mark()
+            next_links[0].click()
+            result = self.wait_for_records(timeout)
+            if result is None:
+                break
+            page_records, has_more = result
+            new = [r for r in page_records if r['name'] not in seen]
+            if not new:
+                break
+            seen.update(r['name'] for r in new)
+            records.extend(new)
+        return records, not has_more
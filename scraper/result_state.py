@@ -0,0 +1,133 @@
+"""
+Results-state probe for fast empty combinations
+Many leaf combinations list nothing. Rather than sitting out the whole readiness loop and the
+stacked WebDriverWaits for rows that never come, the page is watched with a MutationObserver
+(installed just before the filters change, along with a count of XHR / fetch requests in flight) and probed with one script call: an explicit empty /
+zero-count message, or a finished refresh that left no rows, ends the combination at once.
+Filters only narrow the listing, so an empty state seen while later filters are still applying
+stays empty.
+"""
+
+import time
+
+# Poll often: an empty combination should finish well under a second after its refresh
+POLL_INTERVAL_S = 0.1
+# A refresh counts as finished once the DOM has been quiet this long
+QUIET_MS = 400
+# An empty message with no refresh observed is trusted after this long
+EXPLICIT_EMPTY_AFTER_S = 1.0
+
+# Counts DOM changes outside the filter dropdowns from now on, and requests still in flight (a list
+# cleared while its XHR / fetch is pending is not an empty result)
+OBSERVE_JS = """
+if (!window.__manzilRequestsPatched) {
+    window.__manzilRequestsPatched = true;
+    window.__manzilPending = 0;
+    var settle = function () { window.__manzilPending--; window.__manzilLastMutation = Date.now(); };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__manzilPending++;
+        this.addEventListener('loadend', settle);
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            window.__manzilPending++;
+            var request = originalFetch.apply(this, arguments);
+            request.then(settle, settle);
+            return request;
+        };
+    }
+}
+if (window.__manzilObserver) { window.__manzilObserver.disconnect(); }
+window.__manzilMutations = 0;
+window.__manzilLastMutation = Date.now();
+window.__manzilObserver = new MutationObserver(function (records) {
+    for (var i = 0; i < records.length; i++) {
+        var target = records[i].target.nodeType === 1 ? records[i].target : records[i].target.parentNode;
+        if (target && target.closest && target.closest('select')) { continue; }
+        window.__manzilMutations++;
+        window.__manzilLastMutation = Date.now();
+    }
+});
+window.__manzilObserver.observe(document.body, { childList: true, subtree: true, characterData: true });
+"""
+
+# Defines manzilResultState(); appended to by the probes that need it
+STATE_FUNCTION_JS = """
+function manzilResultState() {
+    var rows = 0, items = document.getElementsByTagName('li');
+    for (var i = 0; i < items.length; i++) {
+        var text = items[i].textContent;
+        if (text.indexOf('University') >= 0 || text.indexOf('Institute') >= 0 || text.indexOf('College') >= 0) { rows++; }
+    }
+    var body = document.body ? (document.body.innerText || '') : '';
+    var empty = /(^|[^\\d,.])0\\s+(institutions?|universities|records?|results?|entries)\\b/i.test(body) ||
+                /no\\s+(records?|results?|data|universit\\w*|institut\\w*|entries)(\\s+(were\\s+)?(found|available))?/i.test(body) ||
+                /nothing\\s+found|showing\\s+0\\s+(to|of)\\b/i.test(body);
+    var busy = (window.__manzilPending || 0) > 0;
+    try { busy = busy || (window.jQuery ? window.jQuery.active > 0 : false); } catch (e) {}
+    try { busy = busy || Sys.WebForms.PageRequestManager.getInstance().get_isInAsyncPostBack(); } catch (e) {}
+    return {
+        rows: rows,
+        empty: empty,
+        busy: busy || document.readyState !== 'complete',
+        mutations: window.__manzilMutations || 0,
+        quiet_ms: Date.now() - (window.__manzilLastMutation || 0)
+    };
+}
+"""
+
+PROBE_JS = STATE_FUNCTION_JS + "return manzilResultState();"
+
+
+def is_empty_state(state, elapsed):
+    """True once the page has settled on no results (explicit message or a refresh that left no rows)"""
+    if state['rows'] or state['busy']:
+        return False
+    if state['empty'] and (state['mutations'] or elapsed >= EXPLICIT_EMPTY_AFTER_S):
+        return True
+    return state['mutations'] > 0 and state['quiet_ms'] >= QUIET_MS
+
+
+def watch(driver):
+    """Start counting DOM changes; call right before applying the filters"""
+    driver.execute_script(OBSERVE_JS)
+
+
+def wait_for_empty(driver, settle):
+    """Poll for up to `settle` seconds; True as soon as the combination is known to be empty"""
+    started = time.monotonic()
+    while True:
+        elapsed = time.monotonic() - started
+        try:
+            if is_empty_state(driver.execute_script(PROBE_JS), elapsed):
+                return True
+        except Exception:
+            pass
+        if elapsed >= settle:
+            return False
+        time.sleep(min(POLL_INTERVAL_S, max(0, settle - elapsed)))
+
+
+def wait_for_refresh(driver, timeout):
+    """After watch() and a click: True once the listing changed and has been quiet for QUIET_MS"""
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        try:
+            state = driver.execute_script(PROBE_JS)
+            if state['mutations'] and not state['busy'] and state['quiet_ms'] >= QUIET_MS:
+                return True
+        except Exception:
+            pass
+        time.sleep(POLL_INTERVAL_S)
+    return False
+
+
+def is_empty_now(driver):
+    """One probe (no settle requirement beyond the page not being busy)"""
+    try:
+        return is_empty_state(driver.execute_script(PROBE_JS), EXPLICIT_EMPTY_AFTER_S)
+    except Exception:
+        return False
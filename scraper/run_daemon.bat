@@ -0,0 +1,14 @@
+@echo off
+echo ========================================
+echo   HEC Refresh Daemon
+echo ========================================
+echo.
+echo Keeps one browser open and refreshes on a schedule
+echo (default: every 6 hours). Press Ctrl+C to stop.
+echo.
+echo Installing dependencies if needed...
+pip install -r requirements.txt
+echo.
+echo Starting daemon...
+python scrape_daemon.py --interval 6h --run-now
+pause
@@ -0,0 +1,52 @@
+"""
+Per-run report directory
+Every scraper run gets scraper/reports/<name>-<run id>/ with a summary.json plus any extra files
+(changeset, profiles, ...) written next to it
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+REPORTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reports')
+
+
+class RunReport:
+    """Collects report sections during a run and writes them at the end"""
+
+    def __init__(self, name='scrape', base_dir=REPORTS_DIR):
+        self.run_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.name = name
+        self.dir = os.path.join(base_dir, f"{name}-{self.run_id}")
+        self.started = time.time()
+        self.sections = {}
+
+    def path(self, filename):
+        """Absolute path for a file inside this run's report directory"""
+        os.makedirs(self.dir, exist_ok=True)
+        return os.path.join(self.dir, filename)
+
+    def write_json(self, filename, data):
+        path = self.path(filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+        return path
+
+    def add(self, section, data):
+        """Add (or replace) a section of summary.json"""
+        self.sections[section] = data
+
+    def finalize(self):
+        finished = time.time()
+        summary = {
+            'run_id': self.run_id,
+            'name': self.name,
+            'started_at': datetime.fromtimestamp(self.started).isoformat(),
+            'finished_at': datetime.fromtimestamp(finished).isoformat(),
+            'wall_time_s': round(finished - self.started, 1),
+            **self.sections,
+        }
+        path = self.write_json('summary.json', summary)
+        print(f"📝 Run report: {path}")
+        return path
@@ -0,0 +1,298 @@
+"""
+Compressed, versioned run snapshots
+Each scraper run stores what it saw (records + per-combination membership) as a small
+lzma-compressed columnar file, listed in snapshots/manifest.json. Only complete sweeps of the same
+scraper are compared by default: a partial run (time budget, crash, skipped combinations) did not
+visit everything, so a university missing from it was not necessarily gone
+
+Usage:
+    python run_snapshots.py list
+    python run_snapshots.py diff previous latest
+    python run_snapshots.py history "Allama Iqbal Open University (AIOU)"
+    python run_snapshots.py diff previous latest --scraper fast --include-partial
+"""
+
+import argparse
+import hashlib
+import json
+import lzma
+import os
+import sys
+import time
+from datetime import datetime
+
+SNAPSHOTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+MANIFEST_FILE = 'manifest.json'
+SNAPSHOT_FORMAT = 1
+
+# Columns stored per record; low-cardinality ones are dictionary-encoded
+COLUMNS = ('name', 'city', 'type', 'website')
+DICTIONARY_COLUMNS = ('city', 'type')
+
+
+def combination_key(sector, chartered_by, discipline, province, city):
+    """Stable key for one filter combination"""
+    return '|'.join([sector, chartered_by, discipline, province, city])
+
+
+def delta_encode(indices):
+    previous = 0
+    deltas = []
+    for index in sorted(indices):
+        deltas.append(index - previous)
+        previous = index
+    return deltas
+
+
+def delta_decode(deltas):
+    total = 0
+    indices = []
+    for delta in deltas:
+        total += delta
+        indices.append(total)
+    return indices
+
+
+def load_manifest(snapshots_dir=SNAPSHOTS_DIR):
+    try:
+        with open(os.path.join(snapshots_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'format': SNAPSHOT_FORMAT, 'runs': []}
+
+
+def save_manifest(manifest, snapshots_dir=SNAPSHOTS_DIR):
+    path = os.path.join(snapshots_dir, MANIFEST_FILE)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def write_snapshot(run_id, records, membership, scraper='scrape', complete=False, snapshots_dir=SNAPSHOTS_DIR):
+    """records: name -> record dict; membership: combination key -> iterable of names;
+    complete: the run visited every combination (only then does "absent" mean something)"""
+    os.makedirs(snapshots_dir, exist_ok=True)
+
+    names = sorted(records)
+    row_of = {name: row for row, name in enumerate(names)}
+
+    columns = {'name': names}
+    dictionaries = {}
+    for column in COLUMNS[1:]:
+        values = [records[name].get(column) or '' for name in names]
+        if column in DICTIONARY_COLUMNS:
+            dictionary = sorted(set(values))
+            code = {value: i for i, value in enumerate(dictionary)}
+            dictionaries[column] = dictionary
+            values = [code[value] for value in values]
+        columns[column] = values
+
+    keys = sorted(membership)
+    payload = {
+        'format': SNAPSHOT_FORMAT,
+        'run_id': run_id,
+        'scraper': scraper,
+        'complete': bool(complete),
+        'columns': columns,
+        'dictionaries': dictionaries,
+        'membership': {
+            'keys': keys,
+            'rows': [delta_encode(row_of[n] for n in set(membership[k]) if n in row_of) for k in keys],
+        },
+    }
+
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    data = lzma.compress(raw, preset=9)
+    filename = f"{run_id}.snap.xz"
+    with open(os.path.join(snapshots_dir, filename), 'wb') as f:
+        f.write(data)
+
+    manifest = load_manifest(snapshots_dir)
+    manifest['runs'] = [r for r in manifest['runs'] if r['run_id'] != run_id]
+    manifest['runs'].append({
+        'run_id': run_id,
+        'file': filename,
+        'scraper': scraper,
+        'complete': bool(complete),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'records': len(names),
+        'combinations': len(keys),
+        'bytes': len(data),
+        'sha256': hashlib.sha256(data).hexdigest(),
+    })
+    manifest['runs'].sort(key=lambda r: r['run_id'])
+    save_manifest(manifest, snapshots_dir)
+    return os.path.join(snapshots_dir, filename)
+
+
+class Snapshot:
+    """Decoded snapshot: records by name and membership by combination key"""
+
+    def __init__(self, payload):
+        self.run_id = payload['run_id']
+        columns = payload['columns']
+        dictionaries = payload['dictionaries']
+        names = columns['name']
+
+        self.records = {}
+        for row, name in enumerate(names):
+            record = {'name': name}
+            for column in COLUMNS[1:]:
+                value = columns[column][row]
+                if column in dictionaries:
+                    value = dictionaries[column][value]
+                record[column] = value
+            self.records[name] = record
+
+        membership = payload['membership']
+        self.membership = {
+            key: {names[row] for row in delta_decode(deltas)}
+            for key, deltas in zip(membership['keys'], membership['rows'])
+        }
+
+
+def comparable_runs(manifest, scraper='scrape', include_partial=False):
+    """Runs of one scraper (None: any), complete sweeps only unless include_partial.
+    Entries written before completeness was recorded count as partial"""
+    return [run for run in manifest['runs']
+            if (scraper is None or run.get('scraper') == scraper)
+            and (include_partial or run.get('complete'))]
+
+
+def resolve_run(manifest, ref, runs=None):
+    """'latest', 'previous', a run id or a unique run id prefix -> manifest entry
+    ('latest' / 'previous' are taken from `runs`, default all runs)"""
+    if runs is None:
+        runs = manifest['runs']
+    if not runs:
+        raise SystemExit("No matching snapshots yet (partial runs need --include-partial)")
+    if ref == 'latest':
+        return runs[-1]
+    if ref == 'previous':
+        if len(runs) < 2:
+            raise SystemExit("Only one snapshot available")
+        return runs[-2]
+    matches = [r for r in manifest['runs'] if r['run_id'].startswith(ref)]
+    if len(matches) != 1:
+        raise SystemExit(f"Snapshot '{ref}' not found or ambiguous")
+    return matches[0]
+
+
+def load_snapshot(entry, snapshots_dir=SNAPSHOTS_DIR):
+    with open(os.path.join(snapshots_dir, entry['file']), 'rb') as f:
+        return Snapshot(json.loads(lzma.decompress(f.read())))
+
+
+def diff_snapshots(old, new):
+    """Added / removed / changed records and membership changes between two snapshots"""
+    old_names = set(old.records)
+    new_names = set(new.records)
+    changed = []
+    for name in sorted(old_names & new_names):
+        fields = {c: [old.records[name][c], new.records[name][c]]
+                  for c in COLUMNS[1:] if old.records[name][c] != new.records[name][c]}
+        if fields:
+            changed.append({'name': name, 'fields': fields})
+
+    membership = []
+    for key in sorted(set(old.membership) & set(new.membership)):
+        joined = new.membership[key] - old.membership[key]
+        left = old.membership[key] - new.membership[key]
+        if joined or left:
+            membership.append({'combination': key, 'joined': sorted(joined), 'left': sorted(left)})
+
+    return {
+        'from': old.run_id,
+        'to': new.run_id,
+        'added': sorted(new_names - old_names),
+        'removed': sorted(old_names - new_names),
+        'changed': changed,
+        'membership': membership,
+    }
+
+
+def cmd_list(args):
+    manifest = load_manifest()
+    total = 0
+    for run in manifest['runs']:
+        total += run['bytes']
+        state = 'complete' if run.get('complete') else 'partial'
+        print(f"   {run['run_id']}  {run['scraper']:<8} {state:<8} {run['records']:>5} records "
+              f"{run['combinations']:>6} combinations  {run['bytes'] / 1024:>7.1f} KB")
+    print(f"\n📦 {len(manifest['runs'])} snapshots, {total / 1024:.1f} KB total")
+
+
+def cmd_diff(args):
+    manifest = load_manifest()
+    runs = comparable_runs(manifest, args.scraper, args.include_partial)
+    started = time.perf_counter()
+    old_entry = resolve_run(manifest, args.old, runs)
+    new_entry = resolve_run(manifest, args.new, runs)
+    old = load_snapshot(old_entry)
+    new = load_snapshot(new_entry)
+    result = diff_snapshots(old, new)
+    partial = [entry['run_id'] for entry in (old_entry, new_entry) if not entry.get('complete')]
+    if partial:
+        result['partial_runs'] = partial
+        print(f"⚠️  Partial run(s) {', '.join(partial)}: added / removed include universities that "
+              f"were simply not visited", file=sys.stderr)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    print(f"🔍 {result['from']} → {result['to']} ({elapsed:.1f} ms)\n")
+    print(f"   ➕ Added ({len(result['added'])}):")
+    for name in result['added']:
+        print(f"      {name}")
+    print(f"   ➖ Removed ({len(result['removed'])}):")
+    for name in result['removed']:
+        print(f"      {name}")
+    print(f"   ✏️  Changed ({len(result['changed'])}):")
+    for change in result['changed']:
+        print(f"      {change['name']}: {change['fields']}")
+    print(f"   🔀 Combinations with membership changes: {len(result['membership'])}")
+
+
+def cmd_history(args):
+    manifest = load_manifest()
+    previous = None
+    for run in comparable_runs(manifest, args.scraper, args.include_partial):
+        present = args.name in load_snapshot(run).records
+        if present != previous:
+            print(f"   {run['run_id']}: {'✅ present' if present else '❌ absent'}")
+            previous = present
+    if previous is None:
+        print("   No snapshots yet")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Inspect and compare scraper run snapshots')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('list', help='List snapshots and their sizes')
+
+    diff_parser = sub.add_parser('diff', help='Compare two snapshots')
+    diff_parser.add_argument('old', help="Run id (or prefix), 'previous' or 'latest'")
+    diff_parser.add_argument('new', help="Run id (or prefix), 'previous' or 'latest'")
+    diff_parser.add_argument('--json', action='store_true', help='Print the diff as JSON')
+
+    history_parser = sub.add_parser('history', help='When a university appeared / disappeared')
+    history_parser.add_argument('name', help='Exact university name')
+
+    for command_parser in (diff_parser, history_parser):
+        command_parser.add_argument('--scraper', default='scrape',
+                                    help="Only runs of this scraper: scrape, fast, ... (default: scrape)")
+        command_parser.add_argument('--include-partial', action='store_true',
+                                    help='Also use runs that did not visit every combination')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    {'list': cmd_list, 'diff': cmd_diff, 'history': cmd_history}[args.command](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Scheduled refresh daemon
+Stays resident and runs the full combination sweep on an interval or a cron expression. Chrome is
+started once and parked on the listing page between refreshes (reloaded shortly before each one),
+and the filter combinations are re-read only every --replan-hours, so a scheduled refresh starts
+scraping right away instead of paying the browser launch, page load and filter extraction again.
+"""
+
+import argparse
+import re
+import time
+from datetime import datetime, timedelta
+
+import scrape_hec_universities as scraper
+from browser_watchdog import BrowserWatchdog, DEFAULT_MAX_RSS_MB, DEFAULT_MAX_LATENCY_S, DEFAULT_RECYCLE_EVERY
+from changeset import load_existing_universities
+from driver_deadlines import (DriverDeadlines, DEFAULT_CALL_DEADLINE_S, DEFAULT_PAGE_DEADLINE_S,
+                              DEFAULT_COMBINATION_DEADLINE_S)
+from run_report import RunReport
+from stage_profiler import StageProfiler
+
+# How often the parked browser is checked between refreshes
+KEEPALIVE_SECONDS = 600
+# Reload the listing this long before a refresh so the page (and its session) is fresh
+PREWARM_SECONDS = 180
+
+CRON_FIELDS = (('minute', 0, 59), ('hour', 0, 23), ('day', 1, 31), ('month', 1, 12), ('weekday', 0, 7))
+
+
+def parse_interval(text):
+    """'90s', '30m', '6h', '1d' or plain seconds -> timedelta"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*', text.lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid interval: {text!r} (use e.g. 30m, 6h, 1d)")
+    value, unit = float(match.group(1)), match.group(2) or 's'
+    seconds = value * {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[unit]
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError("interval must be positive")
+    return timedelta(seconds=seconds)
+
+
+def parse_cron_field(text, low, high):
+    """One cron field (*, */n, a-b, a-b/n, lists) -> set of allowed values"""
+    values = set()
+    for part in text.split(','):
+        range_part, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if range_part == '*':
+            start, end = low, high
+        elif '-' in range_part:
+            start, end = (int(v) for v in range_part.split('-', 1))
+        else:
+            start = int(range_part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"{part!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Standard 5-field cron expression (minute hour day month weekday, Sunday = 0 or 7)"""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise argparse.ArgumentTypeError(f"cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        try:
+            parsed = [parse_cron_field(text, low, high) for text, (name, low, high) in zip(fields, CRON_FIELDS)]
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(f"invalid cron expression {expression!r}: {e}")
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {day % 7 for day in weekdays}
+        # Like cron: if both day and weekday are restricted, either one matching is enough
+        self.day_restricted = fields[2] != '*'
+        self.weekday_restricted = fields[4] != '*'
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment):
+        """First matching minute strictly after moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"cron expression {self.expression!r} never matches")
+
+
+def next_run_time(args, last_start, now):
+    if args.cron:
+        return args.cron.next_after(now)
+    if last_start is None:
+        return now + args.interval
+    # Fixed rate from the previous start; an overrunning refresh is followed by the next one straight away
+    return max(now, last_start + args.interval)
+
+
+def park(driver):
+    """Leave the browser on the listing page; returns the (possibly restarted) driver"""
+    if not scraper.check_driver_alive(driver):
+        print("   ⚠️  Parked browser is gone, restarting...")
+        driver = scraper.restart_driver(driver)
+        return driver
+    try:
+        driver.get(scraper.HEC_URL)
+    except Exception as e:
+        # The page load timeout often fires after the listing is usable (see plan_combinations)
+        print(f"   ⚠️  Listing reload: {str(e)[:60]}")
+    return driver
+
+
+def wait_until(run_at, driver):
+    """Sleep until run_at, keeping the parked browser alive; returns the driver to use"""
+    prewarmed = False
+    while True:
+        remaining = (run_at - datetime.now()).total_seconds()
+        if remaining <= 0:
+            return driver
+        if not prewarmed and remaining <= PREWARM_SECONDS:
+            print(f"   🔥 Reloading the listing for the {run_at:%H:%M} refresh")
+            driver = park(driver)
+            prewarmed = True
+            continue
+        until_next_step = remaining if prewarmed else remaining - PREWARM_SECONDS
+        time.sleep(max(1, min(KEEPALIVE_SECONDS, until_next_step)))
+        if not scraper.check_driver_alive(driver):
+            print("   ⚠️  Parked browser stopped responding, restarting...")
+            driver = scraper.restart_driver(driver)
+
+
+def refresh(args, driver, plan, profiler):
+    """One scheduled sweep on the warm driver. plan: {'combinations', 'planned_at'}; returns the driver"""
+    run_report = RunReport('daemon')
+    watchdog = BrowserWatchdog(args.max_browser_mb, args.max_driver_latency, args.recycle_every)
+    sweep_complete = False
+    timing = {'warm_browser': plan['combinations'] is not None}
+
+    scraper.reset_run_state()
+    scraper.existing_universities.update(load_existing_universities(scraper.universities_collection))
+    print(f"📚 Loaded {len(scraper.existing_universities)} existing universities")
+    scraper.begin_staging(run_report)
+
+    try:
+        started = time.monotonic()
+        stale = plan['planned_at'] is None or datetime.now() - plan['planned_at'] > timedelta(hours=args.replan_hours)
+        if plan['combinations'] is None or stale:
+            plan['combinations'] = scraper.plan_combinations(driver, profiler)
+            plan['planned_at'] = datetime.now()
+            timing['plan_s'] = round(time.monotonic() - started, 1)
+        else:
+            print(f"♻️  Reusing {len(plan['combinations'])} combinations planned at {plan['planned_at']:%Y-%m-%d %H:%M}")
+            timing['plan_s'] = 0
+
+        started = time.monotonic()
+        driver = scraper.run_sweep(driver, plan['combinations'], profiler, watchdog, start_from=1)
+        timing['sweep_s'] = round(time.monotonic() - started, 1)
+        # Same accounting as scrape_hec_universities.main: a failed or truncated combination makes the run partial
+        sweep_complete = not any(scraper.sweep_failures.values())
+        if not sweep_complete:
+            print(f"⚠️  Partial refresh: {scraper.sweep_failures['failed']} combinations failed, "
+                  f"{scraper.sweep_failures['truncated']} listings truncated")
+    except Exception as e:
+        print(f"\n❌ Refresh failed: {e}")
+        driver = scraper.active_driver or driver
+    finally:
+        scraper.write_run_outputs(run_report, sweep_complete)
+        run_report.add('combinations', {'processed': scraper.current_combination, 'total': scraper.total_combinations,
+                                        'empty': scraper.empty_report(), **scraper.sweep_failures})
+        run_report.add('universities', {'unique': len(scraper.scraped_universities)})
+        run_report.add('browser', watchdog.report())
+        run_report.add('deadlines', scraper.deadline_report())
+        run_report.add('daemon', {
+            'schedule': args.cron.expression if args.cron else f"every {args.interval}",
+            'planned_at': plan['planned_at'],
+            **timing,
+        })
+        if scraper.capture_network:
+            run_report.add('network_capture', dict(scraper.capture_stats))
+        run_report.finalize()
+    return driver
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run scheduled HEC refreshes from one resident browser')
+    schedule = parser.add_mutually_exclusive_group(required=True)
+    schedule.add_argument('--interval', type=parse_interval, help='Time between refresh starts, e.g. 30m, 6h, 1d')
+    schedule.add_argument('--cron', type=CronSchedule, help='Cron expression, e.g. "0 3 * * *" for 03:00 daily')
+    parser.add_argument('--run-now', action='store_true', help='Refresh once at startup before following the schedule')
+    parser.add_argument('--replan-hours', type=float, default=24,
+                        help='Re-read the filter options after this many hours (default: 24)')
+    parser.add_argument('--capture-network', action='store_true',
+                        help="Parse results from the page's data responses (DevTools) instead of the rendered list")
+    parser.add_argument('--max-browser-mb', type=int, default=DEFAULT_MAX_RSS_MB,
+                        help='Recycle Chrome between combinations once its process tree exceeds this RSS')
+    parser.add_argument('--max-driver-latency', type=float, default=DEFAULT_MAX_LATENCY_S,
+                        help='Recycle Chrome after repeated WebDriver round trips slower than this (s)')
+    parser.add_argument('--recycle-every', type=int, default=DEFAULT_RECYCLE_EVERY,
+                        help='Recycle Chrome after this many combinations (0 = never)')
+    parser.add_argument('--call-deadline', type=float, default=DEFAULT_CALL_DEADLINE_S,
+                        help='Abandon and replace the browser when one WebDriver call takes longer (s, 0 = off)')
+    parser.add_argument('--page-deadline', type=float, default=DEFAULT_PAGE_DEADLINE_S,
+                        help='Deadline for navigation calls (get / refresh) (s, 0 = off)')
+    parser.add_argument('--combination-deadline', type=float, default=DEFAULT_COMBINATION_DEADLINE_S,
+                        help='Deadline for one combination attempt (s, 0 = off)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    scraper.capture_network = args.capture_network
+    scraper.driver_deadlines = DriverDeadlines(args.call_deadline, args.page_deadline, args.combination_deadline)
+    profiler = StageProfiler()
+    plan = {'combinations': None, 'planned_at': None}
+
+    print("🚀 Starting HEC refresh daemon...")
+    driver = scraper.setup_driver()
+    scraper.active_driver = driver
+    if not args.run_now:
+        driver = park(driver)
+    last_start = None
+    try:
+        run_at = datetime.now() if args.run_now else next_run_time(args, None, datetime.now())
+        while True:
+            print(f"\n💤 Next refresh at {run_at:%Y-%m-%d %H:%M:%S}")
+            driver = wait_until(run_at, driver)
+            last_start = datetime.now()
+            print(f"\n⏰ Refresh started at {last_start:%Y-%m-%d %H:%M:%S}\n")
+            try:
+                driver = refresh(args, driver, plan, profiler)
+            except Exception as e:
+                # e.g. MongoDB unreachable while loading existing universities; try again next time
+                print(f"❌ Refresh skipped: {e}")
+                driver = scraper.active_driver or driver
+            # Park on the listing so the next refresh starts from a loaded page
+            driver = park(driver)
+            scraper.active_driver = driver
+            run_at = next_run_time(args, last_start, datetime.now())
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping daemon...")
+    finally:
+        try:
+            (scraper.active_driver or driver).quit()
+        except Exception:
+            pass
+        scraper.client.close()
+        print("👋 Browser closed. Database connection closed.")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,9 @@ HEC Recognized Universities Scraper
 Automatically scrapes all HEC recognized universities by iterating through all filter combinations
 """
 
+import argparse
 import time
+from datetime import datetime
 import json
 import os
 from selenium import webdriver
@@ -16,6 +18,26 @@ from selenium.webdriver.chrome.options import Options
 from pymongo import MongoClient
 from dotenv import load_dotenv
 
+from changeset import build_university_record, load_existing_universities, tag_record
+from run_report import RunReport
+from change_manifest import publish_changes
+from search_index import export_search_index
+from staging_store import StagingStore, sync_run
+from driver_deadlines import (DriverDeadlines, DEFAULT_CALL_DEADLINE_S, DEFAULT_PAGE_DEADLINE_S,
+                              DEFAULT_COMBINATION_DEADLINE_S)
+from run_snapshots import combination_key, write_snapshot
+from stage_profiler import StageProfiler
+from network_capture import NetworkCapture, enable_performance_logging, MAX_PAGES, NEXT_LINK_XPATH
+from scrape_queue import ScrapeQueue, LeaseHeartbeat, DEFAULT_LEASE_SECONDS, default_worker_id
+from browser_watchdog import BrowserWatchdog, DEFAULT_MAX_RSS_MB, DEFAULT_MAX_LATENCY_S, DEFAULT_RECYCLE_EVERY
+from tab_pool import TabPool, IDLE as TAB_IDLE
+from combination_priority import load_history, rank_combinations
+from filter_index import FilterIndex, SELECT_ALL
+from browser_profile import BrowserProfile, DEFAULT_MAX_MB as DEFAULT_PROFILE_MAX_MB
+from result_state import watch, wait_for_empty, wait_for_refresh, is_empty_now
+from extraction_strategy import (STRATEGIES, STRATEGY_FINDERS, listed_rows, parse_unseen_elements,
+                                 shows_universities, health_check)
+
 # Try to import webdriver_manager, but handle if it fails
 try:
     from webdriver_manager.chrome import ChromeDriverManager
@@ -28,6 +50,9 @@ load_dotenv()
 
 # MongoDB connection
 MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/manzil')
+
+# Listing page (point at mock_hec_server.py with HEC_RECOGNISED_URL for offline runs)
+HEC_URL = os.getenv('HEC_RECOGNISED_URL', 'https://www.hec.gov.pk/english/universities/Pages/recognised.aspx')
 try:
     client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
     # Test connection
@@ -45,8 +70,52 @@ print(f"✅ Using database: {db.name}, collection: {universities_collection.name
 # Store scraped universities to avoid duplicates
 scraped_universities = set()
 total_scraped = 0
+
+# Loaded once at startup (one projected read) to tell new universities apart while scraping
+existing_universities = {}
+# name -> University record for everything seen this run
+scrape_results = {}
+# combination key -> names listed for that filter combination (for run snapshots)
+combination_results = {}
+# Local SQLite staging store; records are staged as combinations finish and synced at the end
+staging = None
+staging_run_id = None
 total_combinations = 0
 current_combination = 0
+# --capture-network: read results from the listing's data responses instead of the DOM
+capture_network = False
+network = None
+# --browser-profile: persistent user-data directory shared by every launch in this process
+browser_profile = None
+# Locator chosen by the selector health check (None: try the whole cascade)
+extraction_strategy = None
+extraction_checks = []
+# Strategies already re-checked because they read fewer rows than the page listed (once each per run)
+shortfall_checked = set()
+# Listing rows read vs rows parsed in full (the rest were known names, read by key only)
+extraction_stats = {'rows': 0, 'parsed': 0}
+# Extra listing pages read through the "Next" link, and listings whose pages could not all be read
+pagination_stats = {'pages': 0, 'incomplete': 0}
+# False when the last combination's listing stopped before its last page (set by scrape_combination)
+listing_complete = True
+# Combinations the sweep gave up on, and those whose listing stopped early: either makes the run partial
+sweep_failures = {'failed': 0, 'truncated': 0}
+# Latest driver from restart_driver(), so cleanup closes the live browser even if a sweep is interrupted
+active_driver = None
+# Per-call / per-combination deadlines, enforced on every driver setup_driver() returns
+driver_deadlines = DriverDeadlines()
+capture_stats = {'captured': 0, 'dom_fallback': 0}
+# Zero-hit combinations, and those recognised from the page's empty state without the full waits
+empty_stats = {'empty': 0, 'fast_detected': 0, 'detect_seconds': []}
+# --time-budget: no new combination is started after this (time.monotonic())
+time_budget_deadline = None
+budget_exhausted = False
+# A combination that could not be read is retried once (e.g. after a browser restart)
+COMBINATION_ATTEMPTS = 2
+# Order of the filter values in a combination tuple / queue task
+FILTER_FIELDS = ('sector', 'chartered_by', 'discipline', 'province', 'city')
+# Start from combination 15 (skip first 14)
+START_FROM = 15
 
 
 def setup_driver():
@@ -65,6 +134,12 @@ def setup_driver():
     chrome_options.add_argument('--disable-extensions')
     chrome_options.add_argument('--disable-images')  # Don't load images for faster loading
     chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    if capture_network:
+        enable_performance_logging(chrome_options)
+    if browser_profile:
+        browser_profile.prepare()
+        for argument in browser_profile.chrome_arguments():
+            chrome_options.add_argument(argument)
     # Note: We need JS for filters, so don't disable it
     
     # Uncomment for headless mode
@@ -81,7 +156,7 @@ def setup_driver():
         # Set timeouts
         driver.set_page_load_timeout(120)  # 2 minutes for page load
         driver.implicitly_wait(10)  # 10 seconds for element finding
-        return driver
+        return driver_deadlines.install(driver)
     except Exception as e:
         print(f"   ⚠️  Built-in driver failed: {e}")
     
@@ -93,7 +168,7 @@ def setup_driver():
             driver = webdriver.Chrome(service=service, options=chrome_options)
             print("   ✅ Success with webdriver-manager!")
             driver.maximize_window()
-            return driver
+            return driver_deadlines.install(driver)
         except Exception as e:
             print(f"   ⚠️  webdriver-manager failed: {e}")
     
@@ -113,7 +188,7 @@ def setup_driver():
                 driver = webdriver.Chrome(service=service, options=chrome_options)
                 print("   ✅ Success with local ChromeDriver!")
                 driver.maximize_window()
-                return driver
+                return driver_deadlines.install(driver)
             except Exception as e:
                 print(f"   ⚠️  Failed with {path}: {e}")
                 continue
@@ -152,14 +227,19 @@ def check_driver_alive(driver):
 
 def restart_driver(driver):
     """Restart the driver if connection is lost"""
+    global active_driver
     try:
         driver.quit()
     except:
         pass
     time.sleep(2)
     new_driver = setup_driver()
-    new_driver.get('https://www.hec.gov.pk/english/universities/Pages/recognised.aspx')
+    load_started = time.monotonic()
+    new_driver.get(HEC_URL)
+    if browser_profile:
+        browser_profile.record_load('restart', time.monotonic() - load_started)
     time.sleep(5)
+    active_driver = new_driver
     return new_driver
 
 
@@ -372,135 +452,68 @@ def apply_filter(driver, filter_name, filter_value):
         return False
 
 
-def scrape_universities_from_page(driver):
-    """Scrape universities from current page - optimized with proper waits"""
+def scrape_universities_from_page(driver, wait=True):
+    """Scrape universities from current page - optimized with proper waits
+    (wait=False when the caller has already seen the results load, e.g. the multi-tab poller)"""
     universities = []
     
     try:
-        import re
-        
-        # Wait for university list to load with multiple strategies
-        try:
-            # Strategy 1: Wait for li elements
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.XPATH, "//li[contains(text(), 'University') or contains(text(), 'Institute') or contains(text(), 'College')]"))
-            )
-        except:
+        if wait:
+            # Wait for university list to load with multiple strategies
             try:
-                # Strategy 2: Wait for any list items
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.XPATH, "//li"))
+                # Strategy 1: Wait for li elements
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.XPATH, "//li[contains(text(), 'University') or contains(text(), 'Institute') or contains(text(), 'College')]"))
                 )
             except:
-                # Strategy 3: Wait for any divs with university text
                 try:
-                    WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.XPATH, "//div[contains(text(), 'University')]"))
+                    # Strategy 2: Wait for any list items
+                    WebDriverWait(driver, 10).until(
+                        EC.presence_of_element_located((By.XPATH, "//li"))
                     )
                 except:
-                    # If still nothing, wait a bit and try anyway
-                    time.sleep(2)
-        
-        # Additional delay for dynamic content
-        time.sleep(1.5)
-        
-        # Find all li elements containing universities - try multiple methods
-        li_elements = []
+                    # Strategy 3: Wait for any divs with university text
+                    try:
+                        WebDriverWait(driver, 5).until(
+                            EC.presence_of_element_located((By.XPATH, "//div[contains(text(), 'University')]"))
+                        )
+                    except:
+                        # If still nothing, wait a bit and try anyway
+                        time.sleep(2)
         
-        # Method 1: Direct XPath
-        try:
-            li_elements = driver.find_elements(By.XPATH, "//li[contains(text(), 'University') or contains(text(), 'Institute') or contains(text(), 'College')]")
-        except:
-            pass
+            # Additional delay for dynamic content
+            time.sleep(1.5)
         
-        # Method 2: Get all li and filter
-        if not li_elements or len(li_elements) < 2:
-            try:
-                all_lis = driver.find_elements(By.XPATH, "//li")
-                li_elements = [li for li in all_lis if 'University' in li.text or 'Institute' in li.text or 'College' in li.text]
-            except:
-                pass
+        # Strategy picked by the selector health check: one locator instead of the cascade
+        if extraction_strategy:
+            universities = parse_rows(driver, STRATEGY_FINDERS[extraction_strategy](driver))
+            if universities and extraction_strategy not in shortfall_checked:
+                listed = listed_rows(driver)
+                if listed > len(universities):
+                    shortfall_checked.add(extraction_strategy)
+                    print(f"   🔧 '{extraction_strategy}' read {len(universities)} of {listed} listed rows, re-checking selectors...")
+                    if select_extraction_strategy(driver, use_cache=False):
+                        universities = parse_rows(driver, STRATEGY_FINDERS[extraction_strategy](driver))
+            if universities or not shows_universities(driver):
+                return universities
+            print(f"   🔧 '{extraction_strategy}' found nothing on a page listing universities, re-checking selectors...")
+            if select_extraction_strategy(driver, use_cache=False):
+                return parse_rows(driver, STRATEGY_FINDERS[extraction_strategy](driver))
         
-        # Method 3: Try divs if li not working
-        if not li_elements or len(li_elements) < 2:
+        # Cascade: try each strategy until one finds at least 2 elements
+        li_elements = []
+        for name, finder in STRATEGIES:
             try:
-                divs = driver.find_elements(By.XPATH, "//div[contains(@class, 'card') or contains(@class, 'item')]")
-                li_elements = [div for div in divs if 'University' in div.text or 'Institute' in div.text]
+                li_elements = finder(driver)
             except:
                 pass
+            if li_elements and len(li_elements) >= 2:
+                break
+        universities = parse_rows(driver, li_elements)
         
-        # Method 4: Last resort - find by text anywhere
-        if not li_elements or len(li_elements) < 2:
-            try:
-                all_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'University') or contains(text(), 'Institute')]")
-                # Filter to get parent containers
-                li_elements = []
-                for elem in all_elements:
-                    parent = elem.find_element(By.XPATH, "./..")
-                    if parent and parent not in li_elements:
-                        li_elements.append(parent)
-            except:
-                pass
-        
-        for li in li_elements:
-            try:
-                text = li.text.strip()
-                if not text or len(text) < 10:
-                    continue
-                
-                # Skip if it's just a header or filter text
-                if text.lower() in ['university', 'universities', 'select all', 'filter']:
-                    continue
-                
-                # Extract university name (first line usually)
-                lines = [line.strip() for line in text.split('\n') if line.strip()]
-                if not lines:
-                    continue
-                
-                name = lines[0]
-                
-                # Clean name - remove extra whitespace and special chars
-                name = ' '.join(name.split())
-                name = re.sub(r'\s+', ' ', name)
-                
-                # Skip if name is too short or doesn't contain keywords
-                if len(name) < 5 or ('University' not in name and 'Institute' not in name and 'College' not in name):
-                    continue
-                
-                # Extract location (usually second line or in parentheses)
-                location = ''
-                if len(lines) > 1:
-                    # Take second line as location
-                    location = lines[1]
-                    # Sometimes location is in third line
-                    if len(lines) > 2 and ('Punjab' in lines[2] or 'Sindh' in lines[2] or 'Khyber' in lines[2] or 'Islamabad' in lines[2]):
-                        location = lines[1] + ', ' + lines[2]
-                else:
-                    # Try to find in parentheses
-                    location_match = re.search(r'\(([^)]+)\)', text)
-                    if location_match:
-                        location = location_match.group(1).strip()
-                
-                # Clean location - remove extra whitespace
-                location = ' '.join(location.split()) if location else ''
-                
-                # Extract link if available
-                link = ''
-                try:
-                    link_elem = li.find_element(By.TAG_NAME, 'a')
-                    link = link_elem.get_attribute('href') or ''
-                except:
-                    pass
-                
-                # Validate and add
-                if name and name not in [u['name'] for u in universities]:
-                    universities.append({
-                        'name': name,
-                        'location': location,
-                        'link': link
-                    })
-            except Exception as e:
-                continue
+        # First page with results: pick (or load the cached) strategy for the rest of the run
+        if universities and extraction_strategy is None:
+            select_extraction_strategy(driver)
         
     except Exception as e:
         print(f"      ⚠️  Error scraping universities: {e}")
@@ -508,589 +521,1191 @@ def scrape_universities_from_page(driver):
     return universities
 
 
+PAGE_CHANGE_TIMEOUT_S = 15
+
+
+def follow_pages(driver, universities):
+    """Add the listing's later pages (its "Next" link) to the first page's universities.
+    Returns (universities, complete); complete is False when a page could not be read"""
+    seen = {u.get('name') for u in universities}
+    for _ in range(MAX_PAGES):
+        next_links = [link for link in driver.find_elements(By.XPATH, NEXT_LINK_XPATH) if link.is_displayed()]
+        if not next_links:
+            return universities, True
+        watch(driver)
+        next_links[0].click()
+        if not wait_for_refresh(driver, PAGE_CHANGE_TIMEOUT_S):
+            break
+        new = [u for u in scrape_universities_from_page(driver, wait=False) if u.get('name') not in seen]
+        if not new:
+            # "Next" is still there but led nowhere new
+            break
+        seen.update(u.get('name') for u in new)
+        universities.extend(new)
+        pagination_stats['pages'] += 1
+    pagination_stats['incomplete'] += 1
+    print(f"   ⚠️  Could not read every page of this listing ({len(universities)} universities so far)")
+    return universities, False
+
+
+def parse_rows(driver, elements):
+    """Parse listing elements; rows already seen this run are only read by key (one call for all)"""
+    universities, parsed = parse_unseen_elements(driver, elements, scraped_universities)
+    extraction_stats['rows'] += len(elements)
+    extraction_stats['parsed'] += parsed
+    return universities
+
+
+def select_extraction_strategy(driver, use_cache=True):
+    """Selector health check on a page with results; sets extraction_strategy (None keeps the cascade)"""
+    global extraction_strategy
+    try:
+        strategy, page_hash, results = health_check(driver, use_cache)
+    except Exception as e:
+        print(f"   ⚠️  Selector health check failed: {str(e)[:60]}")
+        return None
+    extraction_strategy = strategy
+    extraction_checks.append({'structure': page_hash, 'strategy': strategy, 'cached': results is None,
+                              'results': results})
+    if results is None:
+        print(f"   🔧 Extraction strategy '{strategy}' (cached for page structure {page_hash})")
+    else:
+        timings = ', '.join(f"{r['strategy']}={r['records']} in {r['seconds'] * 1000:.0f}ms" for r in results)
+        print(f"   🔧 Extraction strategy '{strategy}' ({timings})")
+    return strategy
+
+
 def save_university(uni_data):
-    """Save university to MongoDB"""
+    """Record a scraped university for this run's changeset; returns True if it is new to the database"""
+    if not uni_data or not uni_data.get('name'):
+        print(f"      ⚠️  Invalid university data, skipping...")
+        return False
+    scrape_results[uni_data['name']] = build_university_record(uni_data)
+    return uni_data['name'] not in existing_universities
+
+
+def record_universities(universities, combo_key):
+    """Add one combination's results to the run; returns (new, duplicates, errors)"""
+    members = combination_results.setdefault(combo_key, set())
+    new_count = 0
+    duplicate_count = 0
+    error_count = 0
+    
+    staged = []
+    
+    for uni in universities:
+        try:
+            uni_name = uni.get('name', '').strip()
+            if not uni_name:
+                print(f"   ⚠️  Skipping: Empty name")
+                continue
+            members.add(uni_name)
+            
+            # Check if already seen in this run
+            if uni_name in scraped_universities:
+                duplicate_count += 1
+                continue
+            
+            scraped_universities.add(uni_name)
+            staged.append(uni_name)
+            if save_university({**uni, 'name': uni_name}):
+                new_count += 1
+                print(f"   🆕 New: {uni_name[:50]}")
+            else:
+                # Already in database (from the startup snapshot)
+                duplicate_count += 1
+                
+        except Exception as e:
+            error_count += 1
+            print(f"   ❌ Error processing {uni.get('name', 'Unknown')[:50]}: {str(e)[:100]}")
+    
+    stage_records(staged)
+    return new_count, duplicate_count, error_count
+
+
+def begin_staging(run_report):
+    """Stage this run's records in the local store (opened on first use)"""
+    global staging, staging_run_id
+    if staging is None:
+        staging = StagingStore()
+    staging_run_id = run_report.run_id
+    staging.begin_run(staging_run_id, run_report.name)
+
+
+def stage_records(names):
+    """Stage newly seen records so a crashed run can still be synced (staging_store.py sync)"""
+    if staging_run_id is None or not names:
+        return
+    try:
+        staging.stage(staging_run_id, [scrape_results[name] for name in names if name in scrape_results])
+    except Exception as e:
+        print(f"   ⚠️  Could not stage records: {e}")
+
+
+def write_changeset(run_report, complete):
+    """Stage the whole run locally, then sync it to the database in one cut-over (batched)"""
     global total_scraped
     
+    if staging_run_id != run_report.run_id:
+        begin_staging(run_report)
+    # Re-stage everything: filter-index tags are added after the records were first staged
+    staging.stage(staging_run_id, scrape_results.values())
+    staging.finish_run(staging_run_id, complete)
+    changeset, existing, inserted, modified = sync_run(staging, staging_run_id, universities_collection, complete)
+    run_report.write_json('changeset.json', changeset.to_report(complete))
+    run_report.add('changeset', changeset.summary())
+    
+    summary = changeset.summary()
+    print(f"\n📋 Changeset: {summary['added']} added, {summary['changed']} changed, "
+          f"{summary['unchanged']} unchanged, {summary['missing_from_hec']} not seen in this run")
+    
+    if changeset.is_empty():
+        print("   ℹ️  Nothing to write")
+        return
+    
+    total_scraped = inserted
+    print(f"   💾 Inserted {inserted}, updated {modified}")
+    publish_changes(db, run_report, changeset, existing)
+
+
+def write_run_outputs(run_report, complete):
+    """Changeset + snapshot for everything recorded this run"""
     try:
-        # Validate data
-        if not uni_data or not uni_data.get('name'):
-            print(f"      ⚠️  Invalid university data, skipping...")
-            return
-        # Parse location - extract city and province
-        location = uni_data.get('location', '')
-        city = location.split(',')[0].strip() if location else 'Unknown'
+        write_changeset(run_report, complete)
+        print(f"🎓 Total Universities Saved: {total_scraped}")
+    except Exception as e:
+        print(f"❌ Could not write changeset: {e}")
+    export_search_index(db, run_report)
+    try:
+        snapshot_path = write_snapshot(run_report.run_id, scrape_results, combination_results, scraper='scrape',
+                                       complete=complete)
+        run_report.add('snapshot', os.path.basename(snapshot_path))
+        print(f"🗜️  Snapshot: {snapshot_path}")
+    except Exception as e:
+        print(f"❌ Could not write snapshot: {e}")
+
+
+def plan_combinations(driver, profiler):
+    """Load the listing, read the filter options and return the combinations to scrape"""
+    # Navigate to HEC website with retries
+    print("📄 Navigating to HEC website...")
+    print("⏳ This may take 60-120 seconds, please wait...\n")
+    
+    # Load page with retry mechanism
+    print("   Loading page (this may take 60-90 seconds)...")
+    page_loaded = False
+    load_started = time.monotonic()
+    for attempt in range(2):
+        try:
+            driver.get(HEC_URL)
+            page_loaded = True
+            print("   ✅ Page loaded!")
+            break
+        except TimeoutException:
+            if attempt == 0:
+                print("   ⚠️  Timeout, but page might have loaded. Continuing...")
+                page_loaded = True
+                break
+            else:
+                raise
+        except Exception as e:
+            if attempt == 0:
+                print(f"   ⚠️  Error: {str(e)[:50]}, retrying...")
+                time.sleep(3)
+            else:
+                raise
+    if browser_profile:
+        browser_profile.record_load('startup', time.monotonic() - load_started)
+    
+    # Wait for page elements to be available
+    print("   ⏳ Waiting for page elements to load (10 seconds)...")
+    time.sleep(10)  # Give time for dynamic content
+    
+    # Extract filter options
+    profiler.set_stage('filter_extraction')
+    filters = extract_filter_options(driver)
+    
+    print(f"\n📊 Filter Options Found:")
+    print(f"   Sector: {len(filters['sectors'])} options")
+    print(f"   Chartered By: {len(filters['chartered_by'])} options")
+    print(f"   Discipline: {len(filters['disciplines'])} options")
+    print(f"   Province: {len(filters['provinces'])} options")
+    print(f"   City: {len(filters['cities'])} options\n")
+    
+    # OPTIMIZATION: Use only specific filters as requested
+    # Provinces: Punjab, Sindh, Khyber Pakhtunkhwa, Islamabad
+    # Cities: Islamabad, Rawalpindi, Karachi, Lahore, Peshawar
+    # Sectors: Both (Public, Private)
+    # Disciplines: All
+    # Chartered By: All
+    
+    target_provinces = ['Punjab', 'Sindh', 'Khyber Pakhtunkhwa', 'Islamabad Capital Territory']
+    target_cities = ['Islamabad', 'Rawalpindi', 'Karachi', 'Lahore', 'Peshawar']
+    sectors = [s for s in filters['sectors'] if s != 'Select All'] or ['Public', 'Private']
+    chartered_by_list = [c for c in filters['chartered_by'] if c != 'Select All'] or ['Select All']
+    disciplines = [d for d in filters['disciplines'] if d != 'Select All'] or ['Select All']
+    
+    # Filter provinces and cities to match only target values
+    provinces = [p for p in filters['provinces'] if any(target in p for target in target_provinces)]
+    cities = [c for c in filters['cities'] if c in target_cities]
+    
+    # If not found, try alternative matching
+    if not provinces:
+        provinces = target_provinces
+    if not cities:
+        cities = target_cities
+    
+    # Calculate total combinations (significantly reduced)
+    combination_count = len(sectors) * len(chartered_by_list) * len(disciplines) * len(provinces) * len(cities)
+    
+    print(f"\n🎯 LIMITED SCRAPING MODE:")
+    print(f"   Provinces: {len(provinces)} ({', '.join(provinces[:3])}...)")
+    print(f"   Cities: {len(cities)} ({', '.join(cities)})")
+    print(f"   Sectors: {len(sectors)} ({', '.join(sectors)})")
+    print(f"   Disciplines: {len(disciplines)}")
+    print(f"   Chartered By: {len(chartered_by_list)}")
+    print(f"\n📈 Total filter combinations: {combination_count:,}\n")
+    print("🚀 Starting optimized scraping...\n")
+    
+    combinations = []
+    for sector in sectors:
+        for chartered_by in chartered_by_list:
+            for discipline in disciplines:
+                for province in provinces:
+                    for city in cities:
+                        # Skip if all are "Select All" (already covered)
+                        if all([sector == 'Select All', chartered_by == 'Select All', 
+                               discipline == 'Select All', province == 'Select All', city == 'Select All']):
+                            continue
+                        combinations.append((sector, chartered_by, discipline, province, city))
+    return combinations
+
+
+def recycle_if_needed(driver, watchdog):
+    """Safe boundary between combinations: nothing in flight, so recycling here loses no data"""
+    recycle_reason = watchdog.check(driver)
+    if recycle_reason:
+        print(f"   ♻️  Recycling browser: {recycle_reason}")
+        try:
+            driver = restart_driver(driver)
+            watchdog.recycled(recycle_reason, driver)
+        except Exception as restart_error:
+            print(f"   ❌ Could not recycle browser: {str(restart_error)[:50]}")
+    return driver
+
+
+def scrape_combination(driver, sector, chartered_by, discipline, province, city, profiler):
+    """Load one filter combination and read its results.
+    Returns (driver, universities); universities is None if the combination could not be read
+    (the driver may have been restarted, so always keep the returned one)"""
+    global network, listing_complete
+    
+    listing_complete = True
+    profiler.set_stage('combination:navigate')
+    try:
+        # Check if driver is still alive before every operation
+        if not check_driver_alive(driver):
+            print(f"   ⚠️  Driver connection lost, restarting browser...")
+            driver = restart_driver(driver)
+            return driver, None
         
-        # Better city/province mapping
-        city_province_map = {
-            'Islamabad': 'Islamabad Capital Territory',
-            'Rawalpindi': 'Punjab',
-            'Lahore': 'Punjab',
-            'Karachi': 'Sindh',
-            'Peshawar': 'Khyber Pakhtunkhwa',
-            'Quetta': 'Balochistan',
-            'Faisalabad': 'Punjab',
-            'Multan': 'Punjab',
-            'Gujranwala': 'Punjab'
-        }
+        # Navigate back to base URL (only if needed)
+        try:
+            current_url = driver.current_url
+        except Exception as url_error:
+            if 'HTTPConnectionPool' in str(url_error) or 'Connection' in str(url_error):
+                print(f"   ⚠️  Connection error getting URL, restarting...")
+                driver = restart_driver(driver)
+                return driver, None
+            raise
         
-        # Determine province from city
-        province = 'Unknown'
-        for city_name, prov in city_province_map.items():
-            if city_name.lower() in city.lower() or city_name.lower() in location.lower():
-                city = city_name  # Normalize city name
-                province = prov
-                break
+        if 'recognised.aspx' not in current_url:
+            try:
+                if not check_driver_alive(driver):
+                    driver = restart_driver(driver)
+                    return driver, None
+                driver.get(HEC_URL)
+                time.sleep(3)
+            except Exception as nav_error:
+                error_str = str(nav_error)
+                if 'HTTPConnectionPool' in error_str or 'Connection' in error_str or 'ConnectionResetError' in error_str:
+                    print(f"   ⚠️  Connection error, restarting browser...")
+                    driver = restart_driver(driver)
+                    return driver, None
+                time.sleep(3)
+        else:
+            # Refresh page to reset filters - but use JavaScript to avoid timeout
+            try:
+                if not check_driver_alive(driver):
+                    driver = restart_driver(driver)
+                    return driver, None
+                driver.execute_script("location.reload();")
+                time.sleep(3)
+            except Exception as refresh_error:
+                error_str = str(refresh_error)
+                if 'HTTPConnectionPool' in error_str or 'Connection' in error_str or 'ConnectionResetError' in error_str:
+                    print(f"   ⚠️  Connection error on refresh, restarting browser...")
+                    driver = restart_driver(driver)
+                    return driver, None
+                try:
+                    if not check_driver_alive(driver):
+                        driver = restart_driver(driver)
+                        return driver, None
+                    driver.refresh()
+                    time.sleep(3)
+                except:
+                    if not check_driver_alive(driver):
+                        driver = restart_driver(driver)
+                        return driver, None
+                    driver.get(HEC_URL)
+                    time.sleep(3)
+        
+        # Wait for page to be ready
+        try:
+            WebDriverWait(driver, 10).until(
+                lambda d: d.execute_script('return document.readyState') == 'complete'
+            )
+        except:
+            time.sleep(2)
+        
+        profiler.set_stage('combination:filters')
+        if capture_network:
+            if network is None or network.driver is not driver:
+                network = NetworkCapture(driver)
+            # Only responses triggered by this combination's filter changes count
+            network.mark()
+        try:
+            # Count DOM changes from here on, so a refresh that leaves no rows is noticed right away
+            watch(driver)
+        except Exception:
+            pass
         
-        # If still unknown, try to extract from location string
-        if province == 'Unknown' and location:
-            location_lower = location.lower()
-            if 'punjab' in location_lower or 'lahore' in location_lower or 'rawalpindi' in location_lower:
-                province = 'Punjab'
-            elif 'sindh' in location_lower or 'karachi' in location_lower:
-                province = 'Sindh'
-            elif 'khyber' in location_lower or 'peshawar' in location_lower:
-                province = 'Khyber Pakhtunkhwa'
-            elif 'islamabad' in location_lower:
-                province = 'Islamabad Capital Territory'
-                city = 'Islamabad'
+        # Apply filters using JavaScript (avoids timeout)
+        filters_applied = 0
         
-        # Check if exists in database
+        # Use JavaScript to apply filters (much faster, no timeout)
         try:
-            existing = universities_collection.find_one({'name': uni_data['name']})
+            # Check driver before executing script
+            if not check_driver_alive(driver):
+                print(f"   ⚠️  Driver lost before filter, restarting...")
+                driver = restart_driver(driver)
+                return driver, None
             
-            if existing:
-                # Update if needed
-                if uni_data.get('link') and not existing.get('website'):
-                    universities_collection.update_one(
-                        {'name': uni_data['name']},
-                        {'$set': {'website': uni_data['link']}}
-                    )
-                print(f"      ℹ️  Already exists: {uni_data['name']}")
-                return
+            driver.execute_script(f"""
+                var select = document.getElementById('Sector');
+                if (select) {{
+                    for (var i = 0; i < select.options.length; i++) {{
+                        if (select.options[i].text.trim() === '{sector}') {{
+                            select.value = select.options[i].value;
+                            select.dispatchEvent(new Event('change', {{ bubbles: true }}));
+                            break;
+                        }}
+                    }}
+                }}
+            """)
+            filters_applied += 1
+            time.sleep(0.5)
         except Exception as e:
-            print(f"      ⚠️  Error checking existing: {e}")
-            # Continue to save anyway
+            error_str = str(e)
+            if 'HTTPConnectionPool' in error_str or 'Connection' in error_str or 'ConnectionResetError' in error_str:
+                print(f"   ⚠️  Connection error in filter, restarting...")
+                driver = restart_driver(driver)
+                return driver, None
+            print(f"      ⚠️  Sector filter error: {error_str[:40]}")
         
-        # Determine type from sector (if available in name or we can infer)
-        uni_type = 'Public'  # Default
-        uni_name_lower = uni_data['name'].lower()
-        if 'private' in uni_name_lower or 'private' in location.lower():
-            uni_type = 'Private'
+        try:
+            if chartered_by != 'Select All':
+                driver.execute_script(f"""
+                    var select = document.getElementById('Charter');
+                    if (select) {{
+                        for (var i = 0; i < select.options.length; i++) {{
+                            if (select.options[i].text.trim() === '{chartered_by}') {{
+                                select.value = select.options[i].value;
+                                select.dispatchEvent(new Event('change', {{ bubbles: true }}));
+                                break;
+                            }}
+                        }}
+                    }}
+                """)
+                filters_applied += 1
+            time.sleep(0.5)
+        except:
+            pass
         
-        # Create new
-        university = {
-            'name': uni_data['name'],
-            'city': city if city != 'Unknown' else (location.split(',')[0].strip() if location else 'Unknown'),
-            'type': uni_type,
-            'website': uni_data.get('link', ''),
-            'description': f"HEC Recognized University located in {location or city}"
-        }
+        try:
+            if discipline != 'Select All':
+                driver.execute_script(f"""
+                    var select = document.getElementById('Disc');
+                    if (select) {{
+                        for (var i = 0; i < select.options.length; i++) {{
+                            if (select.options[i].text.trim() === '{discipline}') {{
+                                select.value = select.options[i].value;
+                                select.dispatchEvent(new Event('change', {{ bubbles: true }}));
+                                break;
+                            }}
+                        }}
+                    }}
+                """)
+                filters_applied += 1
+            time.sleep(0.5)
+        except:
+            pass
         
-        # Insert into database
-        result = universities_collection.insert_one(university)
-        if result.inserted_id:
-            total_scraped += 1
-            print(f"      ✅ Saved: {uni_data['name']} ({city}) [ID: {result.inserted_id}]")
-        else:
-            print(f"      ⚠️  Insert returned no ID for: {uni_data['name']}")
+        try:
+            driver.execute_script(f"""
+                var select = document.getElementById('Province');
+                if (select) {{
+                    for (var i = 0; i < select.options.length; i++) {{
+                        if (select.options[i].text.trim() === '{province}') {{
+                            select.value = select.options[i].value;
+                            select.dispatchEvent(new Event('change', {{ bubbles: true }}));
+                            break;
+                        }}
+                    }}
+                }}
+            """)
+            filters_applied += 1
+            time.sleep(0.5)
+        except Exception as e:
+            print(f"      ⚠️  Province filter error: {str(e)[:40]}")
+        
+        try:
+            driver.execute_script(f"""
+                var select = document.getElementById('City');
+                if (select) {{
+                    for (var i = 0; i < select.options.length; i++) {{
+                        if (select.options[i].text.trim() === '{city}') {{
+                            select.value = select.options[i].value;
+                            select.dispatchEvent(new Event('change', {{ bubbles: true }}));
+                            break;
+                        }}
+                    }}
+                }}
+            """)
+            filters_applied += 1
+        except Exception as e:
+            print(f"      ⚠️  City filter error: {str(e)[:40]}")
+        
+        print(f"   ✅ Applied {filters_applied} filters")
+        
+        universities = None
+        empty_result = False
+        if capture_network:
+            profiler.set_stage('combination:capture')
+            captured = None
+            try:
+                captured = network.capture_listing()
+            except Exception as capture_error:
+                print(f"   ⚠️  Network capture error: {str(capture_error)[:60]}")
+            if captured is None:
+                capture_stats['dom_fallback'] += 1
+                print(f"   ⚠️  No data response captured, reading the page instead...")
+            else:
+                capture_stats['captured'] += 1
+                universities, listing_complete = captured
+                if not listing_complete:
+                    pagination_stats['incomplete'] += 1
+                    print(f"   ⚠️  Could not capture every page of this listing ({len(universities)} universities so far)")
         
+        if universities is None:
+            profiler.set_stage('combination:wait_results')
+            # Wait for results with better detection
+            # First wait a bit for page to process filters; a page that settles empty ends the wait early
+            wait_started = time.monotonic()
+            empty_result = wait_for_empty(driver, 2.0)
+        
+            results_loaded = False
+            # Try multiple detection methods
+            for attempt in range(8):  # Increased attempts
+                if empty_result or is_empty_now(driver):
+                    empty_result = True
+                    break
+                try:
+                    # Method 1: Check for li elements with universities
+                    test_elements = driver.find_elements(By.XPATH, "//li[contains(text(), 'University') or contains(text(), 'Institute') or contains(text(), 'College')]")
+                    if test_elements and len(test_elements) > 0:
+                        results_loaded = True
+                        break
+                
+                    # Method 2: Check for any list items
+                    all_lis = driver.find_elements(By.XPATH, "//li")
+                    if all_lis:
+                        # Check if any contain university keywords
+                        for li in all_lis[:10]:  # Check first 10
+                            if 'University' in li.text or 'Institute' in li.text:
+                                results_loaded = True
+                                break
+                        if results_loaded:
+                            break
+                
+                    # Method 3: Check for divs with university text
+                    divs = driver.find_elements(By.XPATH, "//div[contains(text(), 'University') or contains(text(), 'Institute')]")
+                    if divs and len(divs) > 2:  # More than just headers
+                        results_loaded = True
+                        break
+                    
+                except Exception as e:
+                    pass
+            
+                time.sleep(0.5)  # Wait between attempts
+        
+            if empty_result:
+                # Explicit empty / zero-count state, or a finished refresh with no rows
+                universities = []
+                empty_stats['fast_detected'] += 1
+                empty_stats['detect_seconds'].append(round(time.monotonic() - wait_started, 2))
+                print(f"   ∅ Empty result detected in {time.monotonic() - wait_started:.2f}s")
+            else:
+                if not results_loaded:
+                    print(f"   ⚠️  No results detected after waiting, trying to scrape anyway...")
+                    # Debug: Check what's on page
+                    try:
+                        page_text = driver.find_element(By.TAG_NAME, 'body').text[:200]
+                        print(f"   🔍 Page preview: {page_text}...")
+                    except:
+                        pass
+                    # Don't skip - try scraping anyway, might still find data
+            
+                # Additional delay for dynamic content to fully load
+                time.sleep(1.5)  # Increased wait time for better results
+            
+                # Scrape universities
+                profiler.set_stage('combination:parse')
+                universities = scrape_universities_from_page(driver)
+                if universities:
+                    universities, listing_complete = follow_pages(driver, universities)
+        
+        # Debug output
+        if not universities and not empty_result:
+            print(f"   🔍 Debug: Checking page structure...")
+            try:
+                all_lis = driver.find_elements(By.XPATH, "//li")
+                print(f"   📊 Found {len(all_lis)} list items on page")
+                if all_lis:
+                    print(f"   📝 First 3 items: {[li.text[:50] for li in all_lis[:3]]}")
+            except:
+                pass
+        
+        return driver, universities
+        
+    except TimeoutException as e:
+        print(f"   ⚠️  Timeout error occurred, but trying to scrape anyway...")
+        # CRITICAL: Even on timeout, try to scrape - page might have loaded
+        try:
+            time.sleep(2)  # Small wait
+            universities = scrape_universities_from_page(driver)
+            if universities:
+                print(f"   ✅ Found {len(universities)} universities despite timeout!")
+                return driver, universities
+        except Exception as scrape_error:
+            print(f"   ❌ Could not scrape after timeout: {str(scrape_error)[:50]}")
+        return driver, None
     except Exception as e:
-        error_msg = str(e).lower()
-        if 'duplicate' in error_msg or 'e11000' in error_msg:
-            # Duplicate key error - already exists, that's fine
-            return
+        error_msg = str(e)
+        
+        # Handle connection errors - restart browser
+        if 'HTTPConnectionPool' in error_msg or 'Connection' in error_msg or 'ConnectionResetError' in error_msg:
+            print(f"   ⚠️  Browser connection lost, restarting...")
+            try:
+                driver = restart_driver(driver)
+                print(f"   ✅ Browser restarted")
+            except Exception as restart_error:
+                print(f"   ❌ Could not restart browser: {str(restart_error)[:50]}")
+            return driver, None
+        
+        # Don't show full stacktrace for timeout errors
+        if 'timeout' in error_msg.lower():
+            print(f"   ⚠️  Timeout error, skipping this combination...")
         else:
-            print(f"      ❌ Error saving {uni_data.get('name', 'Unknown')}: {e}")
-            import traceback
-            traceback.print_exc()
+            print(f"   ❌ Error: {error_msg[:80]}")
+        return driver, None
 
 
-def main():
-    """Main scraping function"""
+def read_combination(driver, combination, profiler, attempts=COMBINATION_ATTEMPTS, label=None):
+    """scrape_combination with retries, each attempt under the combination deadline.
+    Returns (driver, universities); a session abandoned on a deadline is replaced before the retry"""
+    started = time.monotonic()
+    universities = None
+    for attempt in range(attempts):
+        driver_deadlines.begin_combination()
+        try:
+            driver, universities = scrape_combination(driver, *combination, profiler)
+        finally:
+            driver_deadlines.end_combination()
+        if driver_deadlines.is_abandoned(driver):
+            try:
+                driver = restart_driver(driver)
+            except Exception as restart_error:
+                print(f"   ❌ Could not replace abandoned browser: {str(restart_error)[:50]}")
+        if universities is not None:
+            break
+        if label and attempt + 1 < attempts:
+            print(f"   🔁 Retrying combination {label}...")
+    driver_deadlines.record_latency(time.monotonic() - started)
+    return driver, universities
+
+
+def report_combination(universities, combo_key):
+    """Print and record one combination's results"""
+    if universities:
+        print(f"   ✅ Found {len(universities)} universities")
+        # Debug: Show all university names
+        print(f"   📝 Universities found:")
+        for idx, uni in enumerate(universities[:5], 1):
+            print(f"      {idx}. {uni.get('name', 'No name')[:60]}")
+        if len(universities) > 5:
+            print(f"      ... and {len(universities) - 5} more")
+        
+        # Record universities (written once at the end, from the changeset)
+        saved_count, duplicate_count, error_count = record_universities(universities, combo_key)
+        
+        # Summary
+        print(f"\n   📊 Summary:")
+        if saved_count > 0:
+            print(f"      ✅ New: {saved_count} universities")
+        if duplicate_count > 0:
+            print(f"      ℹ️  Duplicates: {duplicate_count} (already seen or in database)")
+        if error_count > 0:
+            print(f"      ❌ Errors: {error_count}")
+        if saved_count == 0 and duplicate_count == 0 and error_count == 0:
+            print(f"      ⚠️  No universities were processed!")
+    else:
+        print(f"   ⚠️  No universities found for this combination")
+        empty_stats['empty'] += 1
+        combination_results.setdefault(combo_key, set())
+
+
+def account_combination(universities, complete=True):
+    """Count a combination that could not be read (None) or whose listing stopped before its last page"""
+    if universities is None:
+        sweep_failures['failed'] += 1
+    elif not complete:
+        sweep_failures['truncated'] += 1
+
+
+def budget_spent():
+    """True once --time-budget has run out (checked before starting each combination)"""
+    global budget_exhausted
+    if time_budget_deadline is not None and time.monotonic() >= time_budget_deadline:
+        budget_exhausted = True
+    return budget_exhausted
+
+
+def prioritize_combinations(combinations):
+    """Highest historical yield first (from previous runs' snapshots); returns (combinations, stats)"""
+    history = load_history()
+    if not history:
+        print("   ℹ️  No snapshots from earlier runs yet, keeping the filter order")
+        return combinations, {'history_runs': 0}
+    combinations, stats = rank_combinations(combinations, history)
+    print(f"🎯 Ranked by yield over {stats['history_runs']} earlier runs: {stats['productive']} productive, "
+          f"{stats['never_scraped']} never scraped, {stats['redundant']} redundant, {stats['empty']} always empty")
+    for share, count in stats['combinations_for_coverage'].items():
+        if count:
+            print(f"   {share} of {stats['known_universities']} known universities within the first {count} combinations")
+    return combinations, stats
+
+
+def run_sweep(driver, combinations, profiler, watchdog, start_from=START_FROM):
+    """Scrape every combination (from start_from on) into this run's results; returns the live driver"""
     global total_combinations, current_combination
     
-    print("🚀 Starting HEC University Scraping with Python/Selenium...\n")
-    
-    driver = setup_driver()
+    total_combinations = len(combinations)
+    skipped = 0
     
-    try:
-        # Navigate to HEC website with retries
-        print("📄 Navigating to HEC website...")
-        print("⏳ This may take 60-120 seconds, please wait...\n")
+    # Iterate through combinations
+    for sector, chartered_by, discipline, province, city in combinations:
+        if budget_spent():
+            print(f"\n⏱️  Time budget spent, stopping before combination {current_combination + 1}")
+            break
+        current_combination += 1
         
-        # Load page with retry mechanism
-        print("   Loading page (this may take 60-90 seconds)...")
-        page_loaded = False
-        for attempt in range(2):
-            try:
-                driver.get('https://www.hec.gov.pk/english/universities/Pages/recognised.aspx')
-                page_loaded = True
-                print("   ✅ Page loaded!")
-                break
-            except TimeoutException:
-                if attempt == 0:
-                    print("   ⚠️  Timeout, but page might have loaded. Continuing...")
-                    page_loaded = True
-                    break
-                else:
-                    raise
-            except Exception as e:
-                if attempt == 0:
-                    print(f"   ⚠️  Error: {str(e)[:50]}, retrying...")
-                    time.sleep(3)
-                else:
-                    raise
+        # Skip first 14 combinations
+        if current_combination < start_from:
+            skipped += 1
+            continue
         
-        # Wait for page elements to be available
-        print("   ⏳ Waiting for page elements to load (10 seconds)...")
-        time.sleep(10)  # Give time for dynamic content
+        print(f"[{current_combination}/{total_combinations}] {sector} | {chartered_by} | {discipline} | {province} | {city}")
+        combo_key = combination_key(sector, chartered_by, discipline, province, city)
+        if skipped > 0:
+            print(f"   ⏭️  Skipped {skipped} combinations, starting from {start_from}")
+            skipped = 0
         
-        # Extract filter options
-        filters = extract_filter_options(driver)
+        driver = recycle_if_needed(driver, watchdog)
         
-        print(f"\n📊 Filter Options Found:")
-        print(f"   Sector: {len(filters['sectors'])} options")
-        print(f"   Chartered By: {len(filters['chartered_by'])} options")
-        print(f"   Discipline: {len(filters['disciplines'])} options")
-        print(f"   Province: {len(filters['provinces'])} options")
-        print(f"   City: {len(filters['cities'])} options\n")
+        driver, universities = read_combination(driver, (sector, chartered_by, discipline, province, city), profiler,
+                                                label=current_combination)
         
-        # OPTIMIZATION: Use only specific filters as requested
-        # Provinces: Punjab, Sindh, Khyber Pakhtunkhwa, Islamabad
-        # Cities: Islamabad, Rawalpindi, Karachi, Lahore, Peshawar
-        # Sectors: Both (Public, Private)
-        # Disciplines: All
-        # Chartered By: All
+        profiler.set_stage('combination:record')
+        account_combination(universities, listing_complete)
+        if universities is not None:
+            report_combination(universities, combo_key)
         
-        target_provinces = ['Punjab', 'Sindh', 'Khyber Pakhtunkhwa', 'Islamabad Capital Territory']
-        target_cities = ['Islamabad', 'Rawalpindi', 'Karachi', 'Lahore', 'Peshawar']
-        sectors = [s for s in filters['sectors'] if s != 'Select All'] or ['Public', 'Private']
-        chartered_by_list = [c for c in filters['chartered_by'] if c != 'Select All'] or ['Select All']
-        disciplines = [d for d in filters['disciplines'] if d != 'Select All'] or ['Select All']
+        # Progress update (every 3 combinations for faster feedback)
+        if current_combination % 3 == 0:
+            new_so_far = sum(1 for name in scrape_results if name not in existing_universities)
+            print(f"\n📊 Progress: {current_combination}/{total_combinations} ({current_combination/total_combinations*100:.1f}%) | Unique: {len(scraped_universities)} | New: {new_so_far}\n")
+    
+    return driver
+
+
+def filter_steps(sector, chartered_by, discipline, province, city):
+    """(select id, option text) in the order scrape_combination applies them"""
+    steps = [('Sector', sector)]
+    if chartered_by != 'Select All':
+        steps.append(('Charter', chartered_by))
+    if discipline != 'Select All':
+        steps.append(('Disc', discipline))
+    steps += [('Province', province), ('City', city)]
+    return steps
+
+
+def run_tab_sweep(driver, combinations, profiler, watchdog, tabs, start_from=START_FROM):
+    """run_sweep over several tabs of one browser: while one tab waits for its results the others
+    are reloaded, filtered or parsed. Returns (driver, tab pool report)"""
+    global total_combinations, current_combination
+    
+    total_combinations = len(combinations)
+    current_combination = max(0, start_from - 1)
+    pending = [(combination, 1) for combination in combinations[current_combination:]]
+    if current_combination:
+        print(f"   ⏭️  Skipped {current_combination} combinations, starting from {start_from}")
+    
+    pool = TabPool(tabs, HEC_URL)
+    pool.open(driver)
+    # The poller does the waiting; implicit waits would block every tab on an empty lookup
+    driver.implicitly_wait(0)
+    print(f"🗂️  Scraping with {len(pool.tabs)} tabs in one browser\n")
+    recycle_reason = None
+    
+    try:
+        while pending or pool.busy():
+            progressed = False
+            if pending and budget_spent():
+                print(f"\n⏱️  Time budget spent, finishing the {sum(t.phase != TAB_IDLE for t in pool.tabs)} combinations in flight")
+                pending.clear()
+            
+            # Recycle only between combinations: stop handing out work until every tab is idle
+            if recycle_reason and not pool.busy():
+                print(f"   ♻️  Recycling browser: {recycle_reason}")
+                driver = restart_driver(driver)
+                watchdog.recycled(recycle_reason, driver)
+                pool.open(driver)
+                driver.implicitly_wait(0)
+                recycle_reason = None
+            
+            for tab in pool.tabs:
+                try:
+                    if tab.phase == TAB_IDLE:
+                        if not pending or recycle_reason:
+                            continue
+                        recycle_reason = watchdog.check(driver)
+                        if recycle_reason:
+                            continue
+                        combination, attempt = pending.pop(0)
+                        profiler.set_stage('combination:navigate')
+                        pool.start(tab, combination, filter_steps(*combination), attempt)
+                        progressed = True
+                        continue
+                    
+                    profiler.set_stage('combination:wait_results')
+                    status = pool.poll(tab)
+                    if status is None:
+                        continue
+                    progressed = True
+                    combination, attempt = tab.combination, tab.attempt
+                    
+                    universities = None
+                    complete = True
+                    if status == 'ready':
+                        profiler.set_stage('combination:parse')
+                        universities = scrape_universities_from_page(driver, wait=False)
+                        if universities:
+                            universities, complete = follow_pages(driver, universities)
+                    elif status == 'empty':
+                        universities = []
+                        empty_stats['fast_detected'] += 1
+                        empty_stats['detect_seconds'].append(round(time.monotonic() - tab.phase_started, 2))
+                    if status != 'failed':
+                        driver_deadlines.record_latency(time.monotonic() - tab.started)
+                    pool.finish(tab, completed=status != 'failed')
+                    
+                    if status == 'failed':
+                        if attempt < COMBINATION_ATTEMPTS:
+                            print(f"   🔁 Tab {tab.index + 1}: listing did not load, retrying {' | '.join(combination)}")
+                            pending.insert(0, (combination, attempt + 1))
+                        else:
+                            account_combination(None)
+                        continue
+                    
+                    account_combination(universities, complete)
+                    current_combination += 1
+                    print(f"[{current_combination}/{total_combinations}] (tab {tab.index + 1}) {' | '.join(combination)}")
+                    profiler.set_stage('combination:record')
+                    report_combination(universities, combination_key(*combination))
+                    if current_combination % 3 == 0:
+                        new_so_far = sum(1 for name in scrape_results if name not in existing_universities)
+                        print(f"\n📊 Progress: {current_combination}/{total_combinations} ({current_combination/total_combinations*100:.1f}%) | Unique: {len(scraped_universities)} | New: {new_so_far}\n")
+                
+                except Exception as e:
+                    progressed = True
+                    in_flight = [(t.combination, t.attempt) for t in pool.tabs if t.phase != TAB_IDLE]
+                    if check_driver_alive(driver):
+                        # Only this tab is affected: give its combination another go
+                        print(f"   ⚠️  Tab {tab.index + 1}: {str(e)[:60]}")
+                        if tab.attempt < COMBINATION_ATTEMPTS:
+                            pending.insert(0, (tab.combination, tab.attempt + 1))
+                        else:
+                            account_combination(None)
+                        pool.finish(tab, completed=False)
+                        continue
+                    # Browser gone: requeue everything that was in flight and start over with fresh tabs
+                    print(f"   ⚠️  Browser connection lost, restarting with {len(pool.tabs)} tabs...")
+                    pending[:0] = [(c, a + 1) for c, a in in_flight if a < COMBINATION_ATTEMPTS]
+                    for _ in range(sum(a >= COMBINATION_ATTEMPTS for _, a in in_flight)):
+                        account_combination(None)
+                    driver = restart_driver(driver)
+                    pool.open(driver)
+                    driver.implicitly_wait(0)
+                    break
+            
+            if not progressed:
+                time.sleep(0.05)
+    finally:
+        try:
+            driver.implicitly_wait(10)
+        except Exception:
+            pass
+    
+    return driver, pool.report()
+
+
+def run_index_sweep(driver, combinations, profiler, watchdog):
+    """--index: query every filter option once on its own instead of every combination.
+    Returns (driver, FilterIndex)"""
+    global total_combinations, current_combination
+    
+    # The options are exactly the values plan_combinations put into the combinations
+    options = {field: list(dict.fromkeys(c[i] for c in combinations)) for i, field in enumerate(FILTER_FIELDS)}
+    queries = [(None, None)] + [(field, option) for field in FILTER_FIELDS
+                                for option in options[field] if option != SELECT_ALL]
+    total_combinations = len(queries)
+    print(f"🗂️  Filter index: {len(queries)} queries instead of {len(combinations):,} combinations\n")
+    index = FilterIndex(FILTER_FIELDS)
+    
+    for field, option in queries:
+        if budget_spent():
+            print(f"\n⏱️  Time budget spent, stopping before query {current_combination + 1}")
+            break
+        current_combination += 1
+        filters = dict.fromkeys(FILTER_FIELDS, SELECT_ALL)
+        if field:
+            filters[field] = option
+        combination = tuple(filters[f] for f in FILTER_FIELDS)
+        print(f"[{current_combination}/{total_combinations}] {field or 'all'}: {option or SELECT_ALL}")
         
-        # Filter provinces and cities to match only target values
-        provinces = [p for p in filters['provinces'] if any(target in p for target in target_provinces)]
-        cities = [c for c in filters['cities'] if c in target_cities]
+        driver = recycle_if_needed(driver, watchdog)
+        driver, universities = read_combination(driver, combination, profiler)
         
-        # If not found, try alternative matching
-        if not provinces:
-            provinces = target_provinces
-        if not cities:
-            cities = target_cities
+        profiler.set_stage('combination:record')
+        account_combination(universities, listing_complete)
+        if universities is None:
+            index.failed.append((field, option))
+            continue
+        report_combination(universities, combination_key(*combination))
+        if not listing_complete:
+            # A partial bitmap would make every intersection with it wrong
+            index.failed.append((field, option))
+            continue
+        index.add(field, option, [u['name'] for u in universities])
+    
+    return driver, index
+
+
+def apply_filter_index(index, combinations):
+    """Derive every combination's membership from the index and tag this run's records"""
+    derived = 0
+    for combination in combinations:
+        names = index.members(combination)
+        if names is None:
+            continue
+        combination_results[combination_key(*combination)] = set(names)
+        derived += 1
+    for name, tags in index.tags().items():
+        if name in scrape_results:
+            tag_record(scrape_results[name], tags)
+    print(f"🧮 Derived membership for {derived:,} combinations by intersection; tagged {len(index.names)} universities")
+    return derived
+
+
+def throughput_report(sweep_started, browser, tabs, tab_report, start_from=START_FROM):
+    """Sweep wall time and combinations per minute, with peak browser memory per unit of throughput"""
+    wall_time = time.monotonic() - sweep_started
+    # Both sweeps count the skipped leading combinations in current_combination
+    processed = max(0, current_combination - (start_from - 1))
+    per_minute = processed / (wall_time / 60) if wall_time > 0 else 0
+    rss_peak = browser.get('rss_peak_mb')
+    report = {
+        'tabs': tabs,
+        'sweep_wall_time_s': round(wall_time, 1),
+        'combinations': processed,
+        'combinations_per_min': round(per_minute, 2),
+        'rss_peak_mb': rss_peak,
+        'mb_per_combination_per_min': round(rss_peak / per_minute, 1) if rss_peak and per_minute else None,
+    }
+    if tab_report:
+        report['completed_per_tab'] = tab_report['completed_per_tab']
+    return report
+
+
+def reset_run_state():
+    """Clear per-run results so a long-lived process (scrape_daemon.py) can run the sweep again"""
+    global total_scraped, total_combinations, current_combination, staging_run_id
+    scraped_universities.clear()
+    existing_universities.clear()
+    scrape_results.clear()
+    combination_results.clear()
+    total_scraped = 0
+    total_combinations = 0
+    current_combination = 0
+    staging_run_id = None
+    driver_deadlines.reset_stats()
+    extraction_stats.update({'rows': 0, 'parsed': 0})
+    pagination_stats.update({'pages': 0, 'incomplete': 0})
+    sweep_failures.update({'failed': 0, 'truncated': 0})
+    shortfall_checked.clear()
+    empty_stats.update({'empty': 0, 'fast_detected': 0, 'detect_seconds': []})
+
+
+def deadline_report():
+    """Deadlines, combination latency percentiles and abandoned sessions (also printed)"""
+    report = driver_deadlines.report()
+    latency = report['combination_latency_s']
+    if latency['count']:
+        print(f"⏱️  Combination latency: p50 {latency['p50']}s, p90 {latency['p90']}s, p99 {latency['p99']}s, "
+              f"max {latency['max']}s; {len(report['abandoned_sessions'])} sessions abandoned on a deadline")
+    return report
+
+
+def empty_report():
+    """Zero-hit combinations for the run report"""
+    detect = empty_stats['detect_seconds']
+    return {
+        'empty': empty_stats['empty'],
+        'fast_detected': empty_stats['fast_detected'],
+        'detect_avg_s': round(sum(detect) / len(detect), 2) if detect else None,
+        'detect_max_s': max(detect) if detect else None,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Scrape HEC recognised universities across all filter combinations')
+    parser.add_argument('--profile', action='store_true',
+                        help='Sample the run per stage; writes profile.folded + hotspots.txt to the run report')
+    parser.add_argument('--capture-network', action='store_true',
+                        help="Parse results from the page's data responses (DevTools) instead of the rendered list")
+    parser.add_argument('--max-browser-mb', type=int, default=DEFAULT_MAX_RSS_MB,
+                        help='Recycle Chrome between combinations once its process tree exceeds this RSS')
+    parser.add_argument('--max-driver-latency', type=float, default=DEFAULT_MAX_LATENCY_S,
+                        help='Recycle Chrome after repeated WebDriver round trips slower than this (s)')
+    parser.add_argument('--recycle-every', type=int, default=DEFAULT_RECYCLE_EVERY,
+                        help='Recycle Chrome after this many combinations (0 = never)')
+    parser.add_argument('--prioritize', action='store_true',
+                        help="Scrape combinations in order of their yield in earlier runs' snapshots")
+    parser.add_argument('--time-budget', type=float, metavar='MINUTES',
+                        help='Stop starting new combinations after this many minutes (implies --prioritize)')
+    parser.add_argument('--index', action='store_true',
+                        help='Query each filter option once and derive combinations by intersection (also tags sector / charter / disciplines)')
+    parser.add_argument('--browser-profile', nargs='?', const='default', metavar='NAME',
+                        help='Keep a persistent Chrome profile (warm HTTP/code cache) in browser_profiles/NAME')
+    parser.add_argument('--profile-max-mb', type=int, default=DEFAULT_PROFILE_MAX_MB,
+                        help='Empty the persistent profile\'s caches before a launch once it is larger than this')
+    parser.add_argument('--call-deadline', type=float, default=DEFAULT_CALL_DEADLINE_S,
+                        help='Abandon and replace the browser when one WebDriver call takes longer (s, 0 = off)')
+    parser.add_argument('--page-deadline', type=float, default=DEFAULT_PAGE_DEADLINE_S,
+                        help='Deadline for navigation calls (get / refresh) (s, 0 = off)')
+    parser.add_argument('--combination-deadline', type=float, default=DEFAULT_COMBINATION_DEADLINE_S,
+                        help='Deadline for one combination attempt (s, 0 = off)')
+    parser.add_argument('--tabs', type=int, default=1,
+                        help='Work on this many listing tabs in one browser at once (default: 1)')
+    parser.add_argument('--queue', choices=('publish', 'work', 'finalize'),
+                        help='Distributed sweep: publish combinations as tasks, work on them, or finalize results')
+    parser.add_argument('--sweep', help='Sweep id for --queue (default: new id for publish, newest open sweep otherwise)')
+    parser.add_argument('--lease', type=int, default=DEFAULT_LEASE_SECONDS,
+                        help='Task lease in seconds; a worker silent for this long loses its task')
+    parser.add_argument('--worker-id', default=default_worker_id(), help='Worker name stored on claimed tasks')
+    return parser.parse_args()
+
+
+def publish_sweep(args, queue, profiler):
+    """Read the filter options once and publish every combination as a task"""
+    sweep = args.sweep or datetime.now().strftime('%Y%m%d-%H%M%S')
+    driver = setup_driver()
+    try:
+        combinations = plan_combinations(driver, profiler)
+    finally:
+        driver.quit()
+    
+    tasks = [(combination_key(*combination), dict(zip(FILTER_FIELDS, combination))) for combination in combinations]
+    inserted = queue.publish(sweep, tasks)
+    print(f"📬 Published {inserted} new tasks ({len(tasks)} combinations) to sweep {sweep}")
+    print(f"   Start workers on any machine: python scrape_hec_universities.py --queue work --sweep {sweep}")
+
+
+def work_sweep(args, queue, sweep, profiler, watchdog):
+    """Claim and scrape tasks until the sweep is drained; returns the number of tasks completed"""
+    completed = 0
+    driver = setup_driver()
+    try:
+        while True:
+            task = queue.claim(sweep, args.worker_id)
+            if task is None:
+                if queue.is_drained(sweep):
+                    break
+                # Remaining tasks are leased by other workers; wait in case one of them dies
+                time.sleep(min(30, args.lease / 3))
+                continue
+            
+            filters = task['filters']
+            print(f"[{args.worker_id}] {task['key'].replace('|', ' | ')} (attempt {task['attempts']})")
+            driver = recycle_if_needed(driver, watchdog)
+            with LeaseHeartbeat(queue, task, args.worker_id):
+                # One attempt: a failed task goes back to the queue instead
+                driver, universities = read_combination(driver, tuple(filters[field] for field in FILTER_FIELDS),
+                                                        profiler, attempts=1)
+            
+            if universities is None:
+                queue.fail(task, args.worker_id, 'could not read combination')
+                print(f"   🔁 Returned to the queue")
+                continue
+            result = [{'name': u['name'], 'location': u.get('location', ''), 'link': u.get('link', '')}
+                      for u in universities]
+            if queue.complete(task, args.worker_id, result):
+                completed += 1
+                print(f"   ✅ {len(result)} universities stored")
+            else:
+                print(f"   ℹ️  Already completed by another worker")
+    finally:
+        driver.quit()
+    return completed
+
+
+def finalize_sweep(queue, sweep):
+    """Diff the whole sweep's results against the database once and write changeset, snapshot and report"""
+    run_report = RunReport('scrape')
+    existing_universities.update(load_existing_universities(universities_collection))
+    begin_staging(run_report)
+    
+    for key, universities in queue.results(sweep):
+        record_universities(universities, key)
+    counts = queue.progress(sweep)
+    
+    # Failed tasks mean some combinations were never read, so "missing" would be unreliable
+    write_run_outputs(run_report, counts['failed'] == 0)
+    run_report.add('queue', {'sweep': sweep, **counts})
+    run_report.add('universities', {'unique': len(scraped_universities)})
+    run_report.finalize()
+
+
+def run_queue(args):
+    """--queue publish / work / finalize"""
+    queue = ScrapeQueue(db, args.lease)
+    profiler = StageProfiler()
+    try:
+        if args.queue == 'publish':
+            publish_sweep(args, queue, profiler)
+            return
         
-        # Calculate total combinations (significantly reduced)
-        total_combinations = len(sectors) * len(chartered_by_list) * len(disciplines) * len(provinces) * len(cities)
+        sweep = args.sweep or queue.latest_sweep()
+        if not sweep:
+            print("⚠️  No open sweep. Publish one with --queue publish")
+            return
         
-        print(f"\n🎯 LIMITED SCRAPING MODE:")
-        print(f"   Provinces: {len(provinces)} ({', '.join(provinces[:3])}...)")
-        print(f"   Cities: {len(cities)} ({', '.join(cities)})")
-        print(f"   Sectors: {len(sectors)} ({', '.join(sectors)})")
-        print(f"   Disciplines: {len(disciplines)}")
-        print(f"   Chartered By: {len(chartered_by_list)}")
-        print(f"\n📈 Total filter combinations: {total_combinations:,}\n")
-        print("🚀 Starting optimized scraping...\n")
+        if args.queue == 'work':
+            watchdog = BrowserWatchdog(args.max_browser_mb, args.max_driver_latency, args.recycle_every)
+            completed = work_sweep(args, queue, sweep, profiler, watchdog)
+            print(f"\n✅ Worker {args.worker_id} completed {completed} tasks")
+            print(f"📊 Sweep {sweep}: {queue.progress(sweep)}")
         
-        # Start from combination 15 (skip first 14)
-        START_FROM = 15
-        skipped = 0
+        # Exactly one worker (or an explicit finalize) writes the sweep's changeset
+        if queue.claim_finalize(sweep, args.worker_id, force=args.queue == 'finalize'):
+            print(f"\n📦 Finalizing sweep {sweep}...")
+            finalize_sweep(queue, sweep)
+    finally:
+        client.close()
+
+
+def main():
+    """Main scraping function"""
+    global capture_network, time_budget_deadline, browser_profile, driver_deadlines
+    
+    args = parse_args()
+    capture_network = args.capture_network
+    driver_deadlines = DriverDeadlines(args.call_deadline, args.page_deadline, args.combination_deadline)
+    if args.browser_profile:
+        browser_profile = BrowserProfile(args.browser_profile, max_mb=args.profile_max_mb)
+        print(f"🗄️  Browser profile: {browser_profile.acquire()}")
+    if args.queue:
+        try:
+            run_queue(args)
+        finally:
+            if browser_profile:
+                browser_profile.release()
+        return
+    print("🚀 Starting HEC University Scraping with Python/Selenium...\n")
+    
+    run_report = RunReport('scrape')
+    profiler = StageProfiler(enabled=args.profile).start()
+    watchdog = BrowserWatchdog(args.max_browser_mb, args.max_driver_latency, args.recycle_every)
+    sweep_complete = False
+    tab_report = None
+    sweep_started = None
+    start_from = START_FROM
+    if args.tabs > 1 and capture_network:
+        # The performance log is per session, so responses from different tabs would be mixed up
+        print("⚠️  --capture-network is not used with --tabs; reading results from the page\n")
+        capture_network = False
+    
+    # One projected read instead of a find_one per scraped name
+    existing_universities.update(load_existing_universities(universities_collection))
+    print(f"📚 Loaded {len(existing_universities)} existing universities\n")
+    begin_staging(run_report)
+    
+    driver = setup_driver()
+    
+    try:
+        combinations = plan_combinations(driver, profiler)
+        if args.prioritize or args.time_budget:
+            combinations, priority = prioritize_combinations(combinations)
+            run_report.add('priority', priority)
+            # The ranked order has no already-done prefix to skip
+            start_from = 1
+        if args.time_budget:
+            time_budget_deadline = time.monotonic() + args.time_budget * 60
+            print(f"⏱️  Time budget: {args.time_budget:g} minutes\n")
         
-        # Iterate through combinations
-        for sector in sectors:
-            for chartered_by in chartered_by_list:
-                for discipline in disciplines:
-                    for province in provinces:
-                        for city in cities:
-                            current_combination += 1
-                            
-                            # Skip if all are "Select All" (already covered)
-                            if all([sector == 'Select All', chartered_by == 'Select All', 
-                                   discipline == 'Select All', province == 'Select All', city == 'Select All']):
-                                continue
-                            
-                            # Skip first 14 combinations
-                            if current_combination < START_FROM:
-                                skipped += 1
-                                continue
-                            
-                            print(f"[{current_combination}/{total_combinations}] {sector} | {chartered_by} | {discipline} | {province} | {city}")
-                            if skipped > 0:
-                                print(f"   ⏭️  Skipped {skipped} combinations, starting from {START_FROM}")
-                                skipped = 0
-                            
-                            try:
-                                # Check if driver is still alive before every operation
-                                if not check_driver_alive(driver):
-                                    print(f"   ⚠️  Driver connection lost, restarting browser...")
-                                    driver = restart_driver(driver)
-                                    continue  # Restart this combination
-                                
-                                # Navigate back to base URL (only if needed)
-                                try:
-                                    current_url = driver.current_url
-                                except Exception as url_error:
-                                    if 'HTTPConnectionPool' in str(url_error) or 'Connection' in str(url_error):
-                                        print(f"   ⚠️  Connection error getting URL, restarting...")
-                                        driver = restart_driver(driver)
-                                        continue
-                                    raise
-                                
-                                if 'recognised.aspx' not in current_url:
-                                    try:
-                                        if not check_driver_alive(driver):
-                                            driver = restart_driver(driver)
-                                            continue
-                                        driver.get('https://www.hec.gov.pk/english/universities/Pages/recognised.aspx')
-                                        time.sleep(3)
-                                    except Exception as nav_error:
-                                        error_str = str(nav_error)
-                                        if 'HTTPConnectionPool' in error_str or 'Connection' in error_str or 'ConnectionResetError' in error_str:
-                                            print(f"   ⚠️  Connection error, restarting browser...")
-                                            driver = restart_driver(driver)
-                                            continue
-                                        time.sleep(3)
-                                else:
-                                    # Refresh page to reset filters - but use JavaScript to avoid timeout
-                                    try:
-                                        if not check_driver_alive(driver):
-                                            driver = restart_driver(driver)
-                                            continue
-                                        driver.execute_script("location.reload();")
-                                        time.sleep(3)
-                                    except Exception as refresh_error:
-                                        error_str = str(refresh_error)
-                                        if 'HTTPConnectionPool' in error_str or 'Connection' in error_str or 'ConnectionResetError' in error_str:
-                                            print(f"   ⚠️  Connection error on refresh, restarting browser...")
-                                            driver = restart_driver(driver)
-                                            continue
-                                        try:
-                                            if not check_driver_alive(driver):
-                                                driver = restart_driver(driver)
-                                                continue
-                                            driver.refresh()
-                                            time.sleep(3)
-                                        except:
-                                            if not check_driver_alive(driver):
-                                                driver = restart_driver(driver)
-                                                continue
-                                            driver.get('https://www.hec.gov.pk/english/universities/Pages/recognised.aspx')
-                                            time.sleep(3)
-                                
-                                # Wait for page to be ready
-                                try:
-                                    WebDriverWait(driver, 10).until(
-                                        lambda d: d.execute_script('return document.readyState') == 'complete'
-                                    )
-                                except:
-                                    time.sleep(2)
-                                
-                                # Apply filters using JavaScript (avoids timeout)
-                                filters_applied = 0
-                                
-                                # Use JavaScript to apply filters (much faster, no timeout)
-                                try:
-                                    # Check driver before executing script
-                                    if not check_driver_alive(driver):
-                                        print(f"   ⚠️  Driver lost before filter, restarting...")
-                                        driver = restart_driver(driver)
-                                        continue
-                                    
-                                    driver.execute_script(f"""
-                                        var select = document.getElementById('Sector');
-                                        if (select) {{
-                                            for (var i = 0; i < select.options.length; i++) {{
-                                                if (select.options[i].text.trim() === '{sector}') {{
-                                                    select.value = select.options[i].value;
-                                                    select.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                                    break;
-                                                }}
-                                            }}
-                                        }}
-                                    """)
-                                    filters_applied += 1
-                                    time.sleep(0.5)
-                                except Exception as e:
-                                    error_str = str(e)
-                                    if 'HTTPConnectionPool' in error_str or 'Connection' in error_str or 'ConnectionResetError' in error_str:
-                                        print(f"   ⚠️  Connection error in filter, restarting...")
-                                        driver = restart_driver(driver)
-                                        continue
-                                    print(f"      ⚠️  Sector filter error: {error_str[:40]}")
-                                
-                                try:
-                                    if chartered_by != 'Select All':
-                                        driver.execute_script(f"""
-                                            var select = document.getElementById('Charter');
-                                            if (select) {{
-                                                for (var i = 0; i < select.options.length; i++) {{
-                                                    if (select.options[i].text.trim() === '{chartered_by}') {{
-                                                        select.value = select.options[i].value;
-                                                        select.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                                        break;
-                                                    }}
-                                                }}
-                                            }}
-                                        """)
-                                        filters_applied += 1
-                                    time.sleep(0.5)
-                                except:
-                                    pass
-                                
-                                try:
-                                    if discipline != 'Select All':
-                                        driver.execute_script(f"""
-                                            var select = document.getElementById('Disc');
-                                            if (select) {{
-                                                for (var i = 0; i < select.options.length; i++) {{
-                                                    if (select.options[i].text.trim() === '{discipline}') {{
-                                                        select.value = select.options[i].value;
-                                                        select.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                                        break;
-                                                    }}
-                                                }}
-                                            }}
-                                        """)
-                                        filters_applied += 1
-                                    time.sleep(0.5)
-                                except:
-                                    pass
-                                
-                                try:
-                                    driver.execute_script(f"""
-                                        var select = document.getElementById('Province');
-                                        if (select) {{
-                                            for (var i = 0; i < select.options.length; i++) {{
-                                                if (select.options[i].text.trim() === '{province}') {{
-                                                    select.value = select.options[i].value;
-                                                    select.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                                    break;
-                                                }}
-                                            }}
-                                        }}
-                                    """)
-                                    filters_applied += 1
-                                    time.sleep(0.5)
-                                except Exception as e:
-                                    print(f"      ⚠️  Province filter error: {str(e)[:40]}")
-                                
-                                try:
-                                    driver.execute_script(f"""
-                                        var select = document.getElementById('City');
-                                        if (select) {{
-                                            for (var i = 0; i < select.options.length; i++) {{
-                                                if (select.options[i].text.trim() === '{city}') {{
-                                                    select.value = select.options[i].value;
-                                                    select.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                                    break;
-                                                }}
-                                            }}
-                                        }}
-                                    """)
-                                    filters_applied += 1
-                                except Exception as e:
-                                    print(f"      ⚠️  City filter error: {str(e)[:40]}")
-                                
-                                print(f"   ✅ Applied {filters_applied} filters")
-                                
-                                # Wait for results with better detection
-                                # First wait a bit for page to process filters (increased wait)
-                                time.sleep(2.0)  # Increased from 1.0 to 2.0
-                                
-                                results_loaded = False
-                                # Try multiple detection methods
-                                for attempt in range(8):  # Increased attempts
-                                    try:
-                                        # Method 1: Check for li elements with universities
-                                        test_elements = driver.find_elements(By.XPATH, "//li[contains(text(), 'University') or contains(text(), 'Institute') or contains(text(), 'College')]")
-                                        if test_elements and len(test_elements) > 0:
-                                            results_loaded = True
-                                            break
-                                        
-                                        # Method 2: Check for any list items
-                                        all_lis = driver.find_elements(By.XPATH, "//li")
-                                        if all_lis:
-                                            # Check if any contain university keywords
-                                            for li in all_lis[:10]:  # Check first 10
-                                                if 'University' in li.text or 'Institute' in li.text:
-                                                    results_loaded = True
-                                                    break
-                                            if results_loaded:
-                                                break
-                                        
-                                        # Method 3: Check for divs with university text
-                                        divs = driver.find_elements(By.XPATH, "//div[contains(text(), 'University') or contains(text(), 'Institute')]")
-                                        if divs and len(divs) > 2:  # More than just headers
-                                            results_loaded = True
-                                            break
-                                            
-                                    except Exception as e:
-                                        pass
-                                    
-                                    time.sleep(0.5)  # Wait between attempts
-                                
-                                if not results_loaded:
-                                    print(f"   ⚠️  No results detected after waiting, trying to scrape anyway...")
-                                    # Debug: Check what's on page
-                                    try:
-                                        page_text = driver.find_element(By.TAG_NAME, 'body').text[:200]
-                                        print(f"   🔍 Page preview: {page_text}...")
-                                    except:
-                                        pass
-                                    # Don't skip - try scraping anyway, might still find data
-                                
-                                # Additional delay for dynamic content to fully load
-                                time.sleep(1.5)  # Increased wait time for better results
-                                
-                                # Scrape universities
-                                universities = scrape_universities_from_page(driver)
-                                
-                                # Debug output
-                                if not universities:
-                                    print(f"   🔍 Debug: Checking page structure...")
-                                    try:
-                                        all_lis = driver.find_elements(By.XPATH, "//li")
-                                        print(f"   📊 Found {len(all_lis)} list items on page")
-                                        if all_lis:
-                                            print(f"   📝 First 3 items: {[li.text[:50] for li in all_lis[:3]]}")
-                                    except:
-                                        pass
-                                
-                                if universities:
-                                    print(f"   ✅ Found {len(universities)} universities")
-                                    # Debug: Show all university names
-                                    print(f"   📝 Universities found:")
-                                    for idx, uni in enumerate(universities[:5], 1):
-                                        print(f"      {idx}. {uni.get('name', 'No name')[:60]}")
-                                    if len(universities) > 5:
-                                        print(f"      ... and {len(universities) - 5} more")
-                                    
-                                    # Save universities
-                                    saved_count = 0
-                                    error_count = 0
-                                    duplicate_count = 0
-                                    
-                                    for uni in universities:
-                                        try:
-                                            uni_name = uni.get('name', '').strip()
-                                            if not uni_name:
-                                                print(f"   ⚠️  Skipping: Empty name")
-                                                continue
-                                            
-                                            # Check if already in set
-                                            if uni_name in scraped_universities:
-                                                duplicate_count += 1
-                                                continue
-                                            
-                                            # Check if already in database
-                                            existing = universities_collection.find_one({'name': uni_name})
-                                            if existing:
-                                                duplicate_count += 1
-                                                scraped_universities.add(uni_name)
-                                                continue
-                                            
-                                            # Save new university
-                                            print(f"   💾 Attempting to save: {uni_name[:50]}...")
-                                            scraped_universities.add(uni_name)
-                                            save_university(uni)
-                                            saved_count += 1
-                                            
-                                        except Exception as e:
-                                            error_count += 1
-                                            print(f"   ❌ Error processing {uni.get('name', 'Unknown')[:50]}: {str(e)[:100]}")
-                                            import traceback
-                                            traceback.print_exc()
-                                    
-                                    # Summary
-                                    print(f"\n   📊 Summary:")
-                                    if saved_count > 0:
-                                        print(f"      ✅ Saved: {saved_count} new universities")
-                                    if duplicate_count > 0:
-                                        print(f"      ℹ️  Duplicates: {duplicate_count} (already in database)")
-                                    if error_count > 0:
-                                        print(f"      ❌ Errors: {error_count}")
-                                    if saved_count == 0 and duplicate_count == 0 and error_count == 0:
-                                        print(f"      ⚠️  No universities were processed!")
-                                else:
-                                    print(f"   ⚠️  No universities found for this combination")
-                                
-                                # Progress update (every 3 combinations for faster feedback)
-                                if current_combination % 3 == 0:
-                                    print(f"\n📊 Progress: {current_combination}/{total_combinations} ({current_combination/total_combinations*100:.1f}%) | Unique: {len(scraped_universities)} | Saved: {total_scraped}\n")
-                                
-                            except TimeoutException as e:
-                                print(f"   ⚠️  Timeout error occurred, but trying to scrape anyway...")
-                                # CRITICAL: Even on timeout, try to scrape - page might have loaded
-                                try:
-                                    time.sleep(2)  # Small wait
-                                    universities = scrape_universities_from_page(driver)
-                                    if universities:
-                                        print(f"   ✅ Found {len(universities)} universities despite timeout!")
-                                        # Save universities
-                                        saved_count = 0
-                                        error_count = 0
-                                        duplicate_count = 0
-                                        
-                                        for uni in universities:
-                                            try:
-                                                uni_name = uni.get('name', '').strip()
-                                                if not uni_name:
-                                                    continue
-                                                
-                                                if uni_name in scraped_universities:
-                                                    duplicate_count += 1
-                                                    continue
-                                                
-                                                existing = universities_collection.find_one({'name': uni_name})
-                                                if existing:
-                                                    duplicate_count += 1
-                                                    scraped_universities.add(uni_name)
-                                                    continue
-                                                
-                                                print(f"   💾 Saving: {uni_name[:50]}...")
-                                                scraped_universities.add(uni_name)
-                                                save_university(uni)
-                                                saved_count += 1
-                                            except Exception as save_error:
-                                                error_count += 1
-                                                print(f"   ❌ Save error: {str(save_error)[:50]}")
-                                        
-                                        if saved_count > 0:
-                                            print(f"   ✅ Saved {saved_count} new universities!")
-                                        if duplicate_count > 0:
-                                            print(f"   ℹ️  {duplicate_count} duplicates skipped")
-                                        if error_count > 0:
-                                            print(f"   ⚠️  {error_count} errors occurred")
-                                except Exception as scrape_error:
-                                    print(f"   ❌ Could not scrape after timeout: {str(scrape_error)[:50]}")
-                                # Continue to next combination
-                                continue
-                            except Exception as e:
-                                error_msg = str(e)
-                                
-                                # Handle connection errors - restart browser
-                                if 'HTTPConnectionPool' in error_msg or 'Connection' in error_msg or 'ConnectionResetError' in error_msg:
-                                    print(f"   ⚠️  Browser connection lost, restarting...")
-                                    try:
-                                        driver = restart_driver(driver)
-                                        print(f"   ✅ Browser restarted, retrying combination {current_combination}...")
-                                        # Retry this combination
-                                        current_combination -= 1
-                                        continue
-                                    except Exception as restart_error:
-                                        print(f"   ❌ Could not restart browser: {str(restart_error)[:50]}, skipping...")
-                                        continue
-                                
-                                # Don't show full stacktrace for timeout errors
-                                if 'timeout' in error_msg.lower():
-                                    print(f"   ⚠️  Timeout error, skipping this combination...")
-                                else:
-                                    print(f"   ❌ Error: {error_msg[:80]}")
-                                # Continue to next combination
-                                continue
+        sweep_started = time.monotonic()
+        if args.index:
+            start_from = 1
+            driver, index = run_index_sweep(driver, combinations, profiler, watchdog)
+            derived = apply_filter_index(index, combinations)
+            run_report.add('filter_index', index.summary(derived))
+            # Single-option queries cover every combination, so the usual "missing" check holds
+            index_complete = not index.failed
+        elif args.tabs > 1:
+            driver, tab_report = run_tab_sweep(driver, combinations, profiler, watchdog, args.tabs, start_from)
+        else:
+            driver = run_sweep(driver, combinations, profiler, watchdog, start_from)
         
+        # A budget-limited run, one that skipped the first combinations, or one that gave up on a
+        # combination / read only part of a listing did not see everything, so "missing" would be unreliable
+        sweep_complete = (not budget_exhausted and start_from <= 1 and not any(sweep_failures.values())
+                          and (not args.index or index_complete))
+        if any(sweep_failures.values()):
+            print(f"⚠️  Partial sweep: {sweep_failures['failed']} combinations failed, "
+                  f"{sweep_failures['truncated']} listings truncated")
         print("\n\n✅ Scraping Complete!")
         print(f"📊 Total Combinations Processed: {current_combination}")
-        print(f"🎓 Total Universities Scraped: {total_scraped}")
         print(f"📝 Unique Universities Found: {len(scraped_universities)}")
         
     except Exception as e:
@@ -1099,9 +1714,34 @@ def main():
         traceback.print_exc()
         
     finally:
+        # Partial runs still write what they found; "missing" is only meaningful for a full sweep
+        profiler.set_stage('save')
+        write_run_outputs(run_report, sweep_complete)
+        run_report.add('combinations', {'processed': current_combination, 'total': total_combinations,
+                                        'empty': empty_report(), **sweep_failures})
+        run_report.add('universities', {'unique': len(scraped_universities)})
+        browser = watchdog.report()
+        run_report.add('browser', browser)
+        if sweep_started is not None:
+            run_report.add('throughput', throughput_report(sweep_started, browser, args.tabs, tab_report, start_from))
+        if args.time_budget:
+            run_report.add('time_budget', {'minutes': args.time_budget, 'stopped_early': budget_exhausted})
+        if capture_network:
+            run_report.add('network_capture', capture_stats)
+        if browser_profile:
+            run_report.add('browser_profile', browser_profile.report())
+        run_report.add('extraction', {'strategy': extraction_strategy, 'checks': extraction_checks,
+                                      **extraction_stats, 'pagination': dict(pagination_stats)})
+        run_report.add('deadlines', deadline_report())
+        if args.profile:
+            run_report.add('profile', profiler.write(run_report))
+        run_report.finalize()
+        
         print("\n⏳ Closing browser in 5 seconds...")
         time.sleep(5)
-        driver.quit()
+        (active_driver or driver).quit()
+        if browser_profile:
+            browser_profile.release()
         client.close()
         print("👋 Browser closed. Database connection closed.")
 
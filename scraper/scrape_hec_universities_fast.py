@@ -5,6 +5,7 @@ Uses smart strategies to scrape faster
 
 import time
 import os
+import json
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
@@ -15,6 +16,13 @@ from selenium.webdriver.chrome.options import Options
 from pymongo import MongoClient
 from dotenv import load_dotenv
 
+from changeset import build_university_record
+from run_report import RunReport
+from change_manifest import publish_changes
+from search_index import export_search_index
+from staging_store import StagingStore, sync_run
+from run_snapshots import combination_key, write_snapshot
+
 # Try to import webdriver_manager
 try:
     from webdriver_manager.chrome import ChromeDriverManager
@@ -26,6 +34,9 @@ load_dotenv()
 
 # MongoDB connection
 MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/manzil')
+
+# Listing page (point at mock_hec_server.py with HEC_RECOGNISED_URL for offline runs)
+HEC_URL = os.getenv('HEC_RECOGNISED_URL', 'https://www.hec.gov.pk/english/universities/Pages/recognised.aspx')
 client = MongoClient(MONGO_URI)
 db = client['manzil']
 universities_collection = db['universities']
@@ -33,6 +44,9 @@ universities_collection = db['universities']
 scraped_universities = set()
 total_scraped = 0
 
+# Raw scrape output, consumed by enrich_universities_async.py --input
+OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hec_universities_scraped.json')
+
 
 def setup_driver():
     """Setup Chrome driver"""
@@ -73,7 +87,7 @@ def scrape_all_universities_fast(driver):
     
     try:
         # Navigate to page
-        driver.get('https://www.hec.gov.pk/english/universities/Pages/recognised.aspx')
+        driver.get(HEC_URL)
         time.sleep(3)
         
         # Set all filters to "Select All" to get ALL universities
@@ -203,68 +217,37 @@ def scrape_all_universities_fast(driver):
         return []
 
 
-def save_university_batch(universities):
-    """Save universities in batch"""
+def save_university_batch(universities, run_report):
+    """Stage scraped universities locally, then sync only the changeset to the database"""
     global total_scraped
     
-    saved_count = 0
-    updated_count = 0
-    
+    records = {}
     for uni_data in universities:
-        try:
-            name = uni_data['name']
-            if name in scraped_universities:
-                continue
-            
-            # Parse location
-            location = uni_data.get('location', '')
-            city = location.split(',')[0].strip() if location else 'Unknown'
-            
-            # Province mapping
-            province_map = {
-                'Islamabad': 'Islamabad Capital Territory',
-                'Lahore': 'Punjab',
-                'Karachi': 'Sindh',
-                'Quetta': 'Balochistan',
-                'Peshawar': 'Khyber Pakhtunkhwa'
-            }
-            
-            province = 'Unknown'
-            for city_name, prov in province_map.items():
-                if city_name in location:
-                    province = prov
-                    break
-            
-            # Check if exists
-            existing = universities_collection.find_one({'name': name})
-            
-            if existing:
-                # Update if needed
-                if uni_data.get('link') and not existing.get('website'):
-                    universities_collection.update_one(
-                        {'name': name},
-                        {'$set': {'website': uni_data['link']}}
-                    )
-                    updated_count += 1
-            else:
-                # Create new
-                university = {
-                    'name': name,
-                    'city': city,
-                    'type': 'Public',  # Default
-                    'website': uni_data.get('link', ''),
-                    'description': f"HEC Recognized University located in {location or city}"
-                }
-                
-                universities_collection.insert_one(university)
-                scraped_universities.add(name)
-                saved_count += 1
-                total_scraped += 1
-                
-        except Exception as e:
-            if 'duplicate' not in str(e).lower():
-                print(f"      ⚠️  Error saving {uni_data.get('name', 'Unknown')}: {e}")
+        name = uni_data['name']
+        if name in scraped_universities:
+            continue
+        scraped_universities.add(name)
+        records[name] = build_university_record(uni_data)
     
+    staging = StagingStore()
+    try:
+        staging.begin_run(run_report.run_id, run_report.name)
+        staging.stage(run_report.run_id, records.values())
+        staging.finish_run(run_report.run_id, complete=True)
+        changeset, existing, saved_count, updated_count = sync_run(staging, run_report.run_id, universities_collection)
+    finally:
+        staging.close()
+    run_report.write_json('changeset.json', changeset.to_report(complete=True))
+    run_report.add('changeset', changeset.summary())
+    total_scraped += saved_count
+    publish_changes(db, run_report, changeset, existing)
+    export_search_index(db, run_report)
+    
+    # Fast mode only loads the "Select All" combination
+    all_key = combination_key('Select All', 'Select All', 'Select All', 'Select All', 'Select All')
+    snapshot_path = write_snapshot(run_report.run_id, records, {all_key: records.keys()}, scraper='fast',
+                                   complete=True)
+    run_report.add('snapshot', os.path.basename(snapshot_path))
     return saved_count, updated_count
 
 
@@ -272,6 +255,7 @@ def main():
     """Main function - FAST MODE"""
     print("🚀 Starting FAST HEC University Scraper...\n")
     
+    run_report = RunReport('fast')
     driver = setup_driver()
     
     try:
@@ -279,13 +263,18 @@ def main():
         universities = scrape_all_universities_fast(driver)
         
         if universities:
+            with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+                json.dump(universities, f, ensure_ascii=False, indent=2)
+            print(f"\n📝 Raw results written to {OUTPUT_FILE}")
+            
             print(f"\n💾 Saving {len(universities)} universities to database...")
-            saved, updated = save_university_batch(universities)
+            saved, updated = save_university_batch(universities, run_report)
             print(f"\n✅ Scraping Complete!")
             print(f"   📊 Total Universities Found: {len(universities)}")
             print(f"   💾 New Universities Saved: {saved}")
             print(f"   🔄 Universities Updated: {updated}")
             print(f"   📝 Total Unique: {len(scraped_universities)}")
+            run_report.finalize()
         else:
             print("\n⚠️  No universities found!")
         
@@ -15,10 +15,18 @@ from pymongo import MongoClient
 from dotenv import load_dotenv
 import re
 
+from run_report import RunReport
+from change_manifest import publish_changes
+from search_index import export_search_index
+from staging_store import StagingStore, sync_run
+
 load_dotenv()
 
 # MongoDB connection
 MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/manzil')
+
+# Listing page (point at mock_hec_server.py with HEC_RECOGNISED_URL for offline runs)
+HEC_URL = os.getenv('HEC_RECOGNISED_URL', 'https://www.hec.gov.pk/english/universities/Pages/recognised.aspx')
 try:
     client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
     client.admin.command('ping')
@@ -33,6 +41,10 @@ universities_collection = db['universities']
 scraped_universities = set()
 total_scraped = 0
 
+# Records go to the local staging store while scraping and reach MongoDB in one sync at the end
+run_report = RunReport('simple')
+staging = StagingStore()
+
 def setup_driver():
     """Setup Chrome driver"""
     chrome_options = Options()
@@ -115,18 +127,12 @@ def scrape_universities_simple(driver):
     return universities
 
 def save_university_simple(uni_data):
-    """Save university - simple version"""
-    global total_scraped
-    
+    """Stage university - simple version (written to the database by sync_staged)"""
     try:
         name = uni_data.get('name', '').strip()
         if not name:
             return
         
-        # Check if exists
-        if universities_collection.find_one({'name': name}):
-            return
-        
         # Parse city
         location = uni_data.get('location', '')
         city = 'Unknown'
@@ -145,25 +151,39 @@ def save_university_simple(uni_data):
             'description': f"HEC Recognized University in {location or city}"
         }
         
-        universities_collection.insert_one(university)
-        total_scraped += 1
-        print(f"      ✅ Saved: {name} ({city})")
+        staging.stage(run_report.run_id, [university])
+        print(f"      ✅ Staged: {name} ({city})")
         
     except Exception as e:
-        if 'duplicate' not in str(e).lower() and 'e11000' not in str(e).lower():
-            print(f"      ❌ Error: {e}")
+        print(f"      ❌ Error: {e}")
+
+def sync_staged(complete):
+    """Push the staged run to MongoDB: one diff, batched upserts"""
+    global total_scraped
+    
+    staging.finish_run(run_report.run_id, complete)
+    changeset, existing, inserted, modified = sync_run(staging, run_report.run_id, universities_collection, complete)
+    # Only a handful of cities are swept, so "missing from HEC" never means anything here
+    run_report.write_json('changeset.json', changeset.to_report(complete=False))
+    run_report.add('changeset', changeset.summary())
+    total_scraped = inserted
+    print(f"\n💾 Synced: {inserted} inserted, {modified} updated")
+    publish_changes(db, run_report, changeset, existing)
+    export_search_index(db, run_report)
 
 def main():
     global total_scraped
     
     print("🚀 Starting Simplified HEC Scraper...\n")
     
+    staging.begin_run(run_report.run_id, run_report.name)
     driver = setup_driver()
+    complete = False
     
     try:
         # Load page
         print("📄 Loading HEC website...")
-        driver.get('https://www.hec.gov.pk/english/universities/Pages/recognised.aspx')
+        driver.get(HEC_URL)
         time.sleep(10)
         print("✅ Page loaded!\n")
         
@@ -187,7 +207,7 @@ def main():
                     
                     try:
                         # Reload page
-                        driver.get('https://www.hec.gov.pk/english/universities/Pages/recognised.aspx')
+                        driver.get(HEC_URL)
                         time.sleep(5)
                         
                         # Apply filters using JavaScript (faster, no timeout)
@@ -210,7 +230,7 @@ def main():
                                     save_university_simple(uni)
                                     saved += 1
                             if saved > 0:
-                                print(f"   💾 Saved {saved} new universities")
+                                print(f"   💾 Staged {saved} new universities")
                         else:
                             print(f"   ⚠️  No universities found")
                             
@@ -218,7 +238,7 @@ def main():
                         print(f"   ❌ Error: {str(e)[:60]}")
                         continue
         
-        print(f"\n\n✅ Complete! Total saved: {total_scraped}")
+        complete = True
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -227,6 +247,13 @@ def main():
     finally:
         time.sleep(3)
         driver.quit()
+        try:
+            sync_staged(complete)
+            print(f"\n\n✅ Complete! Total saved: {total_scraped}")
+        except Exception as e:
+            print(f"❌ Could not sync staged universities (retry: python staging_store.py sync {run_report.run_id}): {e}")
+        run_report.finalize()
+        staging.close()
         client.close()
 
 if __name__ == '__main__':
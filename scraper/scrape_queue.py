@@ -0,0 +1,179 @@
+"""
+Mongo-backed work queue for the combination sweep
+Combinations are published as tasks in the scrape_tasks collection. Workers on any machine claim
+them with a lease that a heartbeat thread keeps extending, and an expired lease (dead worker) makes
+the task claimable again. Results are stored on the task with an idempotent completion, and the
+sweep is finalized exactly once when the queue drains.
+"""
+
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+
+TASKS_COLLECTION = 'scrape_tasks'
+SWEEPS_COLLECTION = 'scrape_sweeps'
+DEFAULT_LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def now_utc():
+    return datetime.now(timezone.utc)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ScrapeQueue:
+    """Tasks and sweeps for one database"""
+
+    def __init__(self, db, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.tasks = db[TASKS_COLLECTION]
+        self.sweeps = db[SWEEPS_COLLECTION]
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.tasks.create_index([('sweep', ASCENDING), ('status', ASCENDING), ('order', ASCENDING)])
+
+    def publish(self, sweep, combinations):
+        """combinations: list of (key, filters dict). Re-publishing the same sweep adds nothing twice"""
+        operations = [
+            UpdateOne({'_id': f"{sweep}:{key}"}, {'$setOnInsert': {
+                'sweep': sweep,
+                'key': key,
+                'filters': filters,
+                'order': order,
+                'status': PENDING,
+                'attempts': 0,
+            }}, upsert=True)
+            for order, (key, filters) in enumerate(combinations)
+        ]
+        inserted = 0
+        for start in range(0, len(operations), 500):
+            inserted += self.tasks.bulk_write(operations[start:start + 500], ordered=False).upserted_count
+        self.sweeps.update_one({'_id': sweep}, {
+            '$setOnInsert': {'created_at': now_utc(), 'finalized_at': None},
+            '$set': {'total': len(combinations)},
+        }, upsert=True)
+        return inserted
+
+    def latest_sweep(self):
+        """Newest sweep that has not been finalized"""
+        sweep = self.sweeps.find_one({'finalized_at': None}, sort=[('created_at', -1)])
+        return sweep['_id'] if sweep else None
+
+    def _reap(self, sweep):
+        """Expired leases that have used up their attempts become failed"""
+        self.tasks.update_many(
+            {'sweep': sweep, 'status': LEASED, 'lease_expires': {'$lt': now_utc()},
+             'attempts': {'$gte': self.max_attempts}},
+            {'$set': {'status': FAILED, 'error': 'lease expired'}, '$unset': {'lease_expires': ''}},
+        )
+
+    def claim(self, sweep, worker_id):
+        """Lease the next pending (or expired) task, or None"""
+        self._reap(sweep)
+        now = now_utc()
+        return self.tasks.find_one_and_update(
+            {
+                'sweep': sweep,
+                'attempts': {'$lt': self.max_attempts},
+                '$or': [{'status': PENDING}, {'status': LEASED, 'lease_expires': {'$lt': now}}],
+            },
+            {
+                '$set': {'status': LEASED, 'worker': worker_id, 'heartbeat_at': now,
+                         'lease_expires': now + timedelta(seconds=self.lease_seconds)},
+                '$inc': {'attempts': 1},
+            },
+            sort=[('order', ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def heartbeat(self, task, worker_id):
+        """Extend the lease; False if another worker has taken the task over"""
+        now = now_utc()
+        result = self.tasks.update_one(
+            {'_id': task['_id'], 'status': LEASED, 'worker': worker_id},
+            {'$set': {'heartbeat_at': now, 'lease_expires': now + timedelta(seconds=self.lease_seconds)}},
+        )
+        return result.matched_count == 1
+
+    def complete(self, task, worker_id, universities):
+        """Store the task's results; the first completion wins, repeats are no-ops"""
+        result = self.tasks.update_one(
+            {'_id': task['_id'], 'status': {'$ne': DONE}},
+            {'$set': {'status': DONE, 'worker': worker_id, 'result': universities, 'done_at': now_utc()},
+             '$unset': {'lease_expires': '', 'error': ''}},
+        )
+        return result.modified_count == 1
+
+    def fail(self, task, worker_id, error):
+        """Give the task back (or mark it failed once it has used up its attempts)"""
+        status = FAILED if task.get('attempts', 0) >= self.max_attempts else PENDING
+        self.tasks.update_one(
+            {'_id': task['_id'], 'status': LEASED, 'worker': worker_id},
+            {'$set': {'status': status, 'error': str(error)[:200]}, '$unset': {'lease_expires': ''}},
+        )
+
+    def progress(self, sweep):
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for row in self.tasks.aggregate([{'$match': {'sweep': sweep}},
+                                         {'$group': {'_id': '$status', 'count': {'$sum': 1}}}]):
+            counts[row['_id']] = row['count']
+        return counts
+
+    def is_drained(self, sweep):
+        counts = self.progress(sweep)
+        return counts[PENDING] == 0 and counts[LEASED] == 0
+
+    def claim_finalize(self, sweep, worker_id, force=False):
+        """True for exactly one caller once the sweep is drained (force: finalize a partial sweep)"""
+        if not force and not self.is_drained(sweep):
+            return False
+        result = self.sweeps.update_one(
+            {'_id': sweep, 'finalized_at': None},
+            {'$set': {'finalized_at': now_utc(), 'finalized_by': worker_id}},
+        )
+        return result.modified_count == 1
+
+    def results(self, sweep):
+        """Yield (key, universities) for every completed task, in publish order"""
+        for task in self.tasks.find({'sweep': sweep, 'status': DONE}, {'key': 1, 'result': 1}).sort('order', ASCENDING):
+            yield task['key'], task.get('result') or []
+
+
+class LeaseHeartbeat:
+    """Keeps a claimed task's lease alive while the combination is being scraped"""
+
+    def __init__(self, queue, task, worker_id):
+        self.queue = queue
+        self.task = task
+        self.worker_id = worker_id
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='lease-heartbeat', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.queue.lease_seconds / 3):
+            try:
+                if not self.queue.heartbeat(self.task, self.worker_id):
+                    self.lost = True
+                    return
+            except Exception:
+                pass  # Transient Mongo error: the next beat (or lease expiry) decides
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
@@ -0,0 +1,315 @@
+"""
+University Detail Page Scraper
+Follows each scraped university link with a bounded worker pool and fills the empty
+address / phone / email / establishedYear / hecRanking / logo fields with one bulk update
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from pymongo import MongoClient, UpdateOne
+from dotenv import load_dotenv
+
+from http_cache import ResponseCache, cached_get
+
+# Load environment variables
+load_dotenv()
+
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/manzil')
+
+UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT = 25
+BULK_BATCH_SIZE = 200
+
+DETAIL_FIELDS = ('address', 'phone', 'email', 'establishedYear', 'hecRanking', 'logo')
+
+# Label text on detail pages -> University field
+FIELD_LABELS = {
+    'address': r'(?:postal\s+|mailing\s+)?address',
+    'phone': r'phone|tel(?:ephone)?|contact\s*(?:no|number)',
+    'email': r'e-?mail',
+    'establishedYear': r'(?:year\s+of\s+)?establish(?:ed|ment)|founded',
+    'hecRanking': r'(?:hec\s+)?rank(?:ing)?',
+}
+
+EMAIL_RE = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+PHONE_RE = re.compile(r'(?:\+92|0092|0)[\s-]?\(?\d{2,4}\)?[\s-]?\d{3,8}(?:[\s-]\d{2,5})?')
+YEAR_RE = re.compile(r'\b(1[89]\d{2}|20\d{2})\b')
+# 'Contact #' ends in a non-word character, so it cannot be followed by \b like the other labels
+PHONE_HASH_LABEL_RE = re.compile(r'contact\s*#', re.IGNORECASE)
+
+# Site chrome around the page content; logos found there belong to the site (HEC's masthead), not the university
+CHROME_TAGS = ('header', 'nav', 'footer')
+
+
+def clean_value(text):
+    """Collapse whitespace and strip leading separators"""
+    return ' '.join((text or '').split()).strip(' :-|')
+
+
+def labelled_values(soup):
+    """Collect 'Label: value' pairs from table rows, definition lists and plain text lines"""
+    pairs = []
+
+    for row in soup.find_all('tr'):
+        cells = row.find_all(['th', 'td'])
+        if len(cells) >= 2:
+            pairs.append((clean_value(cells[0].get_text(' ')), clean_value(cells[1].get_text(' '))))
+
+    for term in soup.find_all('dt'):
+        definition = term.find_next_sibling('dd')
+        if definition:
+            pairs.append((clean_value(term.get_text(' ')), clean_value(definition.get_text(' '))))
+
+    for line in soup.get_text('\n').split('\n'):
+        if ':' in line:
+            label, _, value = line.partition(':')
+            if len(label) <= 40 and value.strip():
+                pairs.append((clean_value(label), clean_value(value)))
+
+    return pairs
+
+
+def content_region(soup):
+    """The page's main content: <main>, role="main" or a #content block, else the whole body"""
+    return (soup.find('main') or soup.find(attrs={'role': 'main'})
+            or soup.find(id=re.compile(r'^(?:main-?)?content$', re.I)) or soup.body or soup)
+
+
+def find_logo(soup, page_url):
+    """First image hinting at a logo in the content region, skipping header / nav / footer images"""
+    for img in content_region(soup).find_all('img', src=True):
+        if img.find_parent(CHROME_TAGS):
+            continue
+        hints = ' '.join([img.get('src', ''), img.get('alt', ''), img.get('id', ''), ' '.join(img.get('class', []))])
+        if 'logo' in hints.lower():
+            return urljoin(page_url, img['src'])
+    return None
+
+
+def drop_shared_logos(results):
+    """A logo URL found on several universities' pages is the site's own (e.g. HEC's); returns how many were dropped"""
+    counts = Counter(r['details'].get('logo') for r in results if r['details'].get('logo'))
+    dropped = 0
+    for result in results:
+        if counts.get(result['details'].get('logo'), 0) > 1:
+            del result['details']['logo']
+            dropped += 1
+    return dropped
+
+
+def parse_year(text):
+    match = YEAR_RE.search(text or '')
+    if not match:
+        return None
+    year = int(match.group(1))
+    # Same bounds as the University schema
+    return year if 1900 <= year <= datetime.now().year else None
+
+
+def parse_ranking(text):
+    match = re.search(r'\d+', text or '')
+    if not match:
+        return None
+    ranking = int(match.group(0))
+    return ranking if ranking >= 1 else None
+
+
+def extract_details(html, page_url):
+    """Pull the contact/profile fields out of a detail page; missing fields are omitted"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript']):
+        tag.decompose()
+
+    details = {}
+    for label, value in labelled_values(soup):
+        for field, pattern in FIELD_LABELS.items():
+            matched = re.match(rf'(?:{pattern})\b', label, re.IGNORECASE)
+            if field == 'phone' and not matched:
+                matched = PHONE_HASH_LABEL_RE.match(label)
+            if field in details or not matched:
+                continue
+            if field == 'establishedYear':
+                value = parse_year(value)
+            elif field == 'hecRanking':
+                value = parse_ranking(value)
+            elif field == 'email':
+                match = EMAIL_RE.search(value)
+                value = match.group(0) if match else None
+            elif field == 'phone':
+                match = PHONE_RE.search(value)
+                value = clean_value(match.group(0)) if match else None
+            elif len(value) < 8:
+                value = None
+            if value:
+                details[field] = value
+
+    # Unlabelled fallbacks
+    if 'email' not in details:
+        mailto = soup.select_one('a[href^="mailto:"]')
+        match = EMAIL_RE.search(mailto['href'] if mailto else soup.get_text(' '))
+        if match:
+            details['email'] = match.group(0)
+    if 'phone' not in details:
+        tel = soup.select_one('a[href^="tel:"]')
+        if tel:
+            details['phone'] = clean_value(tel['href'][4:])
+
+    logo = find_logo(soup, page_url)
+    if logo:
+        details['logo'] = logo
+
+    return details
+
+
+def make_session(workers):
+    """Pooled HTTP session sized to the worker count"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=1)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'User-Agent': UA, 'Accept-Language': 'en-US,en;q=0.9'})
+    return session
+
+
+def scrape_detail(session, cache, target, timeout):
+    """Fetch and parse one detail page; never raises"""
+    result = {'_id': target['_id'], 'name': target['name'], 'cache': None, 'details': {}}
+    try:
+        fetched = cached_get(session, cache, target['link'], timeout=timeout) if cache else None
+        if fetched is None:
+            response = session.get(target['link'], timeout=timeout)
+            response.raise_for_status()
+            html = response.text
+        else:
+            result['cache'] = fetched.status
+            html = fetched.body
+            if fetched.status in ('not_modified', 'unchanged'):
+                if not target['missing']:
+                    return result
+                # Still has empty fields: parse the cached copy instead of skipping it
+                html = html if html is not None else cache.cached_body(target['link'])
+                if html is None:
+                    result['error'] = 'cached body missing'
+                    return result
+        result['details'] = extract_details(html, target['link'])
+    except Exception as e:
+        result['error'] = str(e)[:120]
+    return result
+
+
+def load_targets(args, universities_collection):
+    """Universities to visit: _id, name, link and the current detail fields (one projected read)"""
+    projection = {'name': 1, 'website': 1, **{field: 1 for field in DETAIL_FIELDS}}
+
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            links = {u['name']: u.get('link') for u in json.load(f) if u.get('name') and u.get('link')}
+        docs = universities_collection.find({'name': {'$in': list(links)}}, projection)
+    else:
+        links = {}
+        docs = universities_collection.find({'website': {'$exists': True, '$nin': [None, '']}}, projection)
+
+    targets = []
+    for doc in docs:
+        missing = [field for field in DETAIL_FIELDS if doc.get(field) in (None, '')]
+        if not missing and not args.refresh:
+            continue
+        link = links.get(doc['name']) or doc.get('website')
+        if link:
+            targets.append({'_id': doc['_id'], 'name': doc['name'], 'link': link, 'missing': missing})
+
+    if args.limit:
+        targets = targets[:args.limit]
+    return targets
+
+
+def build_updates(targets, results):
+    """Only set fields that are still empty, so admin edits are never overwritten"""
+    missing_by_id = {t['_id']: set(t['missing']) for t in targets}
+    operations = []
+    for result in results:
+        fields = {k: v for k, v in result['details'].items() if k in missing_by_id.get(result['_id'], ())}
+        if fields:
+            operations.append(UpdateOne({'_id': result['_id']}, {'$set': fields}))
+    return operations
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Fill university contact/profile fields from their detail pages')
+    parser.add_argument('--input', help='JSON list of scraped universities (name + link) instead of stored websites')
+    parser.add_argument('--limit', type=int, help='Only process the first N universities')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Concurrent page fetches')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Seconds per request')
+    parser.add_argument('--refresh', action='store_true', help='Also revisit universities with no empty fields')
+    parser.add_argument('--dry-run', action='store_true', help='Scrape and report, but do not write to MongoDB')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the on-disk HTTP cache')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("🚀 Starting university detail-page scraping...\n")
+
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+    universities_collection = client['manzil']['universities']
+
+    try:
+        targets = load_targets(args, universities_collection)
+        print(f"📊 {len(targets)} universities with empty detail fields ({args.workers} workers)\n")
+
+        cache = None if args.no_cache else ResponseCache(namespace='details')
+        session = make_session(args.workers)
+        results = []
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = [executor.submit(scrape_detail, session, cache, target, args.timeout) for target in targets]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results.append(result)
+                if result.get('error'):
+                    status = f"FAIL: {result['error']}"
+                elif result['cache'] in ('not_modified', 'unchanged') and not result['details']:
+                    status = f"cached ({result['cache']})"
+                else:
+                    status = ', '.join(sorted(result['details'])) or 'no fields found'
+                print(f"   [{done}/{len(targets)}] {result['name'][:50]} … {status}")
+
+        shared = drop_shared_logos(results)
+        if shared:
+            print(f"\n   ℹ️  Ignored a logo shared by {shared} pages (site masthead)")
+        operations = build_updates(targets, results)
+        print(f"\n✅ Scraped {len(results)} pages in {time.monotonic() - started:.1f}s, "
+              f"{len(operations)} universities have new fields")
+
+        if operations and not args.dry_run:
+            modified = 0
+            for start in range(0, len(operations), BULK_BATCH_SIZE):
+                outcome = universities_collection.bulk_write(operations[start:start + BULK_BATCH_SIZE], ordered=False)
+                modified += outcome.modified_count
+            print(f"💾 Updated {modified} universities")
+
+        if cache:
+            # A dry run leaves the validators alone, so the real run still parses these pages
+            if not args.dry_run:
+                cache.save()
+            cache.print_report()
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Prebuilt search / autocomplete index
+At the end of a run the active universities are read once and turned into a compact index: a
+sorted term list (name words, aliases, acronyms, known short forms and cities, all normalized with
+university_names.normalize_name) with a posting list per term, plus trigrams of the terms for
+fragments that are not a prefix. The backend (backend/utils/searchIndex.js) loads the file and
+answers autocomplete with a binary search over the terms instead of a regex scan of the collection.
+
+The artifact carries a format number and a content version; it is written atomically and only
+when its content changed, and a copy is kept in the run report.
+
+Usage:
+    python search_index.py
+    python search_index.py --out /tmp/search_index.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from pymongo import MongoClient
+from dotenv import load_dotenv
+
+from university_names import AliasIndex, KNOWN_ALIASES, STOP_WORDS, acronym, name_aliases, normalize_name
+
+load_dotenv()
+
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/manzil')
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH',
+                              os.path.normpath(os.path.join(SCRAPER_DIR, '..', 'backend', 'data', 'search_index.json')))
+
+# Bump when the layout changes; the backend refuses formats it does not know
+FORMAT = 1
+GRAM = 3
+
+# Term weights: a whole alias / acronym beats a word of the name, which beats the city
+WEIGHT_ALIAS = 3
+WEIGHT_WORD = 2
+WEIGHT_CITY = 1
+
+ACTIVE_QUERY = {'$or': [{'isActive': True}, {'isActive': {'$exists': False}}, {'isActive': None}]}
+PROJECTION = {'_id': 1, 'name': 1, 'city': 1, 'type': 1}
+
+
+def trigrams(term):
+    compact = term.replace(' ', '')
+    return {compact[i:i + GRAM] for i in range(len(compact) - GRAM + 1)}
+
+
+def university_terms(uni, short_forms):
+    """term -> weight for one university"""
+    terms = {}
+
+    def add(term, weight):
+        if term and weight > terms.get(term, 0):
+            terms[term] = weight
+
+    for alias in name_aliases(uni['name']):
+        add(alias, WEIGHT_ALIAS)
+    add(acronym(uni['name']), WEIGHT_ALIAS)
+    for short in short_forms:
+        add(short, WEIGHT_ALIAS)
+    for word in normalize_name(uni['name']).split():
+        if word not in STOP_WORDS and word != 'and':
+            add(word, WEIGHT_WORD)
+    city = normalize_name(uni.get('city'))
+    if city and city != 'unknown':
+        add(city, WEIGHT_CITY)
+        for word in city.split():
+            add(word, WEIGHT_CITY)
+    return terms
+
+
+def build_search_index(universities):
+    """Index dict (without builtAt / runId) for a list of {_id, name, city, type} documents"""
+    universities = sorted((u for u in universities if u.get('name')), key=lambda u: u['name'].lower())
+
+    # Known short forms ('gcu', 'fast-nu') go to whichever university the alias index resolves them to
+    aliases = AliasIndex(universities)
+    short_forms = {}
+    for short in KNOWN_ALIASES:
+        target = aliases.resolve(short)
+        if target is not None:
+            short_forms.setdefault(target, []).append(normalize_name(short))
+
+    postings = {}
+    for position, uni in enumerate(universities):
+        for term, weight in university_terms(uni, short_forms.get(uni['_id'], [])).items():
+            postings.setdefault(term, []).extend((position, weight))
+
+    terms = sorted(postings)
+    grams = {}
+    for term_index, term in enumerate(terms):
+        for gram in trigrams(term):
+            grams.setdefault(gram, []).append(term_index)
+
+    index = {
+        'format': FORMAT,
+        'docs': [[str(u['_id']), u['name'], u.get('city') or '', u.get('type') or ''] for u in universities],
+        'terms': terms,
+        # Flat [doc, weight, doc, weight, ...] per term, parallel to `terms`
+        'postings': [postings[term] for term in terms],
+        'grams': {gram: grams[gram] for gram in sorted(grams)},
+    }
+    payload = json.dumps(index, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    index['version'] = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    return index
+
+
+def current_version(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('version')
+    except (OSError, ValueError):
+        return None
+
+
+def write_search_index(index, path=SEARCH_INDEX_PATH):
+    """Write the artifact atomically; returns False when the file already holds this version"""
+    if current_version(path) == index['version']:
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return True
+
+
+def load_universities(universities_collection):
+    return list(universities_collection.find(ACTIVE_QUERY, PROJECTION))
+
+
+def export_search_index(db, run_report=None, path=SEARCH_INDEX_PATH):
+    """Rebuild the index from the database after a run; a failure only leaves the previous index in place"""
+    try:
+        index = build_search_index(load_universities(db['universities']))
+        index['builtAt'] = datetime.now().isoformat(timespec='seconds')
+        if run_report is not None:
+            index['runId'] = run_report.run_id
+            run_report.write_json('search_index.json', index)
+            run_report.add('search_index', {'version': index['version'], 'docs': len(index['docs']),
+                                            'terms': len(index['terms'])})
+        if write_search_index(index, path):
+            print(f"   🔎 Search index {index['version']}: {len(index['docs'])} universities, "
+                  f"{len(index['terms'])} terms")
+        else:
+            print(f"   🔎 Search index unchanged ({index['version']})")
+        return index
+    except Exception as e:
+        print(f"   ⚠️  Could not export search index: {e}")
+        return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build the university search / autocomplete index')
+    parser.add_argument('--out', default=SEARCH_INDEX_PATH, help=f'Output file (default: {SEARCH_INDEX_PATH})')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+    try:
+        export_search_index(client['manzil'], path=args.out)
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
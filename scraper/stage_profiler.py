@@ -0,0 +1,160 @@
+"""
+Stage-scoped sampling profiler
+A background thread samples the scraper's main thread stack every few milliseconds and files each
+sample under the current stage (startup, filter_extraction, combination:*, save). Each sample is
+tagged cpu or wait from the thread's CPU clock, so Python-side parsing can be told apart from time
+blocked on WebDriver or MongoDB.
+
+Output (next to the run report):
+    profile.folded   flame-graph-ready folded stacks (flamegraph.pl, speedscope, inferno)
+    hotspots.txt     top-N functions per stage, self and inclusive, with cpu/wait split
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+DEFAULT_INTERVAL = 0.005
+DEFAULT_TOP_N = 15
+# Share of a sample interval the thread must spend on CPU to count as 'cpu'
+CPU_SHARE = 0.5
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def thread_cpu_clock(ident):
+    """CPU clock id of another thread, or None where the platform has no per-thread clock"""
+    try:
+        clock = time.pthread_getcpuclockid(ident)
+        time.clock_gettime(clock)
+        return clock
+    except (AttributeError, OSError):
+        return None
+
+
+class StageProfiler:
+    """Samples one thread; stages are switched with set_stage() so existing loops need no re-indenting"""
+
+    def __init__(self, enabled=False, interval=DEFAULT_INTERVAL, thread_id=None):
+        self.enabled = enabled
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stage = 'startup'
+        self.samples = defaultdict(Counter)       # stage -> Counter((frames, kind))
+        self.stage_time = Counter()                # stage -> wall seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def set_stage(self, name):
+        self.stage = name
+
+    def start(self):
+        if not self.enabled:
+            return self
+        self._thread = threading.Thread(target=self._run, name='stage-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        clock = thread_cpu_clock(self.thread_id)
+        last_wall = time.perf_counter()
+        last_cpu = time.clock_gettime(clock) if clock is not None else None
+
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            elapsed = now - last_wall
+            last_wall = now
+            if frame is None:
+                break
+
+            kind = 'unknown'
+            if clock is not None:
+                try:
+                    cpu = time.clock_gettime(clock)
+                except OSError:
+                    break  # Thread exited
+                kind = 'cpu' if (cpu - last_cpu) >= elapsed * CPU_SHARE else 'wait'
+                last_cpu = cpu
+
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            stage = self.stage
+            self.samples[stage][(tuple(reversed(stack)), kind)] += 1
+            self.stage_time[stage] += elapsed
+
+    def folded(self):
+        """Folded stack lines: 'stage;root;...;leaf count'"""
+        lines = []
+        for stage, samples in self.samples.items():
+            for (stack, kind), count in samples.items():
+                leaf = [f"[{kind}]"] if kind != 'unknown' else []
+                lines.append(';'.join([stage, *stack, *leaf]) + f" {count}")
+        return sorted(lines)
+
+    def hotspots(self, top_n=DEFAULT_TOP_N):
+        """Per stage: sample counts, cpu/wait split and top self / inclusive functions"""
+        result = {}
+        for stage, samples in self.samples.items():
+            total = sum(samples.values())
+            kinds = Counter()
+            self_counts = Counter()
+            inclusive = Counter()
+            for (stack, kind), count in samples.items():
+                kinds[kind] += count
+                if stack:
+                    self_counts[(stack[-1], kind)] += count
+                for label in set(stack):
+                    inclusive[label] += count
+            result[stage] = {
+                'samples': total,
+                'wall_time_s': round(self.stage_time[stage], 2),
+                'cpu_share': round(kinds['cpu'] / total, 3) if total else 0,
+                'wait_share': round(kinds['wait'] / total, 3) if total else 0,
+                'top_self': [
+                    {'function': label, 'kind': kind, 'share': round(count / total, 3)}
+                    for (label, kind), count in self_counts.most_common(top_n)
+                ],
+                'top_inclusive': [
+                    {'function': label, 'share': round(count / total, 3)}
+                    for label, count in inclusive.most_common(top_n)
+                ],
+            }
+        return result
+
+    def write(self, run_report, top_n=DEFAULT_TOP_N):
+        """Write profile.folded + hotspots.txt into the run report dir; returns the hotspot summary"""
+        self.stop()
+        with open(run_report.path('profile.folded'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.folded()) + '\n')
+
+        hotspots = self.hotspots(top_n)
+        lines = []
+        for stage, info in sorted(hotspots.items(), key=lambda item: -item[1]['samples']):
+            lines.append(f"== {stage}: {info['samples']} samples, {info['wall_time_s']}s, "
+                         f"cpu {info['cpu_share']:.0%} / wait {info['wait_share']:.0%}")
+            lines.append("   self:")
+            for entry in info['top_self']:
+                lines.append(f"     {entry['share']:>6.1%}  [{entry['kind']}] {entry['function']}")
+            lines.append("   inclusive:")
+            for entry in info['top_inclusive']:
+                lines.append(f"     {entry['share']:>6.1%}  {entry['function']}")
+            lines.append('')
+        with open(run_report.path('hotspots.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+
+        print(f"🔥 Profile: {run_report.path('profile.folded')} ({sum(i['samples'] for i in hotspots.values())} samples)")
+        return {stage: {k: info[k] for k in ('samples', 'wall_time_s', 'cpu_share', 'wait_share')}
+                for stage, info in hotspots.items()}
@@ -0,0 +1,221 @@
+"""
+Local staging store for scraped universities
+Scrape loops stage their records in a local SQLite database (WAL mode, indexed on the canonical
+name) instead of talking to MongoDB mid-scrape. When the run is finished, sync_run() diffs the staged
+set against the database once and writes the changeset in batched upserts (inside a transaction when
+the server supports one). A run is only marked synced after every batch succeeded; the upserts are
+idempotent, so a run whose sync failed (or whose scraper crashed) can be synced again later.
+
+Usage:
+    python staging_store.py list
+    python staging_store.py sync latest
+    python staging_store.py prune --keep 10
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+from changeset import load_existing_universities, diff_scrape, apply_changeset
+from university_names import normalize_name
+
+STAGING_DB = os.getenv('SCRAPER_STAGING_DB',
+                       os.path.join(os.path.dirname(os.path.abspath(__file__)), 'staging', 'staging.db'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    scraper TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    complete INTEGER NOT NULL DEFAULT 0,
+    synced_at TEXT,
+    sync_summary TEXT
+);
+CREATE TABLE IF NOT EXISTS records (
+    run_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    canonical TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS records_canonical ON records (canonical);
+CREATE INDEX IF NOT EXISTS records_run_canonical ON records (run_id, canonical);
+"""
+
+
+def now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class StagingStore:
+    """One SQLite file shared by every scraper (and worker) on this machine"""
+
+    def __init__(self, path=STAGING_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        # Several workers may stage at once; WAL lets them write while others read
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def begin_run(self, run_id, scraper):
+        with self.conn:
+            self.conn.execute('INSERT OR IGNORE INTO runs (run_id, scraper, started_at) VALUES (?, ?, ?)',
+                              (run_id, scraper, now()))
+
+    def stage(self, run_id, records):
+        """Insert or replace built records (one transaction per call)"""
+        rows = [(run_id, record['name'], normalize_name(record['name']), json.dumps(record, ensure_ascii=False))
+                for record in records]
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO records (run_id, name, canonical, data) VALUES (?, ?, ?, ?)',
+                                  rows)
+        return len(rows)
+
+    def records(self, run_id):
+        """name -> record for a staged run"""
+        rows = self.conn.execute('SELECT name, data FROM records WHERE run_id = ?', (run_id,))
+        return {name: json.loads(data) for name, data in rows}
+
+    def names(self):
+        """Every staged name (any run)"""
+        return {row[0] for row in self.conn.execute('SELECT DISTINCT name FROM records')}
+
+    def find_canonical(self, name):
+        """Staged names (any run) with the same canonical form"""
+        rows = self.conn.execute('SELECT DISTINCT name FROM records WHERE canonical = ?', (normalize_name(name),))
+        return [row[0] for row in rows]
+
+    def finish_run(self, run_id, complete):
+        with self.conn:
+            self.conn.execute('UPDATE runs SET finished_at = ?, complete = ? WHERE run_id = ?',
+                              (now(), int(bool(complete)), run_id))
+
+    def mark_synced(self, run_id, summary):
+        with self.conn:
+            self.conn.execute('UPDATE runs SET synced_at = ?, sync_summary = ? WHERE run_id = ?',
+                              (now(), json.dumps(summary), run_id))
+
+    def runs(self):
+        """Staged runs, newest first, with their record counts"""
+        rows = self.conn.execute("""
+            SELECT r.run_id, r.scraper, r.started_at, r.finished_at, r.complete, r.synced_at,
+                   (SELECT COUNT(*) FROM records WHERE records.run_id = r.run_id)
+            FROM runs r ORDER BY r.started_at DESC, r.run_id DESC
+        """)
+        keys = ('run_id', 'scraper', 'started_at', 'finished_at', 'complete', 'synced_at', 'records')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def prune(self, keep):
+        """Drop the records of synced runs beyond the newest `keep`; returns the runs pruned"""
+        synced = [run['run_id'] for run in self.runs() if run['synced_at']]
+        pruned = synced[keep:]
+        with self.conn:
+            self.conn.executemany('DELETE FROM records WHERE run_id = ?', [(run_id,) for run_id in pruned])
+            self.conn.executemany('DELETE FROM runs WHERE run_id = ?', [(run_id,) for run_id in pruned])
+        return pruned
+
+    def close(self):
+        self.conn.close()
+
+
+def supports_transactions(client):
+    """Multi-document transactions need a replica set or a sharded cluster"""
+    try:
+        return client.topology_description.topology_type_name in ('ReplicaSetWithPrimary', 'Sharded')
+    except Exception:
+        return False
+
+
+def apply_cut_over(universities_collection, changeset):
+    """Apply the changeset in one transaction where possible, else as idempotent batches"""
+    client = universities_collection.database.client
+    if not supports_transactions(client):
+        return apply_changeset(universities_collection, changeset)
+    with client.start_session() as session:
+        return session.with_transaction(lambda s: apply_changeset(universities_collection, changeset, session=s))
+
+
+def sync_run(store, run_id, universities_collection, complete=True):
+    """Push a staged run to MongoDB; returns (changeset, existing, inserted, modified)"""
+    records = store.records(run_id)
+    # Read at sync time, so admin edits made while the run was scraping are respected
+    existing = load_existing_universities(universities_collection)
+    changeset = diff_scrape(records, existing)
+    inserted, modified = (0, 0) if changeset.is_empty() else apply_cut_over(universities_collection, changeset)
+    store.mark_synced(run_id, {**changeset.summary(), 'complete_sweep': bool(complete),
+                               'inserted': inserted, 'modified': modified})
+    return changeset, existing, inserted, modified
+
+
+def resolve_run(store, ref):
+    runs = store.runs()
+    if ref == 'latest':
+        return runs[0]['run_id'] if runs else None
+    matches = [run['run_id'] for run in runs if run['run_id'].startswith(ref)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def cmd_list(args, store):
+    for run in store.runs():
+        state = f"synced {run['synced_at']}" if run['synced_at'] else ('finished, not synced' if run['finished_at']
+                                                                      else 'not finished')
+        print(f"   {run['run_id']}  {run['scraper']:<7} {run['records']:>6} records  {state}")
+
+
+def cmd_sync(args, store):
+    from pymongo import MongoClient
+    from change_manifest import build_manifest, publish_manifest
+
+    run_id = resolve_run(store, args.run)
+    if not run_id:
+        print(f"❌ No (unique) staged run matches '{args.run}'")
+        sys.exit(1)
+    run = next(r for r in store.runs() if r['run_id'] == run_id)
+    client = MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017/manzil'), serverSelectionTimeoutMS=5000)
+    try:
+        db = client['manzil']
+        changeset, existing, inserted, modified = sync_run(store, run_id, db['universities'], bool(run['complete']))
+        print(f"💾 {run_id}: inserted {inserted}, updated {modified} ({changeset.summary()})")
+        manifest = build_manifest(run_id, run['scraper'], changeset, existing)
+        if manifest:
+            publish_manifest(db, manifest)
+    finally:
+        client.close()
+
+
+def cmd_prune(args, store):
+    pruned = store.prune(args.keep)
+    print(f"🧹 Pruned {len(pruned)} synced runs")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Inspect and sync the local scraper staging store')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('list', help='List staged runs')
+
+    sync_parser = sub.add_parser('sync', help='Push a staged run to MongoDB (safe to repeat)')
+    sync_parser.add_argument('run', help="Run id (or prefix) or 'latest'")
+
+    prune_parser = sub.add_parser('prune', help='Drop old synced runs')
+    prune_parser.add_argument('--keep', type=int, default=10, help='Synced runs to keep (default: 10)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    store = StagingStore()
+    try:
+        {'list': cmd_list, 'sync': cmd_sync, 'prune': cmd_prune}[args.command](args, store)
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
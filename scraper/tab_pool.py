@@ -0,0 +1,167 @@
+"""
+Several listing tabs in one Chrome session
+WebDriver runs one command at a time, but the page work behind a command (reloads, the change
+events fired by the filters, the results refresh) carries on in the browser. Each tab is driven as
+a small state machine that never blocks: filters are applied with in-page timers and readiness is
+polled with one script call, so while one tab settles the others are being reloaded, filtered or
+parsed. N tabs share one browser process instead of N full Chrome instances.
+"""
+
+import time
+
+from result_state import OBSERVE_JS, STATE_FUNCTION_JS, is_empty_state
+
+# Same pacing as the single-tab path (0.5s between filters, 2s before the first results check)
+FILTER_DELAY_S = 0.5
+SETTLE_S = 2.0
+POLL_INTERVAL_S = 0.5
+# Give up waiting for rows (and parse whatever is there) this long after the filters were queued
+MAX_WAIT_S = 10.0
+LOAD_TIMEOUT_S = 120
+
+IDLE = 'idle'
+LOADING = 'loading'
+WAITING = 'waiting'
+
+# Fires the change events in order from page timers, so the Python side can move on to other tabs
+APPLY_FILTERS_JS = OBSERVE_JS + """
+var steps = arguments[0], delay = arguments[1];
+window.__manzilFilters = 'pending';
+steps.forEach(function (step, i) {
+    setTimeout(function () {
+        var select = document.getElementById(step[0]);
+        if (select) {
+            for (var j = 0; j < select.options.length; j++) {
+                if (select.options[j].text.trim() === step[1]) {
+                    select.value = select.options[j].value;
+                    select.dispatchEvent(new Event('change', { bubbles: true }));
+                    break;
+                }
+            }
+        }
+        if (i === steps.length - 1) { window.__manzilFilters = 'applied'; }
+    }, i * delay);
+});
+"""
+
+# One round trip: has the reload finished, have the filters run, result rows / empty state
+PROBE_JS = STATE_FUNCTION_JS + """
+var state = manzilResultState();
+state.loaded = document.readyState === 'complete' && !window.__manzilReloading && !!document.getElementById(arguments[0]);
+state.filters = window.__manzilFilters || null;
+return state;
+"""
+
+
+class ListingTab:
+    """One browser tab and the combination it is working on"""
+
+    def __init__(self, handle, index):
+        self.handle = handle
+        self.index = index
+        self.fresh = True         # Just opened: the initial load counts as the reload
+        self.phase = IDLE
+        self.combination = None
+        self.steps = None
+        self.attempt = 0
+        self.phase_started = 0.0
+        self.started = 0.0        # When the current combination was started (its latency)
+        self.next_poll = 0.0
+        self.last_rows = None
+        self.completed = 0
+
+
+class TabPool:
+    """N listing tabs in one driver; start() a combination on an idle tab, then poll() it until it is ready"""
+
+    def __init__(self, count, url, ready_element='Sector'):
+        self.count = max(1, count)
+        self.url = url
+        self.ready_element = ready_element
+        self.driver = None
+        self.tabs = []
+        self.current = None
+
+    def open(self, driver):
+        """Use the driver's current tab and open the rest (they load in parallel)"""
+        self.driver = driver
+        first = driver.current_window_handle
+        known = set(driver.window_handles)
+        for _ in range(self.count - 1):
+            driver.execute_script("window.open(arguments[0], '_blank');", self.url)
+        opened = [handle for handle in driver.window_handles if handle not in known]
+        self.tabs = [ListingTab(handle, index) for index, handle in enumerate([first, *opened])]
+        # The first tab is already on the listing (planning loaded it), but reload it like the rest
+        self.tabs[0].fresh = False
+        self.current = first
+        return self.tabs
+
+    def switch(self, tab):
+        if self.current != tab.handle:
+            self.driver.switch_to.window(tab.handle)
+            self.current = tab.handle
+
+    def idle_tabs(self):
+        return [tab for tab in self.tabs if tab.phase == IDLE]
+
+    def busy(self):
+        return any(tab.phase != IDLE for tab in self.tabs)
+
+    def start(self, tab, combination, steps, attempt=1):
+        """Reset the tab's filters (page reload) and queue the combination's filter changes"""
+        self.switch(tab)
+        tab.combination = combination
+        tab.steps = steps
+        tab.attempt = attempt
+        tab.last_rows = None
+        tab.started = time.monotonic()
+        if tab.fresh:
+            tab.fresh = False
+        else:
+            self.driver.execute_script("window.__manzilReloading = true; location.reload();")
+        tab.phase = LOADING
+        tab.phase_started = time.monotonic()
+        tab.next_poll = tab.phase_started + POLL_INTERVAL_S
+
+    def poll(self, tab):
+        """Advance a busy tab by at most one step; returns 'ready' (parse it now), 'empty', 'failed' or None"""
+        now = time.monotonic()
+        if now < tab.next_poll:
+            return None
+        self.switch(tab)
+        state = self.driver.execute_script(PROBE_JS, self.ready_element)
+        tab.next_poll = now + POLL_INTERVAL_S
+
+        if tab.phase == LOADING:
+            if state['loaded']:
+                self.driver.execute_script(APPLY_FILTERS_JS, tab.steps, int(FILTER_DELAY_S * 1000))
+                tab.phase = WAITING
+                tab.phase_started = now
+                # Poll from the last filter on (an empty state can end the tab early); rows wait SETTLE_S
+                tab.next_poll = now + FILTER_DELAY_S * (len(tab.steps) - 1) + POLL_INTERVAL_S
+            elif now - tab.phase_started > LOAD_TIMEOUT_S:
+                return 'failed'
+            return None
+
+        timed_out = now - tab.phase_started > MAX_WAIT_S
+        if state['filters'] != 'applied' and not timed_out:
+            return None
+        if is_empty_state(state, now - tab.phase_started):
+            return 'empty'
+        rows = state['rows']
+        settled = now - tab.phase_started >= SETTLE_S + FILTER_DELAY_S * (len(tab.steps) - 1)
+        # Rows present and unchanged since the previous poll: the refresh has finished
+        if rows and rows == tab.last_rows and settled:
+            return 'ready'
+        tab.last_rows = rows
+        return 'ready' if timed_out else None
+
+    def finish(self, tab, completed=True):
+        tab.phase = IDLE
+        tab.combination = None
+        tab.steps = None
+        if completed:
+            tab.completed += 1
+
+    def report(self):
+        return {'tabs': len(self.tabs), 'completed_per_tab': [tab.completed for tab in self.tabs]}
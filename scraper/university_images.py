@@ -0,0 +1,354 @@
+"""
+University logo / image pipeline
+Downloads each university's logo and hero image concurrently (the stored logo / image URLs, else the
+homepage's og:image and logo markup), dedups them by sha256 of the content and writes size-bounded
+WebP thumbnails to backend/uploads/images. The thumbnail paths are stored as logoThumb / imageThumb,
+so list pages serve a few KB per card instead of the full-size remote image.
+
+Repeat runs send conditional requests (ETag / Last-Modified kept in .image_index.json) and skip
+unchanged images. Thumbnails are named after the content hash, so an image shared by many
+universities (e.g. the default hero image) is encoded and stored once.
+
+Usage:
+    python university_images.py
+    python university_images.py --limit 20 --dry-run
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import time
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+from bs4 import BeautifulSoup
+from PIL import Image, UnidentifiedImageError
+from pymongo import MongoClient, UpdateOne
+from dotenv import load_dotenv
+
+from changeset import Changeset
+from change_manifest import build_manifest, publish_manifest
+from enrich_universities_async import (REQUEST_HEADERS, HostPoliteness, fetch_html, normalize_url,
+                                       DEFAULT_CONCURRENCY, DEFAULT_PER_HOST, DEFAULT_HOST_DELAY, DEFAULT_TIMEOUT)
+from http_cache import ResponseCache
+
+load_dotenv()
+
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/manzil')
+
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGES_DIR = os.getenv('UNIVERSITY_IMAGES_DIR',
+                       os.path.normpath(os.path.join(SCRAPER_DIR, '..', 'backend', 'uploads', 'images')))
+# URL path the backend serves IMAGES_DIR under (server.js: app.use('/uploads', express.static(...)))
+PUBLIC_PREFIX = '/uploads/images/'
+INDEX_FILE = os.path.join(SCRAPER_DIR, '.image_index.json')
+
+# kind -> (bounding box, WebP quality steps tried until the file fits, byte limit)
+THUMBNAIL_SPECS = {
+    'logo': ((256, 256), (85, 70, 55), 24 * 1024),
+    'image': ((800, 500), (80, 65, 50, 35), 80 * 1024),
+}
+MAX_DOWNLOAD_BYTES = 10 * 1024 * 1024
+# Touch icons / favicons are only used as a logo when they declare at least this size (16-32px favicons
+# would be blown up on the cards); otherwise logoThumb stays unset
+MIN_ICON_SIZE = 128
+BULK_BATCH_SIZE = 200
+
+
+def is_remote(url):
+    """Only http(s) sources are fetched (not data: URIs from the admin form or thumbnails we wrote)"""
+    return isinstance(url, str) and url.strip().lower().startswith(('http://', 'https://'))
+
+
+def icon_size(link):
+    """Largest size declared in a <link sizes="180x180 32x32">; 0 when undeclared or 'any' (SVG, which
+    Pillow cannot read)"""
+    largest = 0
+    for size in (link.get('sizes') or '').lower().split():
+        width, _, height = size.partition('x')
+        if width.isdigit() and height.isdigit():
+            largest = max(largest, min(int(width), int(height)))
+    return largest
+
+
+def discover_sources(html, page_url):
+    """og:image and logo candidates from a homepage -> {'logo': url or None, 'image': url or None}"""
+    soup = BeautifulSoup(html, 'html.parser')
+    sources = {'logo': None, 'image': None}
+
+    for attrs in ({'property': 'og:image'}, {'name': 'og:image'}, {'name': 'twitter:image'}):
+        meta = soup.find('meta', attrs=attrs)
+        if meta and meta.get('content'):
+            sources['image'] = urljoin(page_url, meta['content'].strip())
+            break
+
+    meta = soup.find('meta', attrs={'property': 'og:logo'})
+    if meta and meta.get('content'):
+        sources['logo'] = urljoin(page_url, meta['content'].strip())
+    if not sources['logo']:
+        for img in soup.find_all('img', src=True):
+            markers = ' '.join([img['src'], img.get('alt', ''), img.get('id', ''), ' '.join(img.get('class', []))])
+            if 'logo' in markers.lower() and not img['src'].startswith('data:'):
+                sources['logo'] = urljoin(page_url, img['src'].strip())
+                break
+    if not sources['logo']:
+        icons = [link for link in soup.find_all('link', href=True)
+                 if {'apple-touch-icon', 'icon'} & set(link.get('rel') or [])]
+        icons = [link for link in icons if icon_size(link) >= MIN_ICON_SIZE]
+        if icons:
+            best = max(icons, key=icon_size)
+            sources['logo'] = urljoin(page_url, best['href'].strip())
+    return sources
+
+
+def make_thumbnail(body, kind):
+    """Image bytes -> WebP bytes within the kind's box and byte limit"""
+    box, qualities, max_bytes = THUMBNAIL_SPECS[kind]
+    with Image.open(io.BytesIO(body)) as image:
+        image.seek(0)  # First frame of animated GIFs / multi-size ICOs
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        image.thumbnail(box, Image.LANCZOS)
+        data = b''
+        for quality in qualities:
+            out = io.BytesIO()
+            image.save(out, 'WEBP', quality=quality, method=6)
+            data = out.getvalue()
+            if len(data) <= max_bytes:
+                break
+        return data
+
+
+class ImageIndex:
+    """urls: image url -> validators and content digest of the last download;
+    pages: homepage -> image sources found on it (reused while the homepage answers 304)"""
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.urls = data.get('urls', {})
+        self.pages = data.get('pages', {})
+
+    def save(self):
+        with open(f"{self.path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'urls': self.urls, 'pages': self.pages}, f, indent=1)
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+def thumbnail_name(digest, kind):
+    return f"uni-{digest[:24]}-{kind}.webp"
+
+
+class ImagePipeline:
+    """Fetches, dedups and thumbnails the images of many universities concurrently (run())"""
+
+    def __init__(self, index, images_dir=IMAGES_DIR, force=False):
+        self.index = index
+        self.images_dir = images_dir
+        self.force = force
+        self.stats = {'downloaded': 0, 'not_modified': 0, 'deduplicated': 0, 'encoded': 0, 'failed': 0,
+                      'bytes_downloaded': 0, 'bytes_written': 0}
+        os.makedirs(images_dir, exist_ok=True)
+
+    def _thumb_path(self, digest, kind):
+        return os.path.join(self.images_dir, thumbnail_name(digest, kind))
+
+    async def thumbnail(self, session, politeness, url, kind):
+        """Public path of the thumbnail for one source URL"""
+        entry = self.index.urls.get(url)
+        headers = {}
+        if entry and not self.force and os.path.exists(self._thumb_path(entry['digest'], kind)):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        await politeness.wait(urlparse(url).netloc.lower())
+        async with session.get(url, headers=headers, allow_redirects=True, max_redirects=5) as resp:
+            if resp.status == 304 and headers:
+                self.stats['not_modified'] += 1
+                return PUBLIC_PREFIX + thumbnail_name(entry['digest'], kind)
+            if resp.status >= 400:
+                raise Exception(f"HTTP {resp.status}")
+            content_type = resp.headers.get('Content-Type', '')
+            if content_type and not content_type.startswith('image/') and 'octet-stream' not in content_type:
+                raise Exception(f"Unexpected content-type: {content_type}")
+            if resp.content_length and resp.content_length > MAX_DOWNLOAD_BYTES:
+                raise Exception(f"Too large ({resp.content_length} bytes)")
+            chunks, size = [], 0
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                size += len(chunk)
+                if size > MAX_DOWNLOAD_BYTES:
+                    raise Exception("Too large")
+                chunks.append(chunk)
+            body = b''.join(chunks)
+            validators = {'etag': resp.headers.get('ETag'), 'last_modified': resp.headers.get('Last-Modified')}
+
+        self.stats['downloaded'] += 1
+        self.stats['bytes_downloaded'] += len(body)
+        digest = hashlib.sha256(body).hexdigest()
+        self.index.urls[url] = {'digest': digest, **validators}
+        path = self._thumb_path(digest, kind)
+        if os.path.exists(path) and not self.force:
+            # Same content as another URL (or an unchanged body served without validators)
+            self.stats['deduplicated'] += 1
+        else:
+            # Decoding / resizing is CPU-bound, keep it off the event loop
+            data = await asyncio.to_thread(make_thumbnail, body, kind)
+            with open(f"{path}.tmp", 'wb') as f:
+                f.write(data)
+            os.replace(f"{path}.tmp", path)
+            self.stats['encoded'] += 1
+            self.stats['bytes_written'] += len(data)
+        return PUBLIC_PREFIX + thumbnail_name(digest, kind)
+
+    async def process(self, session, politeness, record, cache):
+        """Thumbnails for one university; never raises"""
+        result = {'_id': record['_id'], 'name': record.get('name'), 'errors': []}
+        sources = {kind: record.get(kind) if is_remote(record.get(kind)) else None for kind in THUMBNAIL_SPECS}
+
+        website = normalize_url(record.get('website'))
+        if website and not all(sources.values()):
+            try:
+                await politeness.wait(urlparse(website).netloc.lower())
+                page = await fetch_html(session, website, cache)
+                body = page.body
+                if body is None and website not in self.index.pages and cache:
+                    # 304 for a homepage this pipeline never parsed (index lost or reset)
+                    body = cache.cached_body(website)
+                if body:
+                    self.index.pages[website] = await asyncio.to_thread(discover_sources, body, website)
+                for kind, url in self.index.pages.get(website, {}).items():
+                    sources[kind] = sources[kind] or url
+            except Exception as e:
+                result['errors'].append(f"homepage: {str(e)[:80] or e.__class__.__name__}")
+
+        for kind, url in sources.items():
+            if not url:
+                continue
+            try:
+                result[f"{kind}Thumb"] = await self.thumbnail(session, politeness, url, kind)
+            except (UnidentifiedImageError, OSError) as e:
+                self.stats['failed'] += 1
+                result['errors'].append(f"{kind}: unsupported image ({str(e)[:60]})")
+            except asyncio.TimeoutError:
+                self.stats['failed'] += 1
+                result['errors'].append(f"{kind}: timeout")
+            except Exception as e:
+                self.stats['failed'] += 1
+                result['errors'].append(f"{kind}: {str(e)[:80] or e.__class__.__name__}")
+        return result
+
+    async def run(self, records, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                  host_delay=DEFAULT_HOST_DELAY, timeout=DEFAULT_TIMEOUT, cache=None):
+        # ssl=False: many .edu.pk sites serve incomplete certificate chains
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ssl=False, ttl_dns_cache=300)
+        client_timeout = aiohttp.ClientTimeout(total=timeout, connect=min(10, timeout))
+        politeness = HostPoliteness(host_delay)
+        results = []
+        async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                         headers=REQUEST_HEADERS) as session:
+            tasks = [self.process(session, politeness, record, cache) for record in records]
+            for done, coro in enumerate(asyncio.as_completed(tasks), 1):
+                result = await coro
+                results.append(result)
+                thumbs = [kind for kind in THUMBNAIL_SPECS if result.get(f"{kind}Thumb")]
+                status = ', '.join(thumbs) or 'no images'
+                if result['errors']:
+                    status += f" ({'; '.join(result['errors'])})"
+                print(f"   [{done}/{len(tasks)}] {(result['name'] or '')[:50]} … {status}")
+        return results
+
+
+def load_records(args, universities_collection):
+    query = {}
+    if args.id:
+        from bson import ObjectId
+        query['_id'] = ObjectId(args.id)
+    projection = {'name': 1, 'city': 1, 'type': 1, 'website': 1, 'logo': 1, 'image': 1, 'logoThumb': 1, 'imageThumb': 1}
+    records = list(universities_collection.find(query, projection).sort('name', 1))
+    if args.limit:
+        records = records[:args.limit]
+    return records
+
+
+def save_results(db, records, results):
+    """Write thumbnail paths that changed; publish them as a change manifest for the backend cache"""
+    by_id = {record['_id']: record for record in records}
+    changeset = Changeset()
+    for result in results:
+        stored = by_id[result['_id']]
+        fields = {field: result[field] for field in ('logoThumb', 'imageThumb')
+                  if result.get(field) and result[field] != stored.get(field)}
+        if fields:
+            changeset.changed.append({'_id': result['_id'], 'name': stored['name'], 'fields': fields})
+    if changeset.is_empty():
+        return 0
+
+    operations = [UpdateOne({'_id': change['_id']}, {'$set': change['fields']}) for change in changeset.changed]
+    modified = 0
+    for start in range(0, len(operations), BULK_BATCH_SIZE):
+        modified += db['universities'].bulk_write(operations[start:start + BULK_BATCH_SIZE], ordered=False).modified_count
+
+    run_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+    manifest = build_manifest(run_id, 'images', changeset, {record['name']: record for record in records})
+    try:
+        publish_manifest(db, manifest)
+    except Exception as e:
+        print(f"⚠️  Could not publish change manifest: {e}")
+    return modified
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Download, dedup and thumbnail university logos and images')
+    parser.add_argument('--id', help='Only process the university with this ObjectId')
+    parser.add_argument('--limit', type=int, help='Only process the first N universities')
+    parser.add_argument('--dry-run', action='store_true', help='Write thumbnails, but do not update MongoDB')
+    parser.add_argument('--force', action='store_true', help='Re-download and re-encode every image')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Max requests in flight')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST, help='Max connections per host')
+    parser.add_argument('--host-delay', type=float, default=DEFAULT_HOST_DELAY, help='Seconds between requests to one host')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Seconds per request')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("🖼️  Starting university image pipeline...\n")
+
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+    db = client['manzil']
+    try:
+        records = load_records(args, db['universities'])
+        print(f"📊 Processing {len(records)} universities (concurrency={args.concurrency}, output={os.path.abspath(IMAGES_DIR)})\n")
+
+        index = ImageIndex()
+        pipeline = ImagePipeline(index, force=args.force)
+        cache = ResponseCache(namespace='images')
+        started = time.monotonic()
+        results = asyncio.run(pipeline.run(records, args.concurrency, args.per_host, args.host_delay,
+                                           args.timeout, cache))
+        index.save()
+        cache.save()
+
+        stats = pipeline.stats
+        print(f"\n✅ Done in {time.monotonic() - started:.1f}s: {stats['downloaded']} downloaded, "
+              f"{stats['not_modified']} unchanged (304), {stats['deduplicated']} deduplicated, "
+              f"{stats['encoded']} encoded, {stats['failed']} failed")
+        print(f"   📦 {stats['bytes_downloaded'] / 1024:.0f} KB downloaded -> {stats['bytes_written'] / 1024:.0f} KB of thumbnails")
+
+        if not args.dry_run:
+            print(f"💾 Updated {save_results(db, records, results)} universities")
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+University name normalization and alias index
+Resolves short names used in program catalogs ("LUMS", "NUST", "FAST-NUCES", "COMSATS University")
+to the full names the scrapers store, with O(1) dictionary lookups
+"""
+
+import re
+
+STOP_WORDS = {'of', 'the', 'and', 'for', 'in', 'at', '&'}
+
+# Words that describe a campus/location rather than the institution itself
+CITY_WORDS = {
+    'islamabad', 'rawalpindi', 'lahore', 'karachi', 'peshawar', 'quetta', 'faisalabad', 'multan',
+    'gujranwala', 'hyderabad', 'sargodha', 'bahawalpur', 'abbottabad', 'taxila', 'jamshoro', 'sukkur',
+}
+
+# Well-known short forms -> full name (same list as import_programs_csv.js abbrevMap)
+KNOWN_ALIASES = {
+    'lums': 'Lahore University of Management Sciences',
+    'nust': 'National University of Sciences & Technology',
+    'fast-nuces': 'FAST National University of Computer and Emerging Sciences',
+    'fast-nu': 'FAST National University of Computer and Emerging Sciences',
+    'fast': 'FAST National University of Computer and Emerging Sciences',
+    'comsats': 'COMSATS University Islamabad',
+    'qau': 'Quaid-i-Azam University',
+    'gcu': 'Government College University Lahore',
+    'bzu': 'Bahauddin Zakariya University',
+    'numl': 'National University of Modern Languages',
+    'aiou': 'Allama Iqbal Open University',
+    'uaf': 'University of Agriculture, Faisalabad',
+    'uvas': 'University of Veterinary and Animal Sciences',
+    'uoh': 'University of Haripur',
+    'uog': 'University of Gujrat',
+    'uol': 'University of Lahore',
+    'ucp': 'University of Central Punjab',
+    'uop': 'University of Peshawar',
+    'uos': 'University of Sargodha',
+    'uob': 'University of Balochistan',
+    'uok': 'University of Karachi',
+}
+
+
+def normalize_name(name):
+    """Lowercase, '&' -> 'and', drop punctuation and collapse whitespace"""
+    text = (name or '').lower().replace('&', ' and ')
+    text = re.sub(r"['`’]", '', text)
+    text = re.sub(r'[^a-z0-9]+', ' ', text)
+    return ' '.join(text.split())
+
+
+def strip_qualifiers(name):
+    """Drop parenthesized parts and ' - Campus (reference)' style suffixes"""
+    text = re.sub(r'\([^)]*\)', ' ', name or '')
+    return ' '.join(text.split()).strip(' ,-')
+
+
+def acronym(name):
+    """First letters of significant words: 'Allama Iqbal Open University' -> 'aiou'"""
+    words = normalize_name(strip_qualifiers(name)).split()
+    letters = [w[0] for w in words if w not in STOP_WORDS and w != 'and']
+    return ''.join(letters) if len(letters) >= 2 else ''
+
+
+def is_distinctive(key):
+    """True when a normalized key has a word beyond 'university'/stop words"""
+    return any(w not in STOP_WORDS and w not in ('and', 'university') for w in key.split())
+
+
+def name_aliases(name):
+    """All lookup keys a university can be referred to by (normalized)"""
+    aliases = set()
+    base = strip_qualifiers(name)
+    aliases.add(normalize_name(base))
+
+    # Parenthesized short forms: '... (NUST)', '(GCU)', '(UET Lahore)'
+    for inner in re.findall(r'\(([^)]+)\)', name or ''):
+        inner = inner.strip()
+        if inner.lower() != 'reference' and len(inner) <= 20:
+            aliases.add(normalize_name(inner))
+
+    # 'AIOU - Allama Iqbal Open University' / 'University of X - Y Campus'
+    for part in re.split(r'\s+-\s+', base):
+        part_key = normalize_name(part)
+        if is_distinctive(part_key) and (len(part_key.split()) > 1 or part.isupper()):
+            aliases.add(part_key)
+
+    # Leading all-caps token: 'COMSATS University Islamabad' -> 'comsats'
+    first = base.split()[0] if base.split() else ''
+    if len(first) >= 3 and first.replace('-', '').isupper():
+        aliases.add(normalize_name(first))
+
+    # Trailing city dropped: 'COMSATS University Islamabad' -> 'comsats university'
+    words = normalize_name(base).split()
+    if len(words) > 2 and words[-1] in CITY_WORDS and is_distinctive(' '.join(words[:-1])):
+        aliases.add(' '.join(words[:-1]))
+
+    short = acronym(name)
+    if len(short) >= 3:
+        aliases.add(short)
+
+    aliases.discard('')
+    return aliases
+
+
+class AliasIndex:
+    """Alias -> university id maps built once from a bulk read of universities"""
+
+    def __init__(self, universities):
+        self.exact = {}
+        self.aliases = {}
+        self.ambiguous = set()
+
+        for uni in universities:
+            self.exact.setdefault(normalize_name(uni['name']), uni['_id'])
+
+        for uni in universities:
+            for alias in name_aliases(uni['name']):
+                self._add_alias(alias, uni['_id'])
+
+        # Known short forms point at whatever the full name resolves to
+        for short, full_name in KNOWN_ALIASES.items():
+            target = self._lookup(normalize_name(full_name))
+            if target is not None:
+                self._add_alias(normalize_name(short), target)
+
+    def _add_alias(self, alias, uni_id):
+        if alias in self.exact:
+            return
+        current = self.aliases.get(alias)
+        if current is None:
+            self.aliases[alias] = uni_id
+        elif current != uni_id:
+            # Shared acronym (e.g. several 'UET's) - never guess
+            self.ambiguous.add(alias)
+
+    def _lookup(self, key):
+        if key in self.exact:
+            return self.exact[key]
+        if key in self.ambiguous:
+            return None
+        return self.aliases.get(key)
+
+    def resolve(self, label):
+        """University id for a name/alias, or None when unknown or ambiguous"""
+        uni_id = self._lookup(normalize_name(label))
+        if uni_id is None:
+            uni_id = self._lookup(normalize_name(strip_qualifiers(label)))
+        return uni_id
+
+    def is_ambiguous(self, label):
+        return normalize_name(label) in self.ambiguous